@@ -6,19 +6,70 @@ ActionManager 守护线程模块
 创建时间: 2026-1-20
 """
 
+import os  # 导入操作系统接口模块
 import threading  # 导入线程模块
 import time  # 导入时间模块
 import sys  # 导入系统模块
 import traceback  # 导入堆栈追踪模块
 import logging  # 导入日志模块
+import queue  # 导入线程安全队列模块
+from collections import OrderedDict  # 导入有序字典
 from enum import Enum  # 导入枚举类
 from dataclasses import dataclass, field  # 导入数据类装饰器
-from collections import deque  # 导入双端队列
 from typing import Optional, Dict, Any  # 导入类型提示
 
 # 配置日志: 移除 basicConfig, 避免与主程序冲突
 logger = logging.getLogger(__name__)  # 创建日志记录器
 
+# 控制循环运行期间使用的 GIL 切换间隔(单位: 秒)
+# CPython 默认 5ms: 控制线程从 sleep 醒来后, 最长要等待其他线程(音频重采样/AEC/JSON 解析)
+# 持有 GIL 5ms 才能运行, 直接吃掉半个 10ms 周期; 调低到 1ms 可将该抖动上限压到 1ms 以内
+CONTROL_LOOP_SWITCH_INTERVAL = 0.001
+
+# 速度指令合并阈值: 持续移动中收到与当前目标差值均小于该值的新指令时直接忽略,
+# 避免大模型连续下发几乎相同的指令时反复加锁、发布快照和刷日志
+VELOCITY_COALESCE_EPSILON = 1e-3
+
+
+# monotonic 时钟到墙上时钟(epoch)的偏移量: 导入时记录一次, 任务内部计时不受 NTP 校时影响,
+# 对外输出时仍换算为 time.time() 语义的 epoch 秒
+_EPOCH_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+
+
+def _ns_to_seconds(ns: Optional[int]) -> Optional[float]:
+    """monotonic 纳秒转换为 epoch 秒(None 保持为 None), 供任务状态对外输出"""
+    return (ns + _EPOCH_OFFSET_NS) / 1e9 if ns is not None else None
+
+
+def _apply_thread_scheduling(name: str, cpu: Optional[int] = None, rt_priority: int = 0):
+    """
+    为当前线程设置 CPU 亲和性与实时调度策略(需在目标线程内调用, 仅 Linux 生效)
+    
+    Args:
+        name: 线程名称(用于日志)
+        cpu: 绑定的 CPU 核心编号, None 表示不绑定
+        rt_priority: SCHED_FIFO 优先级(1~99), 0 表示不修改调度策略
+    """
+    if cpu is not None:
+        if hasattr(os, "sched_setaffinity"):
+            try:
+                os.sched_setaffinity(0, {cpu})  # pid=0 表示当前线程
+                logger.info("[%s] 已绑定至 CPU %d", name, cpu)
+            except (OSError, ValueError) as e:  # 核心不存在或不在允许集合内
+                logger.warning("[%s] 绑定 CPU %s 失败: %s", name, cpu, e)
+        else:
+            logger.warning("[%s] 当前平台不支持 CPU 亲和性设置, 已忽略", name)
+    
+    if rt_priority > 0:
+        if hasattr(os, "sched_setscheduler"):
+            try:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(rt_priority))  # 实时调度
+                logger.info("[%s] 已启用 SCHED_FIFO 实时调度(优先级 %d)", name, rt_priority)
+            except (OSError, ValueError) as e:  # 通常是缺少 CAP_SYS_NICE 权限
+                logger.warning("[%s] 设置实时调度失败: %s", name, e)
+        else:
+            logger.warning("[%s] 当前平台不支持实时调度设置, 已忽略", name)
+
 
 class ActionType(Enum):
     """动作类型枚举"""
@@ -28,6 +79,9 @@ class ActionType(Enum):
     EMERGENCY = 3  # 紧急停止状态
 
 
+_IDLE_STATE = (0.0, 0.0, 0.0, ActionType.IDLE, False, None, 0)  # 空闲状态快照（不可变，全局共享）
+
+
 class TaskStatus(Enum):
     """任务状态枚举"""
     PENDING = "pending"  # 待执行
@@ -45,9 +99,9 @@ class RobotTask:
     parameters: Dict[str, Any]  # 任务参数字典
     duration: float  # 持续时间（秒）
     status: TaskStatus = field(default=TaskStatus.PENDING)  # 任务状态，默认为待执行
-    created_time: float = field(default_factory=time.time)  # 创建时间戳，默认为当前时间
-    start_time: Optional[float] = None  # 开始执行时间戳
-    end_time: Optional[float] = None  # 结束时间戳
+    created_time_ns: int = field(default_factory=time.monotonic_ns)  # 创建时刻（monotonic 纳秒），默认为当前时刻
+    start_time_ns: Optional[int] = None  # 开始执行时刻（monotonic 纳秒）
+    end_time_ns: Optional[int] = None  # 结束时刻（monotonic 纳秒）
 
 
 class ActionManager:
@@ -60,50 +114,87 @@ class ActionManager:
     3. 提供急停与状态查询接口
     """
     
-    def __init__(self, g1_client):
+    def __init__(self, g1_client, control_cpu: Optional[int] = None,
+                 executor_cpu: Optional[int] = None, control_rt_priority: int = 0):
         """
         初始化动作管理器
         
         Args:
             g1_client: LocoClient 实例, 用于控制 G1 机器人
+            control_cpu: 控制循环线程绑定的 CPU 核心编号(None 表示不绑定)
+            executor_cpu: 任务执行器线程绑定的 CPU 核心编号(None 表示不绑定)
+            control_rt_priority: 控制循环 SCHED_FIFO 优先级(0 表示不启用)
         """
         if g1_client is None:
             raise ValueError("g1_client 不能为 None")
             
         self.g1_client = g1_client  # 保存 G1 客户端实例
         
+        # 线程调度参数(在各线程启动后由线程自身应用)
+        self._control_cpu = control_cpu  # 控制循环 CPU 亲和性
+        self._executor_cpu = executor_cpu  # 任务执行器 CPU 亲和性
+        self._control_rt_priority = control_rt_priority  # 控制循环实时优先级
+        
         # 线程安全的状态变量
-        self._lock = threading.Lock()  # 创建线程锁保护共享状态
-        self._target_vx = 0.0  # 目标前进速度(单位: m/s)
-        self._target_vy = 0.0  # 目标横向速度(单位: m/s)
-        self._target_vyaw = 0.0  # 目标旋转速度(单位: rad/s)
-        self._current_action = ActionType.IDLE  # 当前动作类型
-        self._emergency_flag = False  # 急停标志位
+        # 速度/动作/急停/持续时间以不可变元组整体发布:
+        #   (vx, vy, vyaw, action, emergency, duration, start_ns)
+        #   duration: None 表示持续移动, float 表示移动持续时间(秒)
+        #   start_ns: 移动开始时刻(monotonic 纳秒), 用于计算运动持续时间
+        # 元组赋值在 GIL 下是单条原子存储, 100Hz 控制循环无锁读取即可得到一致快照
+        self._lock = threading.Lock()  # 写者互斥锁(仅写路径使用, 控制循环不再获取)
+        self._state = _IDLE_STATE  # 当前状态快照
         
         # 控制循环相关
         self._running = False  # 控制循环运行标志
         self._control_thread = None  # 控制循环线程对象
         self._loop_count = 0  # 循环计数器, 用于日志输出频率控制
-        
-        # 自动停止相关
-        self._move_start_time = 0.0  # 移动开始时间戳，用于计算运动持续时间
-        self._move_duration = None  # None 表示持续移动, float 表示移动持续时间(秒)
+        self._saved_switch_interval = None  # 启动前的 GIL 切换间隔, stop() 时恢复
         
         # 频率统计相关
-        self._last_report_time = time.time()  # 上次输出频率统计日志的时间戳
+        self._last_report_ns = time.monotonic_ns()  # 上次输出频率统计日志的时刻(monotonic 纳秒)
         
         # 任务队列相关（新增）
-        self._task_queue = deque()  # 任务队列，使用双端队列实现线程安全的FIFO
+        self._task_queue = queue.Queue()  # 任务队列（条件变量实现，执行器阻塞等待，无需轮询），元素为 (清空代次, 任务)
+        self._queue_epoch = 0  # 队列清空代次，clear_task_queue 时自增，用于识别已取出但尚未登记的过期任务
         self._current_task = None  # 当前正在执行的任务
         self._task_lock = threading.Lock()  # 任务队列专用锁
         self._next_task_id = 0  # 任务ID计数器
         self._task_executor_thread = None  # 任务执行器线程对象
         self._task_executor_running = False  # 任务执行器运行标志
-        self._completed_tasks = {}  # 已完成任务的历史记录（task_id -> RobotTask）
+        self._completed_tasks: "OrderedDict[str, RobotTask]" = OrderedDict()  # 已完成任务的历史记录（task_id -> RobotTask，按完成顺序）
         self._max_history_size = 100  # 最大历史记录数量，防止内存泄漏
         
         logger.info("ActionManager 初始化完成")  # 记录初始化日志
     
+    # 兼容只读访问: 各字段均从状态快照中读取
+    @property
+    def _target_vx(self) -> float:
+        return self._state[0]  # 目标前进速度(单位: m/s)
+    
+    @property
+    def _target_vy(self) -> float:
+        return self._state[1]  # 目标横向速度(单位: m/s)
+    
+    @property
+    def _target_vyaw(self) -> float:
+        return self._state[2]  # 目标旋转速度(单位: rad/s)
+    
+    @property
+    def _current_action(self) -> ActionType:
+        return self._state[3]  # 当前动作类型
+    
+    @property
+    def _emergency_flag(self) -> bool:
+        return self._state[4]  # 急停标志位
+    
+    @property
+    def _move_duration(self) -> Optional[float]:
+        return self._state[5]  # 移动持续时间(秒), None 表示持续移动
+    
+    @property
+    def _move_start_ns(self) -> int:
+        return self._state[6]  # 移动开始时刻(monotonic 纳秒)
+    
     def start(self):
         """启动控制循环守护线程"""
         if self._running:  # 检查是否已经在运行
@@ -112,6 +203,10 @@ class ActionManager:
         
         self._running = True  # 设置运行标志为 True
         
+        # 缩短 GIL 切换间隔, 降低控制线程被其他线程阻塞的调度抖动
+        self._saved_switch_interval = sys.getswitchinterval()  # 保存原始值
+        sys.setswitchinterval(CONTROL_LOOP_SWITCH_INTERVAL)  # 设置为 1ms
+        
         # 启动控制循环线程
         self._control_thread = threading.Thread(
             target=self._control_loop,  # 设置线程执行的目标函数
@@ -156,7 +251,7 @@ class ActionManager:
             # 检查线程是否真正退出
             if self._control_thread.is_alive():
                 logger.error("⚠️ 控制循环线程未能在2秒内退出, 可能存在死锁！")
-                logger.error(f"线程状态: is_alive=True, daemon=True")
+                logger.error("线程状态: is_alive=True, daemon=True")
                 # 记录堆栈跟踪以便调试
                 for tid, frame in sys._current_frames().items():
                     if tid == self._control_thread.ident:
@@ -164,12 +259,17 @@ class ActionManager:
             else:
                 logger.info("ActionManager 控制循环已停止")  # 记录停止日志
         
+        # 恢复 GIL 切换间隔
+        if self._saved_switch_interval is not None:  # 检查是否保存过原始值
+            sys.setswitchinterval(self._saved_switch_interval)  # 恢复原始值
+            self._saved_switch_interval = None  # 清除保存值
+        
         # 停止前发送一次停止指令
         try:
             self.g1_client.Move(0.0, 0.0, 0.0)  # 调用 SDK 停止运动方法
             logger.info("已发送停止运动指令至机器人")  # 记录停止指令日志
         except Exception as e:  # 捕获异常
-            logger.error(f"发送停止指令失败: {e}")  # 记录错误日志
+            logger.error("发送停止指令失败: %s", e)  # 记录错误日志
     
     def update_target_velocity(self, vx: float, vy: float, vyaw: float, duration: float = None):
         """
@@ -183,58 +283,56 @@ class ActionManager:
         """
         # 参数验证与截断
         if not (-1.0 <= vx <= 1.0):
-            logger.warning(f"vx 超出安全范围: {vx}, 已截断至 [-1.0, 1.0]")
+            logger.warning("vx 超出安全范围: %s, 已截断至 [-1.0, 1.0]", vx)
             vx = max(-1.0, min(1.0, vx))
         
         if not (-1.0 <= vy <= 1.0):
-            logger.warning(f"vy 超出安全范围: {vy}, 已截断至 [-1.0, 1.0]")
+            logger.warning("vy 超出安全范围: %s, 已截断至 [-1.0, 1.0]", vy)
             vy = max(-1.0, min(1.0, vy))
         
         if not (-1.5 <= vyaw <= 1.5):
-            logger.warning(f"vyaw 超出安全范围: {vyaw}, 已截断至 [-1.5, 1.5]")
+            logger.warning("vyaw 超出安全范围: %s, 已截断至 [-1.5, 1.5]", vyaw)
             vyaw = max(-1.5, min(1.5, vyaw))
 
-        with self._lock:  # 获取锁, 保证线程安全
-            self._target_vx = vx  # 更新目标前进速度
-            self._target_vy = vy  # 更新目标横向速度
-            self._target_vyaw = vyaw  # 更新目标旋转速度
-            self._current_action = ActionType.MOVE  # 设置当前动作类型为移动
-            self._emergency_flag = False  # 清除急停标志
-            
-            # 设置持续时间和开始时间
-            self._move_duration = duration  # 保存持续时间参数
-            self._move_start_time = time.time() if duration else 0.0  # 仅当指定持续时间时记录开始时间戳
+        # 合并几乎相同的持续移动指令(无锁读取快照; 定时移动与急停状态不合并)
+        cur = self._state  # 当前状态快照
+        if (duration is None and cur[3] == ActionType.MOVE and cur[5] is None
+                and abs(vx - cur[0]) < VELOCITY_COALESCE_EPSILON
+                and abs(vy - cur[1]) < VELOCITY_COALESCE_EPSILON
+                and abs(vyaw - cur[2]) < VELOCITY_COALESCE_EPSILON):
+            return  # 目标未变化, 无需更新
+
+        start_ns = time.monotonic_ns() if duration else 0  # 仅当指定持续时间时记录开始时刻
+        with self._lock:  # 获取写者锁
+            # 发布新状态快照(移动, 清除急停标志, 附带持续时间与开始时刻)
+            self._state = (vx, vy, vyaw, ActionType.MOVE, False, duration, start_ns)
         
-        logger.info(f"目标速度已更新: vx={vx:.2f}, vy={vy:.2f}, vyaw={vyaw:.2f}")  # 记录速度更新日志
+        logger.info("目标速度已更新: vx=%.2f, vy=%.2f, vyaw=%.2f", vx, vy, vyaw)  # 记录速度更新日志
     
     def emergency_stop(self):
         """紧急停止(最高优先级)"""
         # 清空任务队列（新增）
         self.clear_task_queue()  # 清空所有未执行的任务
         
-        with self._lock:  # 获取锁, 保证线程安全
-            self._target_vx = 0.0  # 将目标前进速度清零
-            self._target_vy = 0.0  # 将目标横向速度清零
-            self._target_vyaw = 0.0  # 将目标旋转速度清零
-            self._current_action = ActionType.EMERGENCY  # 设置当前动作类型为紧急停止
-            self._emergency_flag = True  # 设置急停标志为 True
+        with self._lock:  # 获取写者锁
+            self._state = (0.0, 0.0, 0.0, ActionType.EMERGENCY, True, None, 0)  # 速度清零并置急停标志
         
         # 立即发送停止指令(不等待下一个控制循环周期)
         try:
             self.g1_client.Damp()  # 调用 SDK 阻尼模式(FSM ID=1)
             logger.warning("紧急停止已触发！机器人已切换至阻尼模式")  # 记录紧急停止日志
         except Exception as e:  # 捕获异常
-            logger.error(f"紧急停止失败: {e}")  # 记录错误日志
+            logger.error("紧急停止失败: %s", e)  # 记录错误日志
 
     def recover_from_emergency(self) -> bool:
         """从紧急停止状态恢复"""
         with self._lock:
-            if self._current_action != ActionType.EMERGENCY:
+            vx, vy, vyaw, action = self._state[:4]
+            if action != ActionType.EMERGENCY:
                 logger.warning("当前不在紧急状态, 无需恢复")
                 return False
             
-            self._current_action = ActionType.IDLE
-            self._emergency_flag = False
+            self._state = (vx, vy, vyaw, ActionType.IDLE, False, None, 0)
         
         try:
             # 重新启动FSM(优先尝试 RecoveryStand 以应对倒地情况)
@@ -243,20 +341,35 @@ class ActionManager:
             logger.info("已从紧急停止状态恢复 (Squat2StandUp)")
             return True
         except Exception as e:
-            logger.error(f"从紧急状态恢复失败: {e}")
+            logger.error("从紧急状态恢复失败: %s", e)
             return False
     
     def set_idle(self):
         """设置为空闲状态(停止运动)"""
-        with self._lock:  # 获取锁, 保证线程安全
-            self._target_vx = 0.0  # 将目标前进速度清零
-            self._target_vy = 0.0  # 将目标横向速度清零
-            self._target_vyaw = 0.0  # 将目标旋转速度清零
-            self._current_action = ActionType.IDLE  # 设置当前动作类型为空闲
-            self._emergency_flag = False  # 清除急停标志
+        if self._state is _IDLE_STATE:  # 已空闲(无锁读取快照): 重复的停止指令直接合并
+            return
+        with self._lock:  # 获取写者锁
+            self._state = _IDLE_STATE  # 速度清零, 清除急停标志
         
         logger.info("已切换至空闲状态")  # 记录状态切换日志
     
+    def _finish_timed_move(self, snapshot: tuple) -> bool:
+        """
+        定时移动到期后切换至空闲(仅当状态仍是到期的那次移动时)
+        
+        Args:
+            snapshot: 控制循环本周期读取的状态快照
+            
+        Returns:
+            是否已切换至空闲; 若期间已发布新指令则保留新指令并返回 False
+        """
+        with self._lock:  # 获取写者锁
+            if self._state is not snapshot:  # 快照之后已有新指令(如新的移动或急停)
+                return False
+            self._state = _IDLE_STATE  # 速度清零
+        logger.info("已切换至空闲状态")  # 记录状态切换日志
+        return True
+    
     def get_current_state(self) -> dict:
         """
         获取当前状态(线程安全)
@@ -264,14 +377,14 @@ class ActionManager:
         Returns:
             包含当前速度 动作类型 急停标志的字典
         """
-        with self._lock:  # 获取锁, 保证线程安全
-            state = {  # 构建状态字典
-                "vx": self._target_vx,  # 当前目标前进速度
-                "vy": self._target_vy,  # 当前目标横向速度
-                "vyaw": self._target_vyaw,  # 当前目标旋转速度
-                "action": self._current_action.name,  # 当前动作类型名称
-                "emergency": self._emergency_flag  # 急停标志状态
-            }
+        vx, vy, vyaw, action, emergency = self._state[:5]  # 一次性读取快照(无锁)
+        state = {  # 构建状态字典
+            "vx": vx,  # 当前目标前进速度
+            "vy": vy,  # 当前目标横向速度
+            "vyaw": vyaw,  # 当前目标旋转速度
+            "action": action.name,  # 当前动作类型名称
+            "emergency": emergency  # 急停标志状态
+        }
         return state  # 返回状态字典
     
     def _control_loop(self):
@@ -280,50 +393,62 @@ class ActionManager:
         
         频率: 100Hz (10ms 间隔)
         功能: 发送 Move 命令以维持 SDK 心跳
+        计时: 使用 time.monotonic_ns() 绝对截止时刻(不受 NTP 校时影响),
+              先 sleep 到截止前 200µs, 剩余部分自旋等待, 降低 sleep 唤醒抖动
+        性能: 循环内用到的函数与常量在进入循环前绑定为局部变量,
+              每周期省去模块/实例属性查找(局部变量访问是最快的字节码路径)
         """
         logger.info("控制循环线程已启动")  # 记录控制循环启动日志
+        _apply_thread_scheduling("ControlLoop", self._control_cpu, self._control_rt_priority)  # 绑核/实时调度(可选)
+        
+        loop_interval_ns = 10_000_000  # 循环间隔时间(单位: 纳秒), 对应 100Hz
+        sleep_threshold_ns = 500_000  # 剩余时间超过 500µs 才调用 sleep
+        spin_margin_ns = 200_000  # 截止前最后 200µs 自旋等待
+        
+        # 热路径局部绑定
+        monotonic_ns = time.monotonic_ns  # 单调时钟(纳秒)
+        sleep = time.sleep  # 休眠函数
+        move = self.g1_client.Move  # SDK 移动指令
+        damp = self.g1_client.Damp  # SDK 阻尼指令
+        EMERGENCY = ActionType.EMERGENCY  # 急停动作类型
+        MOVE = ActionType.MOVE  # 移动动作类型
+        IDLE = ActionType.IDLE  # 空闲动作类型
         
-        loop_interval = 0.01  # 循环间隔时间(单位: 秒), 对应 100Hz
-        next_target_time = time.time()  # 初始化基准时间锚点
+        next_target_ns = monotonic_ns()  # 初始化基准时间锚点
         
         while self._running:  # 控制循环主体, 直到 _running 为 False
             # 基于绝对时间计算, 消除累积误差
-            next_target_time += loop_interval
+            next_target_ns += loop_interval_ns
             
             try:
-                # 获取当前目标速度(线程安全)
-                with self._lock:  # 获取锁
-                    vx = self._target_vx  # 读取目标前进速度
-                    vy = self._target_vy  # 读取目标横向速度
-                    vyaw = self._target_vyaw  # 读取目标旋转速度
-                    action = self._current_action  # 读取当前动作类型
+                # 一次性读取本周期所需的全部状态(无锁读取不可变快照)
+                snapshot = self._state
+                vx, vy, vyaw, action, _, duration, start_ns = snapshot
                 
                 # 发送控制指令至机器人
-                if action == ActionType.EMERGENCY:  # 如果是紧急停止状态
-                    self.g1_client.Damp()  # G1 维持阻尼状态
+                if action is EMERGENCY:  # 如果是紧急停止状态
+                    damp()  # G1 维持阻尼状态
                 
-                elif action == ActionType.MOVE or action == ActionType.IDLE:  # 如果是移动或空闲状态
+                elif action is MOVE or action is IDLE:  # 如果是移动或空闲状态
                     # 关键修复: 二次检查 EMERGENCY 状态, 防止竞态条件
-                    # 如果在释放锁后的一瞬间变为 EMERGENCY, 这里会拦截
-                    with self._lock:
-                        if self._current_action == ActionType.EMERGENCY:
-                            self.g1_client.Damp()
-                            logger.warning("在指令发送前检测到急停信号, 已拦截移动指令")
-                            continue  # 跳过本次循环的 Move 调用
+                    # 如果在读取快照后的一瞬间变为 EMERGENCY, 重新读取最新快照的急停标志即可拦截
+                    if self._state[4]:
+                        damp()
+                        logger.warning("在指令发送前检测到急停信号, 已拦截移动指令")
+                        continue  # 跳过本次循环的 Move 调用
                     
-                    # 检查是否超时自动停止
-                    if action == ActionType.MOVE:
-                        with self._lock:
-                            duration = self._move_duration
-                            start_time = self._move_start_time
-                        
-                        if duration is not None and (time.time() - start_time > duration):  # 检查是否超过指定持续时间
-                            self.set_idle()
-                            logger.info(f"动作执行完成 ({duration}s), 自动切换至空闲状态")
+                    # 检查是否超时自动停止(持续时间已随快照读出, 无需再次加锁)
+                    if action is MOVE and duration is not None:
+                        if monotonic_ns() - start_ns > duration * 1e9:  # 检查是否超过指定持续时间
+                            if self._finish_timed_move(snapshot):  # 仅在期间没有新指令时切换至空闲
+                                vx = vy = vyaw = 0.0  # 本次循环发送 0 速度
+                                logger.info("动作执行完成 (%ss), 自动切换至空闲状态", duration)
                             # 移除 continue，确保本次循环发送 StopMove/0速度 以维持心跳
 
                     # 发送移动指令到G1机器人（由守护线程100Hz持续发送以维持心跳）
-                    self.g1_client.Move(vx, vy, vyaw)  # 调用SDK Move方法
+                    # 注: SDK 为纯 Python RPC(json 编码 → cyclonedds 写入 → Condition 等待应答),
+                    #     等待应答期间已释放 GIL, 仅编码/写入阶段持有 GIL
+                    move(vx, vy, vyaw)  # 调用SDK Move方法
                 
                 # 循环计数器自增
                 self._loop_count += 1  # 增加循环计数
@@ -332,10 +457,10 @@ class ActionManager:
                 # 优化: 改为每 10 秒输出一次 (1000次循环)
                 if self._loop_count % 1000 == 0:  # 每 1000 次循环
                     # 优化频率计算公式: 使用两次报告间的实际时间差
-                    current_time = time.time()
-                    elapsed = current_time - self._last_report_time
+                    current_ns = monotonic_ns()
+                    elapsed = (current_ns - self._last_report_ns) / 1e9  # 两次报告间隔(秒)
                     actual_freq = 1000.0 / elapsed if elapsed > 0 else 0.0  # 计算实际循环频率(Hz)
-                    self._last_report_time = current_time
+                    self._last_report_ns = current_ns
                     
                     # 已禁用 FSM 状态查询（每次查询耗时较长，影响100Hz循环频率）
                     # fsm_id = -1
@@ -345,28 +470,31 @@ class ActionManager:
                         # pass
                     
                     logger.info(
-                        f"[心跳] 循环计数: {self._loop_count}, "  # 记录循环计数
-                        f"频率: {actual_freq:.1f}Hz, "  # 记录实际频率
-                        # f"FSM: {fsm_id}, "  # 记录机器人物理状态
-                        f"状态: {action.name}, "  # 记录当前动作类型
-                        f"速度: ({vx:.2f}, {vy:.2f}, {vyaw:.2f})"  # 记录当前速度
+                        "[心跳] 循环计数: %d, "  # 记录循环计数
+                        "频率: %.1fHz, "  # 记录实际频率
+                        # "FSM: %d, "  # 记录机器人物理状态
+                        "状态: %s, "  # 记录当前动作类型
+                        "速度: (%.2f, %.2f, %.2f)",  # 记录当前速度
+                        self._loop_count, actual_freq, action.name, vx, vy, vyaw
                     )
                 
             except Exception as e:  # 捕获所有异常, 防止线程崩溃
-                logger.error(f"控制循环异常: {e}", exc_info=True)  # 记录详细错误日志(包含堆栈)
+                logger.error("控制循环异常: %s", e, exc_info=True)  # 记录详细错误日志(包含堆栈)
             
             # 精确控制循环频率(基于绝对时间)
-            current_time = time.time()
-            sleep_time = next_target_time - current_time  # 计算由于耗时导致的剩余休眠时间
+            remaining_ns = next_target_ns - monotonic_ns()  # 距离本周期截止时刻的剩余时间
             
-            if sleep_time > 0:  # 如果需要休眠
-                time.sleep(sleep_time)  # 休眠指定时间
+            if remaining_ns > 0:  # 如果需要等待
+                if remaining_ns > sleep_threshold_ns:  # 剩余时间较长, 先休眠
+                    sleep((remaining_ns - spin_margin_ns) / 1e9)  # 休眠到截止前 200µs
+                while monotonic_ns() < next_target_ns:  # 最后一小段自旋等待
+                    pass
             else:  # 如果本次循环耗时超过目标周期
-                lag = -sleep_time
+                lag_ns = -remaining_ns
                 # 仅当滞后超过 100ms 时才重置锚点，允许轻微抖动自动追赶
-                if lag > 0.1:  # 滞后超过100ms
-                    logger.warning(f"循环严重滞后 {lag*1000:.1f}ms, 重置时间锚点")
-                    next_target_time = current_time
+                if lag_ns > 100_000_000:  # 滞后超过100ms
+                    logger.warning("循环严重滞后 %.1fms, 重置时间锚点", lag_ns / 1e6)
+                    next_target_ns = monotonic_ns()
                 # 否则不重置，下一次循环将尝试追赶
         
         logger.info("控制循环线程已退出")  # 记录控制循环退出日志
@@ -398,9 +526,11 @@ class ActionManager:
                 status=TaskStatus.PENDING  # 初始状态为待执行
             )
             
-            # 添加到队列
-            self._task_queue.append(task)  # 加入队列末尾
-            logger.info(f"[TaskQueue] 任务已添加: {task_id} ({task_type}), 队列长度: {len(self._task_queue)}")  # 记录日志
+            # 添加到队列（唤醒阻塞等待的执行器）
+            self._task_queue.put((self._queue_epoch, task))  # 加入队列末尾，附带当前清空代次
+            # 惰性 % 参数不会跳过 qsize() 的求值；INFO 关闭时跳过它以免额外获取队列锁
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("[TaskQueue] 任务已添加: %s (%s), 队列长度: %d", task_id, task_type, self._task_queue.qsize())  # 记录日志
         
         return task_id  # 返回任务ID
     
@@ -414,22 +544,26 @@ class ActionManager:
         with self._task_lock:  # 获取任务队列锁
             # 将所有未执行的任务标记为已取消
             cancelled_count = 0  # 取消计数器
-            while self._task_queue:  # 遍历队列
-                task = self._task_queue.popleft()  # 从队列头部取出任务
+            self._queue_epoch += 1  # 代次自增：执行器已取出但尚未登记的任务将被视为已取消
+            while True:  # 遍历队列
+                try:
+                    _, task = self._task_queue.get_nowait()  # 从队列头部取出任务
+                except queue.Empty:  # 队列已空
+                    break
                 task.status = TaskStatus.CANCELLED  # 标记为已取消
-                task.end_time = time.time()  # 记录取消时间
-                self._completed_tasks[task.task_id] = task  # 保存到历史记录
+                task.end_time_ns = time.monotonic_ns()  # 记录取消时间
+                self._record_completed(task)  # 保存到历史记录
                 cancelled_count += 1  # 计数器增加
             
             # 如果当前有正在执行的任务，也标记为取消
             if self._current_task:  # 检查当前任务
                 self._current_task.status = TaskStatus.CANCELLED  # 标记为已取消
-                self._current_task.end_time = time.time()  # 记录取消时间
-                self._completed_tasks[self._current_task.task_id] = self._current_task  # 保存到历史记录
+                self._current_task.end_time_ns = time.monotonic_ns()  # 记录取消时间
+                self._record_completed(self._current_task)  # 保存到历史记录
                 self._current_task = None  # 清空当前任务
-                logger.info(f"[TaskQueue] 当前任务已取消")  # 记录日志
+                logger.info("[TaskQueue] 当前任务已取消")  # 记录日志
             
-            logger.info(f"[TaskQueue] 队列已清空，共取消 {cancelled_count} 个待执行任务")  # 记录日志
+            logger.info("[TaskQueue] 队列已清空，共取消 %d 个待执行任务", cancelled_count)  # 记录日志
         
         return cancelled_count  # 返回取消的任务数量
     
@@ -444,17 +578,25 @@ class ActionManager:
             任务状态字典，包含 task_id, task_type, status, created_time等信息
             如果任务不存在，返回 None
         """
+        # 快速路径: 已结束的任务进入历史记录后不再变化, 无锁查询即可
+        # (OrderedDict.get 为单次 C 层调用, 在 GIL 下与写者的插入/淘汰互不破坏)
+        task = self._completed_tasks.get(task_id)  # 无锁查询历史记录
+        if task is not None:
+            return self._task_to_dict(task)  # 返回任务信息
+        
         with self._task_lock:  # 获取任务队列锁
             # 检查当前任务
             if self._current_task and self._current_task.task_id == task_id:  # 如果是当前任务
                 return self._task_to_dict(self._current_task)  # 返回任务信息
             
-            # 检查队列中的任务
-            for task in self._task_queue:  # 遍历队列
+            # 检查队列中的任务（持有队列内部锁遍历底层 deque）
+            with self._task_queue.mutex:  # 获取队列内部锁
+                pending = [task for _, task in self._task_queue.queue]  # 复制待执行任务列表
+            for task in pending:  # 遍历队列
                 if task.task_id == task_id:  # 找到目标任务
                     return self._task_to_dict(task)  # 返回任务信息
             
-            # 检查已完成的任务
+            # 再次检查已完成的任务（无锁查询后该任务可能刚刚结束）
             if task_id in self._completed_tasks:  # 检查历史记录
                 return self._task_to_dict(self._completed_tasks[task_id])  # 返回任务信息
         
@@ -476,9 +618,9 @@ class ActionManager:
             "parameters": task.parameters,  # 任务参数
             "duration": task.duration,  # 持续时间
             "status": task.status.value,  # 任务状态（转换为字符串）
-            "created_time": task.created_time,  # 创建时间
-            "start_time": task.start_time,  # 开始时间
-            "end_time": task.end_time  # 结束时间
+            "created_time": _ns_to_seconds(task.created_time_ns),  # 创建时间（epoch 秒）
+            "start_time": _ns_to_seconds(task.start_time_ns),  # 开始时间（epoch 秒）
+            "end_time": _ns_to_seconds(task.end_time_ns)  # 结束时间（epoch 秒）
         }
     
     def _task_executor_loop(self):
@@ -492,22 +634,31 @@ class ActionManager:
         4. 支持任务超时保护
         """
         logger.info("[TaskExecutor] 任务执行器线程已启动")  # 记录启动日志
+        _apply_thread_scheduling("TaskExecutor", self._executor_cpu)  # 绑核(可选)
         
         while self._task_executor_running:  # 主循环
             try:
-                current_task = None  # 初始化当前任务
+                # 阻塞等待新任务（超时仅用于定期检查运行标志，add_task 会立即唤醒）
+                try:
+                    epoch, current_task = self._task_queue.get(timeout=0.5)  # 从队列头部取出任务
+                except queue.Empty:  # 等待超时，队列为空
+                    continue
                 
-                # 从队列中取出任务（线程安全）
+                # 登记为当前任务（线程安全）
                 with self._task_lock:  # 获取任务队列锁
-                    if len(self._task_queue) > 0:  # 检查队列是否有任务
-                        current_task = self._task_queue.popleft()  # 从队列头部取出任务
+                    if epoch != self._queue_epoch:  # 取出后、登记前队列已被清空（急停或打断）
+                        current_task.status = TaskStatus.CANCELLED  # 标记为已取消
+                        current_task.end_time_ns = time.monotonic_ns()  # 记录取消时间
+                        self._record_completed(current_task)  # 保存到历史记录
+                        current_task = None  # 不再执行
+                    else:
                         self._current_task = current_task  # 设置为当前任务
                         current_task.status = TaskStatus.RUNNING  # 标记为执行中
-                        current_task.start_time = time.time()  # 记录开始时间
+                        current_task.start_time_ns = time.monotonic_ns()  # 记录开始时间
                 
                 # 如果有任务，执行它
                 if current_task:  # 检查是否取到任务
-                    logger.info(f"[TaskExecutor] 开始执行任务: {current_task.task_id} ({current_task.task_type})")  # 记录日志
+                    logger.info("[TaskExecutor] 开始执行任务: %s (%s)", current_task.task_id, current_task.task_type)  # 记录日志
                     
                     try:
                         # 根据任务类型执行相应操作
@@ -521,41 +672,47 @@ class ActionManager:
                             self._execute_stop_task(current_task)  # 执行停止任务
                         
                         else:  # 未知任务类型
-                            logger.error(f"[TaskExecutor] 未知任务类型: {current_task.task_type}")  # 记录错误
+                            logger.error("[TaskExecutor] 未知任务类型: %s", current_task.task_type)  # 记录错误
                             current_task.status = TaskStatus.FAILED  # 标记为失败
                         
                         # 任务执行完成
                         if current_task.status == TaskStatus.RUNNING:  # 如果仍在执行中（未被取消）
                             current_task.status = TaskStatus.COMPLETED  # 标记为已完成
-                            logger.info(f"[TaskExecutor] 任务完成: {current_task.task_id}")  # 记录日志
+                            logger.info("[TaskExecutor] 任务完成: %s", current_task.task_id)  # 记录日志
                     
                     except Exception as e:  # 捕获任务执行异常
-                        logger.error(f"[TaskExecutor] 任务执行失败: {current_task.task_id}, 错误: {e}", exc_info=True)  # 记录错误
+                        logger.error("[TaskExecutor] 任务执行失败: %s, 错误: %s", current_task.task_id, e, exc_info=True)  # 记录错误
                         current_task.status = TaskStatus.FAILED  # 标记为失败
                     
                     finally:  # 无论成功或失败都执行
-                        current_task.end_time = time.time()  # 记录结束时间
+                        current_task.end_time_ns = time.monotonic_ns()  # 记录结束时间
                         
                         # 保存到历史记录（线程安全）
                         with self._task_lock:  # 获取任务队列锁
-                            self._completed_tasks[current_task.task_id] = current_task  # 保存到历史记录
+                            self._record_completed(current_task)  # 保存到历史记录（自动淘汰最早记录）
                             self._current_task = None  # 清空当前任务
-                            
-                            # 限制历史记录大小，防止内存泄漏
-                            if len(self._completed_tasks) > self._max_history_size:  # 检查历史记录大小
-                                # 移除最早的任务记录
-                                oldest_task_id = min(self._completed_tasks.keys(), key=lambda k: self._completed_tasks[k].created_time)  # 找到最早的任务
-                                del self._completed_tasks[oldest_task_id]  # 删除
-                
-                else:  # 队列为空
-                    time.sleep(0.05)  # 休眠50ms，避免空转消耗CPU
             
             except Exception as e:  # 捕获所有异常
-                logger.error(f"[TaskExecutor] 执行器循环异常: {e}", exc_info=True)  # 记录错误
+                logger.error("[TaskExecutor] 执行器循环异常: %s", e, exc_info=True)  # 记录错误
                 time.sleep(0.1)  # 发生异常时休眠100ms
         
         logger.info("[TaskExecutor] 任务执行器线程已退出")  # 记录退出日志
     
+    def _record_completed(self, task: RobotTask):
+        """
+        保存任务到历史记录，并限制历史记录大小（调用方需持有 _task_lock）
+        
+        Args:
+            task: 已结束（完成/失败/取消）的 RobotTask 对象
+        """
+        history = self._completed_tasks  # 本地引用
+        history[task.task_id] = task  # 保存到历史记录
+        history.move_to_end(task.task_id)  # 重复登记（如先取消后结束）时移到末尾
+        
+        # 限制历史记录大小，防止内存泄漏
+        while len(history) > self._max_history_size:  # 检查历史记录大小
+            history.popitem(last=False)  # O(1) 移除最早的任务记录
+    
     def _execute_move_task(self, task: RobotTask):
         """
         执行移动任务
@@ -569,7 +726,7 @@ class ActionManager:
         vyaw = params.get("vyaw", 0.0)  # 旋转速度
         duration = task.duration  # 持续时间
         
-        logger.info(f"[TaskExecutor] 移动: vx={vx:.2f}, vy={vy:.2f}, vyaw={vyaw:.2f}, duration={duration:.2f}s")  # 记录日志
+        logger.info("[TaskExecutor] 移动: vx=%.2f, vy=%.2f, vyaw=%.2f, duration=%.2fs", vx, vy, vyaw, duration)  # 记录日志
         
         # 调用现有的控制接口
         self.update_target_velocity(vx, vy, vyaw, duration)  # 设置目标速度
@@ -588,7 +745,7 @@ class ActionManager:
         vyaw = params.get("vyaw", 0.0)  # 旋转速度
         duration = task.duration  # 持续时间
         
-        logger.info(f"[TaskExecutor] 旋转: vyaw={vyaw:.2f}, duration={duration:.2f}s")  # 记录日志
+        logger.info("[TaskExecutor] 旋转: vyaw=%.2f, duration=%.2fs", vyaw, duration)  # 记录日志
         
         # 调用现有的控制接口
         self.update_target_velocity(0.0, 0.0, vyaw, duration)  # 设置旋转速度
@@ -603,6 +760,6 @@ class ActionManager:
         Args:
             task: RobotTask 对象
         """
-        logger.info(f"[TaskExecutor] 停止机器人")  # 记录日志
+        logger.info("[TaskExecutor] 停止机器人")  # 记录日志
         self.set_idle()  # 调用停止方法
 
@@ -15,9 +15,18 @@
 Linux 安装：
     sudo apt-get install libspeexdsp-dev
     pip install speexdsp-python
+
+后端：
+    优先通过 ctypes 直接调用 libspeexdsp 的 C 接口（无 Python 包装层的逐帧
+    bytes ↔ std::string 转换，输出写入预分配缓冲区）；
+    系统库不可加载时回退到 speexdsp-python 绑定。
 """
 
+import ctypes
+import ctypes.util
+import functools
 import logging
+import math
 import numpy as np
 from scipy import signal
 from typing import Optional
@@ -28,14 +37,193 @@ logger = logging.getLogger(__name__)  # 创建模块级日志记录器
 # 尝试导入 speexdsp（Linux 环境可用）
 try:
     import speexdsp  # 导入 speexdsp 库
-    SPEEXDSP_AVAILABLE = True  # 标记库可用
+    _SPEEXDSP_BINDING = True  # 标记绑定可用
     logger.info("[AEC] speexdsp 库加载成功")  # 记录成功信息
 except ImportError as e:  # 捕获导入异常
-    SPEEXDSP_AVAILABLE = False  # 标记库不可用
-    logger.warning(f"[AEC] speexdsp 库未安装: {e}")  # 记录警告信息
+    _SPEEXDSP_BINDING = False  # 标记绑定不可用
+    logger.warning("[AEC] speexdsp 库未安装: %s", e)  # 记录警告信息
+
+
+_SPEEX_ECHO_SET_SAMPLING_RATE = 24  # speex_echo.h: 设置采样率的 ctl 请求号
+
+
+def _load_libspeexdsp():
+    """
+    通过 ctypes 加载系统 libspeexdsp 并声明回声消除相关函数签名
+
+    Returns:
+        ctypes.CDLL 实例；库不存在或缺少符号时返回 None
+    """
+    for name in (ctypes.util.find_library("speexdsp"), "libspeexdsp.so.1"):  # 依次尝试
+        if not name:
+            continue
+        try:
+            lib = ctypes.CDLL(name)  # 加载动态库
+            lib.speex_echo_state_init.argtypes = [ctypes.c_int, ctypes.c_int]
+            lib.speex_echo_state_init.restype = ctypes.c_void_p
+            lib.speex_echo_ctl.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p]
+            lib.speex_echo_ctl.restype = ctypes.c_int
+            lib.speex_echo_cancellation.argtypes = [ctypes.c_void_p] * 4  # (state, mic, ref, out)
+            lib.speex_echo_cancellation.restype = None
+            lib.speex_echo_state_reset.argtypes = [ctypes.c_void_p]
+            lib.speex_echo_state_reset.restype = None
+            lib.speex_echo_state_destroy.argtypes = [ctypes.c_void_p]
+            lib.speex_echo_state_destroy.restype = None
+            return lib
+        except (OSError, AttributeError):  # 加载失败或符号缺失
+            continue
+    return None
+
+
+_LIBSPEEXDSP = _load_libspeexdsp()  # ctypes 后端（None 表示不可用）
+SPEEXDSP_AVAILABLE = _SPEEXDSP_BINDING or _LIBSPEEXDSP is not None  # 任一后端可用即可启用 AEC
+if _LIBSPEEXDSP is not None:
+    logger.info("[AEC] libspeexdsp C 接口加载成功（ctypes 后端）")  # 记录成功信息
+elif not SPEEXDSP_AVAILABLE:
     logger.warning("[AEC] 回声消除功能将被禁用")  # 提示功能不可用
 
 
+# 24kHz → 16kHz（上采样 2、下采样 3）固定比例的抗混叠低通 FIR，模块加载时预计算一次
+# 截止频率 1/3（相对上采样后 Nyquist），奇数阶数保证 resample_poly 的群时延可被精确补偿
+_RESAMPLE_24K_16K_TAPS = signal.firwin(61, 1.0 / 3.0, window='hamming').astype(np.float32)
+
+# 直接调用 upfirdn 所需的滤波器：按 resample_poly 的做法乘以上采样倍数、前置补零对齐群时延，
+# 一次性算好后每块音频只剩卷积本身（省去 resample_poly 每次调用的系数拷贝、补零与参数校验）
+_RESAMPLE_24K_16K_PRE_PAD = 3 - (len(_RESAMPLE_24K_16K_TAPS) // 2) % 3  # 前置补零数（down - half_len % down）
+_RESAMPLE_24K_16K_H = np.concatenate((
+    np.zeros(_RESAMPLE_24K_16K_PRE_PAD, dtype=np.float32),
+    _RESAMPLE_24K_16K_TAPS * 2,
+)).astype(np.float32)  # 补零并乘以上采样倍数后的滤波器
+_RESAMPLE_24K_16K_DELAY = (len(_RESAMPLE_24K_16K_TAPS) // 2 + _RESAMPLE_24K_16K_PRE_PAD) // 3  # 输出端需丢弃的前导样本数
+
+
+def _resample_24k_to_16k_f32(x: np.ndarray) -> np.ndarray:
+    """
+    24kHz → 16kHz 多相 FIR 重采样（float32 输入输出，结果与 resample_poly 一致）
+
+    Args:
+        x: 24kHz float32 样本
+
+    Returns:
+        16kHz float32 样本（长度 ceil(len(x) * 2 / 3)）
+    """
+    n_out = -(-len(x) * 2 // 3)  # 输出样本数（向上取整）
+    y = signal.upfirdn(_RESAMPLE_24K_16K_H, x, 2, 3)  # 上采样 → FIR → 下采样
+    return y[_RESAMPLE_24K_16K_DELAY:_RESAMPLE_24K_16K_DELAY + n_out]  # 去掉群时延与尾部
+
+
+@functools.lru_cache(maxsize=8)
+def _poly_resample_plan(src_sr: int, dst_sr: int) -> tuple:
+    """
+    任意整数采样率比例的 upfirdn 参数（与 resample_poly 默认 Kaiser 窗设计一致），按比例缓存
+
+    Returns:
+        (up, down, h, delay)：上/下采样倍数、补零并乘以 up 后的滤波器、输出端需丢弃的前导样本数
+    """
+    g = math.gcd(src_sr, dst_sr)  # 约分
+    up, down = dst_sr // g, src_sr // g  # 最简有理比例（如 24000→44100 为 147/80）
+    max_rate = max(up, down)  # 决定截止频率与阶数
+    half_len = 10 * max_rate  # resample_poly 的默认半长
+    taps = signal.firwin(2 * half_len + 1, 1.0 / max_rate, window=('kaiser', 5.0))  # 抗混叠/镜像低通
+    pre_pad = down - half_len % down  # 前置补零数
+    h = np.concatenate((np.zeros(pre_pad), taps * up)).astype(np.float32)  # 补零并乘以上采样倍数
+    delay = (half_len + pre_pad) // down  # 群时延（输出样本数）
+    return up, down, h, delay
+
+
+def _resample_poly_f32(x: np.ndarray, src_sr: int, dst_sr: int) -> np.ndarray:
+    """
+    任意比例多相 FIR 重采样（float32 输入输出，结果与 resample_poly 一致）
+
+    Args:
+        x: 源采样率 float32 样本
+        src_sr: 源采样率
+        dst_sr: 目标采样率
+
+    Returns:
+        目标采样率 float32 样本（长度 ceil(len(x) * up / down)）
+    """
+    up, down, h, delay = _poly_resample_plan(src_sr, dst_sr)  # 缓存的滤波器
+    n_out = -(-len(x) * up // down)  # 输出样本数（向上取整）
+    y = signal.upfirdn(h, x, up, down)  # 上采样 → FIR → 下采样
+    return y[delay:delay + n_out]  # 去掉群时延与尾部
+
+
+class _CtypesEchoCanceller:
+    """
+    基于 ctypes 的 Speex 回声消除器（与 speexdsp.EchoCanceller 接口一致）
+
+    直接持有 SpeexEchoState 指针：输入 bytes 以只读指针传入 C 函数（不拷贝），
+    输出写入预分配缓冲区，支持 reset() 原地清零自适应滤波器。
+    """
+
+    def __init__(self, frame_size: int, filter_length: int, sample_rate: int):
+        """
+        创建 SpeexEchoState
+
+        Args:
+            frame_size: 每帧样本数
+            filter_length: 自适应滤波器长度
+            sample_rate: 采样率
+        """
+        self._lib = _LIBSPEEXDSP  # 持有库引用，保证析构时可用
+        state = self._lib.speex_echo_state_init(frame_size, filter_length)  # 创建回声消除状态
+        if not state:
+            raise RuntimeError("speex_echo_state_init 返回空指针")
+        rate = ctypes.c_int(sample_rate)
+        self._lib.speex_echo_ctl(state, _SPEEX_ECHO_SET_SAMPLING_RATE, ctypes.byref(rate))  # 设置采样率
+        self._state = state  # SpeexEchoState 指针
+        self._frame_bytes = frame_size * 2  # 每帧字节数
+        self._out = ctypes.create_string_buffer(self._frame_bytes)  # 预分配单帧输出缓冲区
+
+    def process(self, near: bytes, far: bytes) -> bytes:
+        """
+        单帧回声消除
+
+        Args:
+            near: 麦克风帧（frame_size 个 int16 样本）
+            far: 参考帧（frame_size 个 int16 样本）
+
+        Returns:
+            清洗后的帧
+        """
+        self._lib.speex_echo_cancellation(self._state, near, far, self._out)
+        return self._out.raw
+
+    def process_block(self, near: bytes, far: bytes) -> bytes:
+        """
+        整块回声消除（长度为整帧倍数），逐帧传入指针偏移，不做切片拷贝
+
+        Args:
+            near: 麦克风数据（长度为帧字节数的整数倍）
+            far: 参考数据（与 near 等长）
+
+        Returns:
+            清洗后的数据（与 near 等长）
+        """
+        total = len(near)  # 总字节数
+        out = ctypes.create_string_buffer(total)  # 整块输出缓冲区
+        near_ptr = ctypes.cast(ctypes.c_char_p(near), ctypes.c_void_p).value  # bytes 内部缓冲区地址
+        far_ptr = ctypes.cast(ctypes.c_char_p(far), ctypes.c_void_p).value
+        out_ptr = ctypes.addressof(out)
+        cancel = self._lib.speex_echo_cancellation  # 局部绑定
+        state = self._state
+        for offset in range(0, total, self._frame_bytes):  # 逐帧处理
+            cancel(state, near_ptr + offset, far_ptr + offset, out_ptr + offset)
+        return out.raw
+
+    def reset(self):
+        """原地清零自适应滤波器状态（speex_echo_state_reset）"""
+        self._lib.speex_echo_state_reset(self._state)
+
+    def __del__(self):
+        """释放 SpeexEchoState"""
+        state = getattr(self, "_state", None)
+        if state:
+            self._lib.speex_echo_state_destroy(state)
+            self._state = None
+
+
 class AECProcessor:
     """
     音频回声消除（AEC）处理器
@@ -83,22 +271,28 @@ class AECProcessor:
             logger.warning("[AEC] 处理器未启用（库不可用或手动禁用）")  # 记录警告
     
     def _initialize_echo_canceller(self):
-        """初始化 speexdsp EchoCanceller"""
+        """初始化 EchoCanceller（优先 ctypes 直连 libspeexdsp，否则使用 speexdsp 绑定）"""
         try:
-            self.echo_canceller = speexdsp.EchoCanceller.create(
-                self.frame_size,  # 帧大小
-                self.filter_length,  # 滤波器长度
-                self.sample_rate  # 采样率
-            )
+            if _LIBSPEEXDSP is not None:  # ctypes 后端可用
+                self.echo_canceller = _CtypesEchoCanceller(
+                    self.frame_size,  # 帧大小
+                    self.filter_length,  # 滤波器长度
+                    self.sample_rate  # 采样率
+                )
+            else:
+                self.echo_canceller = speexdsp.EchoCanceller.create(
+                    self.frame_size,  # 帧大小
+                    self.filter_length,  # 滤波器长度
+                    self.sample_rate  # 采样率
+                )
             logger.info(
-                f"[AEC] EchoCanceller 初始化成功 "
-                f"(frame_size={self.frame_size}, "
-                f"filter_length={self.filter_length}, "
-                f"sample_rate={self.sample_rate})"
+                "[AEC] EchoCanceller 初始化成功 "
+                "(frame_size=%d, filter_length=%d, sample_rate=%d)",
+                self.frame_size, self.filter_length, self.sample_rate
             )  # 记录初始化成功
         except Exception as e:  # 捕获异常
             self.enabled = False  # 禁用 AEC
-            logger.error(f"[AEC] EchoCanceller 初始化失败: {e}")  # 记录错误
+            logger.error("[AEC] EchoCanceller 初始化失败: %s", e)  # 记录错误
     
     def process(self, mic_frame: bytes, reference_frame: bytes) -> bytes:
         """
@@ -123,8 +317,8 @@ class AECProcessor:
         expected_bytes = self.frame_size * 2  # 16-bit = 2 bytes/sample
         if len(mic_frame) != expected_bytes:  # 检查麦克风帧长度
             logger.warning(
-                f"[AEC] 麦克风帧长度错误: 期望 {expected_bytes} 字节，"
-                f"实际 {len(mic_frame)} 字节，跳过处理"
+                "[AEC] 麦克风帧长度错误: 期望 %d 字节，实际 %d 字节，跳过处理",
+                expected_bytes, len(mic_frame)
             )
             return mic_frame  # 返回原始数据
         
@@ -141,9 +335,55 @@ class AECProcessor:
             return cleaned_frame  # 返回清洗后的数据
         
         except Exception as e:  # 捕获处理异常
-            logger.error(f"[AEC] 处理失败: {e}")  # 记录错误
+            logger.error("[AEC] 处理失败: %s", e)  # 记录错误
             return mic_frame  # 失败时返回原始数据
-    
+
+    def process_batch(self, mic_data: bytes, reference_data: bytes) -> bytes:
+        """
+        批量执行回声消除（一次调用处理整块音频，如 200ms = 10 帧）
+
+        与逐帧调用 process() 相比，长度校验、补零与方法查找只做一次，
+        帧循环内只剩切片与 speexdsp 调用，减少解释器往返与临时对象分配。
+
+        Args:
+            mic_data: 麦克风 PCM 数据（16-bit 单声道，任意长度，不足整帧时尾部补零处理）
+            reference_data: 参考信号 PCM 数据（不足补零，超出截断到与麦克风等长）
+
+        Returns:
+            清洗后的音频数据（与 mic_data 等长）；AEC 未启用或处理失败时返回原始数据
+        """
+        # 快速路径：AEC 未启用或无数据，直接返回原始数据
+        if not self.enabled or self.echo_canceller is None or not mic_data:
+            return mic_data  # 直通模式
+
+        frame_bytes = self.frame_size * 2  # 每帧字节数（16-bit = 2 bytes/sample）
+        total_bytes = len(mic_data)  # 原始长度（输出按此截断）
+
+        # 尾部不足一帧时补零（整块只补一次）
+        pad_bytes = -total_bytes % frame_bytes  # 补齐到整帧所需字节数
+        mic_buf = mic_data + b'\x00' * pad_bytes if pad_bytes else mic_data  # 对齐后的麦克风数据
+
+        # 参考信号对齐到麦克风长度（补零或截断）
+        ref_buf = reference_data[:len(mic_buf)]  # 超出截断
+        if len(ref_buf) < len(mic_buf):  # 不足补零
+            ref_buf += b'\x00' * (len(mic_buf) - len(ref_buf))
+
+        process_block = getattr(self.echo_canceller, "process_block", None)  # ctypes 后端整块接口
+        cancel = self.echo_canceller.process  # 局部绑定，避免循环内重复属性查找
+        try:
+            if process_block is not None:  # 整块处理，无逐帧切片
+                cleaned = process_block(bytes(mic_buf), bytes(ref_buf))
+            else:
+                cleaned = b"".join([
+                    cancel(mic_buf[i:i + frame_bytes], ref_buf[i:i + frame_bytes])
+                    for i in range(0, len(mic_buf), frame_bytes)
+                ])  # 逐帧消除并一次性拼接
+        except Exception as e:  # 捕获处理异常
+            logger.error("[AEC] 批量处理失败: %s", e)  # 记录错误
+            return mic_data  # 失败时返回原始数据
+
+        return cleaned[:total_bytes] if pad_bytes else cleaned  # 去掉补零部分
+
     def reset(self):
         """
         重置 AEC 状态
@@ -154,11 +394,77 @@ class AECProcessor:
             return  # AEC 未启用，无需操作
         
         try:
-            # 重新创建 EchoCanceller 实例（等效于重置）
-            self._initialize_echo_canceller()
+            reset_in_place = getattr(self.echo_canceller, "reset", None)  # 绑定是否提供原地重置
+            if callable(reset_in_place):
+                # 原地清零自适应滤波器（speex_echo_state_reset），无需重新分配滤波器内存
+                reset_in_place()
+            else:
+                # 绑定未暴露重置接口时，重新创建 EchoCanceller 实例（等效于重置）
+                self._initialize_echo_canceller()
             logger.info("[AEC] 状态已重置")  # 记录重置成功
         except Exception as e:  # 捕获异常
-            logger.error(f"[AEC] 重置失败: {e}")  # 记录错误
+            logger.error("[AEC] 重置失败: %s", e)  # 记录错误
+
+
+class StreamingResampler:
+    """
+    流式多相 FIR 重采样器（跨块保持滤波器状态）
+
+    逐块调用 process() 的输出与把所有块拼接后一次性处理完全一致：每块都从上一块留下的
+    输入历史继续卷积，块边界没有滤波器重新起振造成的跳变（咔哒声）。
+    输出是因果的（不补偿群时延，相对输入滞后约半个滤波器长度，24k→16k 约 0.7ms）；
+    累计输出样本数始终为 ceil(累计输入 × dst / src)，与无状态 resample() 的逐块长度规则相同。
+
+    非线程安全：每条音频流一个实例，由单个线程调用。
+    """
+
+    def __init__(self, src_sr: int, dst_sr: int):
+        """
+        Args:
+            src_sr: 源采样率
+            dst_sr: 目标采样率
+        """
+        if (src_sr, dst_sr) == (24000, 16000):  # 与 AEC 参考路径一致的 61 阶滤波器
+            self._up, self._down, self._h = 2, 3, _RESAMPLE_24K_16K_H
+        else:
+            self._up, self._down, self._h, _ = _poly_resample_plan(src_sr, dst_sr)  # 按比例缓存的滤波器
+        self.reset()
+
+    def reset(self):
+        """清空滤波器状态（新的音频流从静音开始，如打断后的下一条回复）"""
+        self._hist = np.zeros(0, dtype=np.float32)  # 尚需参与卷积的输入历史
+        self._hist_start = 0  # 历史首样本的全局输入序号（始终为 down 的整数倍）
+        self._n_in = 0  # 累计输入样本数
+        self._n_out = 0  # 累计输出样本数
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """
+        重采样一块 int16 样本
+
+        Args:
+            samples: 源采样率 int16 样本
+
+        Returns:
+            目标采样率 int16 样本
+        """
+        up, down, h = self._up, self._down, self._h
+        xx = np.concatenate((self._hist, samples.astype(np.float32)))  # 历史 + 本块
+        n_in = self._n_in + len(samples)  # 累计输入
+        n_out = -(-n_in * up // down)  # 累计应输出样本数（向上取整）
+        # upfirdn 的第 j 个输出对应全局输出序号 hist_start * up / down + j（hist_start 为 down 的倍数，恰好整除）
+        base = self._hist_start * up // down
+        # upfirdn 是编译实现，卷积本身不经过 Python 循环（逐输出的 numba 内核为保持逐位一致无法向量化，实测反而更慢）
+        y = signal.upfirdn(h, xx, up, down)[self._n_out - base:n_out - base]  # 只取本块新增的输出
+        np.clip(y, -32768, 32767, out=y)  # 原地限幅
+        np.rint(y, out=y)  # 原地四舍五入
+
+        # 保留下一个输出所需的最早输入（向下对齐到 down 的倍数，保持上面的整除关系）
+        need = max(0, -(-(n_out * down - len(h) + 1) // up))  # 下一个输出用到的最早输入序号
+        start = need // down * down
+        self._hist = xx[start - self._hist_start:]
+        self._hist_start = start
+        self._n_in, self._n_out = n_in, n_out
+        return y.astype(np.int16)
 
 
 class AudioResampler:
@@ -167,9 +473,54 @@ class AudioResampler:
     
     用于将播放器的 24kHz 音频重采样到麦克风的 16kHz，以便参考信号与麦克风信号匹配。
     
-    使用 scipy.signal.resample 实现高质量重采样。
+    24kHz → 16kHz 使用预计算系数的多相 FIR（直接调用 scipy.signal.upfirdn），
+    任意比例的 resample() 同样走多相 FIR：按比例约分出升/降采样倍数，
+    由 _poly_resample_plan 缓存滤波器系数后调用 upfirdn。
+    
+    实例持有预分配的 float32 / int16 工作缓冲区，供播放线程的实时路径
+    （resample_24k_to_16k_view）复用，避免每块音频分配中间数组和 bytes 对象。
+
+    所有方法都是无状态的：每次调用的滤波器从零状态开始，分块处理连续音频时块边界会出现
+    不连续（幅度可达信号幅度的量级）。连续音频流请使用 StreamingResampler。
     """
     
+    def __init__(self, max_samples_24k: int = 24000):
+        """
+        初始化重采样器
+        
+        Args:
+            max_samples_24k: 单次输入的预期最大样本数（默认 1 秒 @ 24kHz，超出时自动扩容）
+        """
+        self._scratch_f32 = np.empty(max_samples_24k, dtype=np.float32)  # 输入转换工作区
+        self._scratch_i16 = np.empty(max_samples_24k * 2 // 3 + 1, dtype=np.int16)  # 输出工作区
+    
+    def resample_24k_to_16k_view(self, data_24k) -> np.ndarray:
+        """
+        将 24kHz PCM 数据重采样到 16kHz，结果写入实例工作缓冲区
+        
+        Args:
+            data_24k: 24kHz 单声道 16-bit PCM 数据（bytes / memoryview）
+        
+        Returns:
+            指向内部缓冲区的 16kHz int16 视图，仅在下一次调用前有效，
+            调用方需立即消费（如写入环形缓冲区）
+        """
+        samples_24k = np.frombuffer(data_24k, dtype=np.int16)  # 零拷贝解析为 int16 数组
+        n_in = len(samples_24k)  # 输入样本数
+        if n_in > len(self._scratch_f32):  # 超出预分配大小，扩容
+            self._scratch_f32 = np.empty(n_in, dtype=np.float32)
+            self._scratch_i16 = np.empty(n_in * 2 // 3 + 1, dtype=np.int16)
+        
+        x = self._scratch_f32[:n_in]  # 复用输入工作区
+        np.copyto(x, samples_24k)  # int16 → float32（不分配新数组）
+        y = _resample_24k_to_16k_f32(x)  # 多相 FIR 重采样
+        np.clip(y, -32768, 32767, out=y)  # 原地限幅
+        np.rint(y, out=y)  # 原地四舍五入（避免截断带来的直流偏置）
+        
+        out = self._scratch_i16[:len(y)]  # 复用输出工作区
+        np.copyto(out, y, casting='unsafe')  # float32 → int16（不分配新数组）
+        return out
+    
     @staticmethod
     def resample_24k_to_16k(data_24k: bytes) -> bytes:
         """
@@ -188,19 +539,18 @@ class AudioResampler:
             # 转为 numpy array
             samples_24k = np.frombuffer(data_24k, dtype=np.int16)  # 解析为 int16 数组
             
-            # 计算重采样后的样本数（16000/24000 = 2/3）
-            num_samples_16k = int(len(samples_24k) * 16000 / 24000)  # 计算目标样本数
-            
-            # 执行重采样（使用 scipy.signal.resample）
-            samples_16k = signal.resample(samples_24k, num_samples_16k)  # 重采样
+            # 多相 FIR 重采样（up=2, down=3），代价 O(N·taps)，远低于 FFT 方案
+            samples_16k = _resample_24k_to_16k_f32(samples_24k.astype(np.float32))  # 重采样（float32 全程计算）
             
-            # 转回 int16 并转为 bytes
-            samples_16k_int16 = np.clip(samples_16k, -32768, 32767).astype(np.int16)  # 限幅并转换类型
+            # 原地限幅、取整后转回 int16
+            np.clip(samples_16k, -32768, 32767, out=samples_16k)  # 原地限幅
+            np.rint(samples_16k, out=samples_16k)  # 原地四舍五入
+            samples_16k_int16 = samples_16k.astype(np.int16)  # 转换类型
             
             return samples_16k_int16.tobytes()  # 返回字节数据
         
         except Exception as e:  # 捕获异常
-            logger.error(f"[Resampler] 重采样失败: {e}")  # 记录错误
+            logger.error("[Resampler] 重采样失败: %s", e)  # 记录错误
             return b""  # 返回空数据
     
     @staticmethod
@@ -209,38 +559,37 @@ class AudioResampler:
         将音频数据从源采样率重采样到目标采样率
         
         Args:
-            data: 源采样率的单声道 16-bit PCM 数据
+            data: 源采样率的单声道 16-bit PCM 数据（bytes 或 int16 数组视图）
             src_sr: 源采样率（如 24000）
             dst_sr: 目标采样率（如 44100）
         
         Returns:
             目标采样率的单声道 16-bit PCM 数据
         """
-        if not data:  # 空数据直接返回
+        if len(data) == 0:  # 空数据直接返回（兼容 int16 数组输入）
             return b""
         
         if src_sr == dst_sr:  # 采样率相同，无需重采样
-            return data
+            return bytes(data)
         
         try:
             # 转为 numpy array
             samples_src = np.frombuffer(data, dtype=np.int16)  # 解析为 int16 数组
             
-            # 计算重采样后的样本数
-            num_samples_dst = int(len(samples_src) * dst_sr / src_sr)  # 计算目标样本数
-            
-            # 执行重采样
-            samples_dst = signal.resample(samples_src, num_samples_dst)  # 重采样
+            # 多相 FIR 重采样（滤波器按比例缓存；逐块 FFT 重采样会把每块首尾当作周期信号，块边界产生杂音）
+            samples_dst = _resample_poly_f32(samples_src.astype(np.float32), src_sr, dst_sr)  # 重采样
             
-            # 转回 int16 并转为 bytes
-            samples_dst_int16 = np.clip(samples_dst, -32768, 32767).astype(np.int16)  # 限幅并转换类型
+            # 原地限幅、取整后转回 int16（不再生成 float64 临时数组）
+            np.clip(samples_dst, -32768, 32767, out=samples_dst)  # 原地限幅
+            np.rint(samples_dst, out=samples_dst)  # 原地四舍五入
+            samples_dst_int16 = samples_dst.astype(np.int16)  # 转换类型
             
             return samples_dst_int16.tobytes()  # 返回字节数据
         
         except Exception as e:  # 捕获异常
-            logger.error(f"[Resampler] 重采样失败 ({src_sr}→{dst_sr}): {e}")  # 记录错误
+            logger.error("[Resampler] 重采样失败 (%s→%s): %s", src_sr, dst_sr, e)  # 记录错误
             return b""  # 返回空数据
 
 
 # 导出公共接口
-__all__ = ['AECProcessor', 'AudioResampler', 'SPEEXDSP_AVAILABLE']  # 定义模块导出列表
+__all__ = ['AECProcessor', 'AudioResampler', 'StreamingResampler', 'SPEEXDSP_AVAILABLE']  # 定义模块导出列表
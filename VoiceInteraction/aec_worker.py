@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+AEC 独立进程工作器
+
+将 speexdsp 回声消除放到独立子进程中运行（独立解释器与 GIL），
+避免 AEC 计算与 100Hz 控制循环、音频播放线程争抢主进程的 GIL。
+
+子进程启动方式：
+    subprocess 直接以脚本方式运行本文件（python aec_worker.py <fd> ...），
+    只导入 aec_processor；不使用 multiprocessing spawn，因为 spawn 会在子进程中
+    以 __mp_main__ 重新执行主脚本的全部模块级代码（日志监听线程、日志文件、SDK 导入等）
+
+通信方式：
+    socketpair 一端交给子进程（pass_fds），两端都包装为 multiprocessing.connection.Connection
+    （send_bytes / recv_bytes，无 pickle 开销）
+    请求: b'P' + 麦克风数据 + 参考数据（两者等长） → 响应: 清洗后的麦克风数据
+    控制: b'R' 重置滤波器状态，b'Q' 退出子进程
+
+接口与 AECProcessor 保持一致（enabled / process_batch / reset），
+单次响应超时时本块直通、迟到的响应在下次读取时丢弃；连续超时或子进程退出时重启子进程，
+重启失败后降级为直通模式。
+"""
+
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from multiprocessing.connection import Connection
+
+from aec_processor import AECProcessor  # 导入进程内 AEC 处理器
+
+# 配置日志
+logger = logging.getLogger(__name__)  # 创建模块级日志记录器
+
+# 消息类型（单字节前缀）
+_CMD_PROCESS = b'P'  # 批量回声消除
+_CMD_RESET = b'R'  # 重置滤波器状态
+_CMD_QUIT = b'Q'  # 退出子进程
+
+MAX_CONSECUTIVE_TIMEOUTS = 3  # 连续超时达到该次数时重启子进程
+MAX_RESTARTS = 3  # 单个会话内最多重启次数（超过后降级为直通，避免反复阻塞麦克风循环）
+
+
+def _worker_main(conn, frame_size: int, filter_length: int, sample_rate: int):
+    """
+    子进程入口：创建 AECProcessor 并循环处理主进程发来的音频块
+
+    Args:
+        conn: 子进程端连接
+        frame_size: 每帧样本数
+        filter_length: 自适应滤波器长度
+        sample_rate: 采样率
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C 由主进程统一处理
+
+    processor = AECProcessor(
+        frame_size=frame_size,
+        filter_length=filter_length,
+        sample_rate=sample_rate,
+        enabled=True
+    )  # 子进程内的 AEC 实例
+    conn.send_bytes(b'1' if processor.enabled else b'0')  # 回报初始化结果
+    if not processor.enabled:  # 初始化失败，直接退出
+        return
+
+    while True:
+        try:
+            message = conn.recv_bytes()  # 阻塞等待请求
+        except (EOFError, OSError):  # 主进程已退出或连接关闭
+            break
+
+        command = message[:1]  # 消息类型
+        if command == _CMD_PROCESS:  # 批量回声消除
+            half = (len(message) - 1) // 2  # 麦克风与参考数据等长
+            conn.send_bytes(processor.process_batch(message[1:1 + half], message[1 + half:]))
+        elif command == _CMD_RESET:  # 重置状态
+            processor.reset()
+        elif command == _CMD_QUIT:  # 退出
+            break
+
+
+class AECWorker:
+    """
+    运行在独立子进程中的 AEC 处理器
+
+    参数：
+        frame_size: 每帧样本数（默认 320 = 20ms @ 16kHz）
+        filter_length: 自适应滤波器长度
+        sample_rate: 采样率
+        start_timeout: 等待子进程初始化完成的超时时间（秒）
+        reply_timeout: 等待单次处理结果的超时时间（秒），超时的块直通
+        max_timeouts: 连续超时达到该次数时重启子进程
+    """
+
+    def __init__(
+        self,
+        frame_size: int = 320,  # 20ms @ 16kHz
+        filter_length: int = 2048,
+        sample_rate: int = 16000,
+        start_timeout: float = 10.0,
+        reply_timeout: float = 0.5,
+        max_timeouts: int = MAX_CONSECUTIVE_TIMEOUTS
+    ):
+        self.frame_size = frame_size  # 保存帧大小
+        self.filter_length = filter_length  # 保存滤波器长度
+        self.sample_rate = sample_rate  # 保存采样率
+        self.start_timeout = start_timeout  # 保存启动超时时间（重启时复用）
+        self.reply_timeout = reply_timeout  # 保存响应超时时间
+        self.max_timeouts = max_timeouts  # 保存连续超时上限
+        self.enabled = False  # 子进程就绪后置为 True
+
+        self._process = None  # 子进程（subprocess.Popen）
+        self._conn = None  # 主进程端连接
+        self._timeouts = 0  # 连续超时次数
+        self._stale_replies = 0  # 已放弃等待、尚未读走的迟到响应数（响应按请求顺序返回）
+        self._restarts = 0  # 已重启次数
+
+        self.enabled = self._start()  # 启动子进程
+
+    def _start(self) -> bool:
+        """启动子进程并等待初始化结果，返回是否就绪"""
+        parent_sock, child_sock = socket.socketpair()  # 双向连接
+        try:
+            self._conn = Connection(parent_sock.detach())  # 主进程端（接管文件描述符）
+            self._process = subprocess.Popen(
+                [
+                    sys.executable, os.path.abspath(__file__),  # 以脚本方式运行本文件，不重新执行主脚本
+                    str(child_sock.fileno()),
+                    str(self.frame_size), str(self.filter_length), str(self.sample_rate),
+                ],
+                pass_fds=(child_sock.fileno(),),  # 只把子进程端传给子进程
+                stdin=subprocess.DEVNULL,  # 子进程不读取终端
+            )
+            if self._conn.poll(self.start_timeout) and self._conn.recv_bytes() == b'1':  # 等待初始化结果
+                logger.info("[AEC] 独立进程已启动 (pid=%s)", self._process.pid)
+                return True
+            logger.error("[AEC] 独立进程初始化失败或超时")
+        except Exception as e:  # 捕获启动异常
+            logger.error("[AEC] 独立进程启动失败: %s", e)
+        finally:
+            child_sock.close()  # 主进程不再使用子进程端
+        self._stop(timeout=0.2)  # 启动失败，清理子进程
+        return False
+
+    def _stop(self, timeout: float):
+        """停止子进程并释放连接（最多等待 timeout 秒，超时强制结束）"""
+        self.enabled = False  # 停用
+        conn, self._conn = self._conn, None  # 取出连接
+        if conn is not None:
+            try:
+                conn.send_bytes(_CMD_QUIT)  # 通知子进程退出
+            except Exception:
+                pass  # 子进程可能已退出
+            conn.close()  # 关闭连接（子进程随后读到 EOF）
+        process, self._process = self._process, None  # 取出子进程
+        if process is not None:
+            try:
+                process.wait(timeout=timeout)  # 等待退出
+            except subprocess.TimeoutExpired:  # 仍未退出（可能卡在处理中）
+                process.kill()  # 强制结束
+                process.wait()  # 回收子进程
+
+    def _restart(self):
+        """重启子进程；超过重启次数上限或重启失败时降级为直通"""
+        self._stop(timeout=0.1)  # 子进程可能卡住，不在麦克风循环里久等
+        self._timeouts = 0  # 新进程重新计数
+        self._stale_replies = 0  # 旧连接上的迟到响应随连接一起丢弃
+        if self._restarts >= MAX_RESTARTS:  # 重启次数用尽
+            logger.error("[AEC] 独立进程已重启 %d 次，降级为直通模式", self._restarts)
+            return
+        self._restarts += 1  # 记录重启次数
+        self.enabled = self._start()  # 重新启动
+        if not self.enabled:  # 重启失败
+            logger.error("[AEC] 独立进程重启失败，降级为直通模式")
+
+    def process_batch(self, mic_data: bytes, reference_data: bytes) -> bytes:
+        """
+        批量执行回声消除（在子进程中完成）
+
+        Args:
+            mic_data: 麦克风 PCM 数据（16-bit 单声道）
+            reference_data: 参考信号 PCM 数据（不足补零，超出截断）
+
+        Returns:
+            清洗后的音频数据；未启用、通信失败或超时时返回原始数据
+        """
+        if not self.enabled or not mic_data:  # 未启用或无数据，直通
+            return mic_data
+
+        ref_buf = reference_data[:len(mic_data)].ljust(len(mic_data), b'\x00')  # 参考信号对齐到麦克风长度
+        try:
+            self._conn.send_bytes(_CMD_PROCESS + mic_data + ref_buf)  # 发送请求
+            deadline = time.monotonic() + self.reply_timeout  # 本次等待截止时间
+            while self._conn.poll(max(deadline - time.monotonic(), 0.0)):  # 等待处理结果
+                reply = self._conn.recv_bytes()  # 读取响应
+                if self._stale_replies:  # 先到的是之前超时请求的迟到响应，丢弃
+                    self._stale_replies -= 1
+                    continue
+                self._timeouts = 0  # 正常响应，清零连续超时计数
+                return reply  # 返回清洗后的数据
+        except (EOFError, OSError) as e:  # 子进程异常退出
+            logger.error("[AEC] 独立进程通信失败: %s，重启子进程", e)
+            self._restart()
+            return mic_data  # 本块直通
+
+        # 超时：本块直通，迟到的响应留到下次读取时丢弃
+        self._stale_replies += 1
+        self._timeouts += 1
+        if self._timeouts >= self.max_timeouts:  # 连续超时，子进程可能已卡死
+            logger.error("[AEC] 独立进程连续 %d 次响应超时，重启子进程", self._timeouts)
+            self._restart()
+        else:
+            logger.warning("[AEC] 独立进程响应超时（>%ss），本块直通", self.reply_timeout)
+        return mic_data  # 返回原始数据
+
+    def reset(self):
+        """重置子进程中的 AEC 状态"""
+        if not self.enabled:  # 未启用，无需操作
+            return
+        try:
+            self._conn.send_bytes(_CMD_RESET)  # 发送重置请求
+        except (EOFError, OSError) as e:  # 子进程异常退出
+            logger.error("[AEC] 重置失败: %s，重启子进程", e)
+            self._restart()
+
+    def close(self):
+        """停止子进程并释放连接"""
+        self._stop(timeout=1.0)
+
+
+# 导出公共接口
+__all__ = ['AECWorker']  # 定义模块导出列表
+
+
+if __name__ == "__main__":
+    # 子进程入口：python aec_worker.py <fd> <frame_size> <filter_length> <sample_rate>
+    _fd, _frame_size, _filter_length, _sample_rate = map(int, sys.argv[1:5])
+    _worker_main(Connection(_fd), _frame_size, _filter_length, _sample_rate)
@@ -5,16 +5,19 @@ API 初始化模块：DashScope 和 OpenAI 客户端管理
 功能：
 1. 统一 API Key 管理
 2. DashScope 端点初始化
-3. OpenAI 兼容客户端单例
-4. Function Calling 接口封装
+3. OpenAI 兼容客户端单例（连接池复用 + 后台预热）
+4. Function Calling 接口封装（一次性返回 / 流式逐个产出）
 
 创建时间: 2026-01-29
 """
 
 import os  # 导入操作系统模块
+import contextlib  # 导入上下文管理模块
 import json  # 导入 JSON 模块
 import logging  # 导入日志模块
-from typing import List, Dict, Any  # 导入类型提示
+import threading  # 导入线程模块
+import importlib.util  # 导入模块查找工具
+from typing import List, Dict, Any, Iterator, Optional  # 导入类型提示
 
 import dashscope  # 导入 DashScope SDK
 
@@ -23,6 +26,19 @@ try:
 except ImportError:
     OpenAI = None  # 标记 OpenAI 不可用
 
+try:
+    import httpx  # openai 的底层 HTTP 库（随 openai 安装）
+except ImportError:
+    httpx = None  # 使用 openai 默认 HTTP 客户端
+
+try:
+    import orjson  # C 实现的 JSON 解析（可选，pip install orjson）
+    _loads = orjson.loads  # 直接接受 str/bytes，解析小对象比 json.loads 快数倍
+except ImportError:
+    _loads = json.loads  # 回退到标准库
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None  # httpx 的 HTTP/2 支持需要 h2 包（pip install httpx[http2]）
+
 from llm_api_config import DEFAULT_CONFIG  # 导入 LLM API 配置
 from config import FUNCTION_CALLING_CONFIG  # 导入 Function Calling 配置
 
@@ -32,6 +48,20 @@ logger = logging.getLogger(__name__)  # 获取当前模块的日志记录器
 # OpenAI 客户端单例
 _OPENAI_CLIENT = None  # 全局 OpenAI 客户端实例
 
+# DashScope 端点表：区域 → (WebSocket 端点, HTTP 端点, Omni 端点)
+_ENDPOINT_TABLE = {
+    "intl": (
+        "wss://dashscope-intl.aliyuncs.com/api-ws/v1/inference",
+        "https://dashscope-intl.aliyuncs.com/api/v1",
+        "wss://dashscope-intl.aliyuncs.com/api-ws/v1/realtime",
+    ),  # 国际端点
+    "cn": (
+        "wss://dashscope.aliyuncs.com/api-ws/v1/inference",
+        "https://dashscope.aliyuncs.com/api/v1",
+        "wss://dashscope.aliyuncs.com/api-ws/v1/realtime",
+    ),  # 国内端点
+}
+
 
 def get_dashscope_api_key() -> str:
     """
@@ -50,8 +80,7 @@ def get_dashscope_api_key() -> str:
         key = (DEFAULT_CONFIG.get("api_key") or "").strip()  # 从配置文件获取
     if not key:  # 如果仍为空
         raise RuntimeError(
-            "未找到 DashScope API Key：请设置环境变量 DASHSCOPE_API_KEY，"
-            "或在 llm_api_config.py 的 DEFAULT_CONFIG['api_key'] 中配置"
+            "未找到 DashScope API Key：请设置环境变量 DASHSCOPE_API_KEY"
         )
     os.environ["DASHSCOPE_API_KEY"] = key  # 设置环境变量
     dashscope.api_key = key  # 设置 DashScope API Key
@@ -69,19 +98,35 @@ def init_dashscope_endpoints() -> str:
     """
     _ = get_dashscope_api_key()  # 确保 API Key 已设置
     base_url = (DEFAULT_CONFIG.get("base_url") or "").lower()  # 获取 base_url
+    region = "intl" if "dashscope-intl" in base_url else "cn"  # 国际/国内端点
 
-    if "dashscope-intl" in base_url:  # 如果是国际端点
-        dashscope.base_websocket_api_url = "wss://dashscope-intl.aliyuncs.com/api-ws/v1/inference"  # 设置 WebSocket 端点
-        dashscope.base_http_api_url = "https://dashscope-intl.aliyuncs.com/api/v1"  # 设置 HTTP 端点
-        default_omni_ws = "wss://dashscope-intl.aliyuncs.com/api-ws/v1/realtime"  # 设置 Omni 端点
-    else:  # 使用国内端点
-        dashscope.base_websocket_api_url = "wss://dashscope.aliyuncs.com/api-ws/v1/inference"  # 设置 WebSocket 端点
-        dashscope.base_http_api_url = "https://dashscope.aliyuncs.com/api/v1"  # 设置 HTTP 端点
-        default_omni_ws = "wss://dashscope.aliyuncs.com/api-ws/v1/realtime"  # 设置 Omni 端点
+    ws_url, http_url, default_omni_ws = _ENDPOINT_TABLE[region]  # 查表
+    dashscope.base_websocket_api_url = ws_url  # 设置 WebSocket 端点
+    dashscope.base_http_api_url = http_url  # 设置 HTTP 端点
 
     return default_omni_ws  # 返回默认 Omni 端点
 
 
+def _build_http_client():
+    """
+    创建带长连接池的 httpx 客户端（h2 可用时启用 HTTP/2）
+
+    Returns:
+        httpx.Client 实例；httpx 不可用时返回 None（使用 openai 默认客户端）
+    """
+    if httpx is None:  # httpx 不可用
+        return None  # 回退到默认客户端
+    return httpx.Client(
+        http2=HTTP2_AVAILABLE,  # 多个请求复用同一连接
+        limits=httpx.Limits(
+            max_keepalive_connections=8,  # 保持的空闲连接数
+            max_connections=16,  # 最大连接数
+            keepalive_expiry=30.0,  # 空闲连接保持时间（秒），避免每次工具调用重新 TLS 握手
+        ),
+        timeout=FUNCTION_CALLING_CONFIG.get("TIMEOUT", 3.0),  # 与工具调用超时一致
+    )
+
+
 def get_openai_client():
     """
     获取 OpenAI 兼容客户端（单例模式）
@@ -97,16 +142,81 @@ def get_openai_client():
         if OpenAI is None:  # 如果 OpenAI 未导入
             raise ImportError("缺少 openai 库，请运行: pip install openai")
         
+        kwargs = {}  # 可选参数
+        http_client = _build_http_client()  # 连接池客户端
+        if http_client is not None:  # httpx 可用
+            kwargs["http_client"] = http_client  # 复用长连接
         _OPENAI_CLIENT = OpenAI(
             api_key=get_dashscope_api_key(),  # 使用 DashScope API Key
             base_url=DEFAULT_CONFIG.get(
                 "base_url", 
                 "https://dashscope.aliyuncs.com/compatible-mode/v1"
             ),  # 设置兼容模式 base_url
+            **kwargs
         )
     return _OPENAI_CLIENT  # 返回客户端实例
 
 
+def prewarm_openai_client() -> None:
+    """
+    后台预热 OpenAI 客户端：提前创建单例并发起一次轻量请求，
+    使首次工具调用前 TCP/TLS 连接已在连接池中建立（失败不影响后续调用）
+    """
+    if not FUNCTION_CALLING_CONFIG.get("ENABLED", True) or OpenAI is None:  # 未启用或库不可用
+        return  # 无需预热
+
+    def _warm():
+        try:
+            get_openai_client().models.list()  # 轻量请求，建立连接
+            logger.info("[FunctionCalling] OpenAI 客户端连接已预热")  # 记录日志
+        except Exception as e:  # 预热失败（如端点不支持 /models）
+            logger.debug("[FunctionCalling] 客户端预热失败（不影响使用）: %s", e)  # 记录调试信息
+
+    threading.Thread(target=_warm, name="OpenAIPrewarm", daemon=True).start()  # 后台执行，不阻塞启动
+
+
+def _tool_request_kwargs(user_message: str, tools: List[Dict]) -> Dict[str, Any]:
+    """
+    构建工具调用推理的请求参数（一次性与流式调用共用）
+
+    Args:
+        user_message: 用户消息
+        tools: 工具定义列表
+
+    Returns:
+        chat.completions.create 的关键字参数
+    """
+    # 构建消息
+    messages = [
+        {
+            "role": "system",
+            "content": (
+                "你是一个机器人控制助手。根据用户指令，选择合适的工具来控制机器人移动。"
+                "只在用户明确表达了移动意图时才调用工具。"
+            )
+        },  # 系统提示
+        {"role": "user", "content": user_message}  # 用户消息
+    ]
+    return {
+        "model": FUNCTION_CALLING_CONFIG.get("MODEL", "qwen-max"),  # 使用配置的模型
+        "messages": messages,  # 消息列表
+        "tools": tools,  # 工具定义列表
+        "tool_choice": "auto",  # 自动选择是否调用工具
+        "temperature": FUNCTION_CALLING_CONFIG.get("TEMPERATURE", 0.3),  # 温度参数
+        "max_tokens": FUNCTION_CALLING_CONFIG.get("MAX_TOKENS", 500),  # 最大 token 数
+        "timeout": FUNCTION_CALLING_CONFIG.get("TIMEOUT", 3.0),  # 超时时间
+    }
+
+
+def _parse_tool_arguments(text: str) -> Optional[Dict[str, Any]]:
+    """解析工具参数 JSON；尚不完整或不是对象时返回 None"""
+    try:
+        args = _loads(text)  # 解析 JSON
+    except ValueError:  # 参数尚未闭合（json/orjson 的解析异常均为 ValueError 子类）
+        return None
+    return args if isinstance(args, dict) else None  # 工具参数必须是对象
+
+
 def call_qwen_for_tool_use(user_message: str, tools: List[Dict]) -> List[Dict[str, Any]]:
     """
     调用标准 Qwen API 进行工具调用推理
@@ -127,38 +237,19 @@ def call_qwen_for_tool_use(user_message: str, tools: List[Dict]) -> List[Dict[st
         # 使用单例客户端，避免重复创建连接
         client = get_openai_client()  # 获取 OpenAI 客户端
         
-        # 构建消息
-        messages = [    
-            {
-                "role": "system",
-                "content": (
-                    "你是一个机器人控制助手。根据用户指令，选择合适的工具来控制机器人移动。"
-                    "只在用户明确表达了移动意图时才调用工具。"
-                )
-            },  # 系统提示
-            {"role": "user", "content": user_message}  # 用户消息
-        ]
-        
         # 调用 API
-        response = client.chat.completions.create(
-            model=FUNCTION_CALLING_CONFIG.get("MODEL", "qwen-max"),  # 使用配置的模型
-            messages=messages,  # 消息列表
-            tools=tools,  # 工具定义列表
-            tool_choice="auto",  # 自动选择是否调用工具
-            temperature=FUNCTION_CALLING_CONFIG.get("TEMPERATURE", 0.3),  # 温度参数
-            max_tokens=FUNCTION_CALLING_CONFIG.get("MAX_TOKENS", 500),  # 最大 token 数
-            timeout=FUNCTION_CALLING_CONFIG.get("TIMEOUT", 3.0),  # 超时时间
-        )
+        response = client.chat.completions.create(**_tool_request_kwargs(user_message, tools))
         
         # 提取工具调用
         tool_calls = []  # 初始化工具调用列表
         message = response.choices[0].message  # 获取响应消息
         
-        if hasattr(message, 'tool_calls') and message.tool_calls:  # 检查是否有工具调用
-            for tool_call in message.tool_calls:  # 遍历所有工具调用
+        message_tool_calls = getattr(message, 'tool_calls', None)  # 一次属性读取（无工具调用时为 None）
+        if message_tool_calls:  # 检查是否有工具调用
+            for tool_call in message_tool_calls:  # 遍历所有工具调用
                 tool_calls.append({
                     "name": tool_call.function.name,  # 工具名称
-                    "arguments": json.loads(tool_call.function.arguments),  # 工具参数
+                    "arguments": _loads(tool_call.function.arguments),  # 工具参数
                 })  # 添加到工具调用列表
             
             logger.info(f"[FunctionCalling] LLM 生成了 {len(tool_calls)} 个工具调用")  # 记录日志
@@ -174,10 +265,88 @@ def call_qwen_for_tool_use(user_message: str, tools: List[Dict]) -> List[Dict[st
         return []  # 返回空列表
 
 
+def iter_qwen_tool_calls(user_message: str, tools: List[Dict]) -> Iterator[Dict[str, Any]]:
+    """
+    流式调用 Qwen API 进行工具调用推理，每个工具调用的参数一旦完整即产出
+
+    与 call_qwen_for_tool_use 发送相同的请求，但使用 stream=True：调用方可以在模型
+    还在生成后续工具调用时就执行已完整的工具调用，首个动作不必等待整个响应结束。
+
+    Args:
+        user_message: 用户消息
+        tools: 工具定义列表
+
+    Yields:
+        工具调用，格式: {"name": "tool_name", "arguments": {...}}
+        如果调用失败或无工具调用，不产出任何元素
+    """
+    # 检查功能开关
+    if not FUNCTION_CALLING_CONFIG.get("ENABLED", True):  # 检查是否启用 Function Calling
+        return  # 未启用则不产出
+
+    stream = None  # 流式响应
+    try:
+        client = get_openai_client()  # 获取 OpenAI 客户端
+        stream = client.chat.completions.create(**_tool_request_kwargs(user_message, tools), stream=True)  # 流式调用 API
+
+        pending = {}  # 工具调用序号 -> [工具名称, 参数片段列表]
+        done = set()  # 已产出的工具调用序号（其后的空白片段直接忽略）
+        count = 0  # 已产出的工具调用数量
+        for chunk in stream:  # 逐个 SSE 数据块
+            if not chunk.choices:  # 用量统计等不含 choices 的块
+                continue
+            deltas = chunk.choices[0].delta.tool_calls  # 本块的工具调用增量
+            if not deltas:  # 文本内容或结束标记
+                continue
+            for delta in deltas:  # 同一块可能包含多个工具调用的增量
+                fn = delta.function  # 函数名/参数片段
+                if delta.index in done or fn is None:  # 已产出或无函数内容
+                    continue
+                entry = pending.setdefault(delta.index, ["", []])  # 首个增量携带函数名
+                if fn.name:  # 函数名
+                    entry[0] += fn.name
+                if fn.arguments:  # 参数片段
+                    entry[1].append(fn.arguments)
+                    # 只在片段以 "}" 结尾时尝试解析：JSON 对象闭合后不会再有有效内容
+                    if entry[0] and fn.arguments.rstrip().endswith("}"):
+                        args = _parse_tool_arguments("".join(entry[1]))  # 尝试解析已累积的参数
+                        if args is not None:  # 参数完整
+                            del pending[delta.index]  # 不再累积
+                            done.add(delta.index)  # 标记已产出
+                            count += 1  # 计数
+                            yield {"name": entry[0], "arguments": args}  # 立即交给调用方执行
+
+        # 流结束：产出剩余工具调用（无参数的工具可能不发送 "{}"）
+        for index in sorted(pending):  # 按生成顺序
+            name, parts = pending[index]  # 工具名称与参数片段
+            args = _parse_tool_arguments("".join(parts) or "{}")  # 解析参数
+            if not name or args is None:  # 不完整的工具调用
+                logger.warning("[FunctionCalling] 丢弃不完整的工具调用: %s", name or index)  # 记录警告
+                continue
+            count += 1  # 计数
+            yield {"name": name, "arguments": args}  # 产出
+
+        if count:  # 有工具调用
+            logger.info("[FunctionCalling] LLM 生成了 %d 个工具调用", count)  # 记录日志
+
+    except ImportError:  # 捕获 openai 库未安装的异常
+        logger.error("[FunctionCalling] 缺少 openai 库，请运行: pip install openai")  # 记录错误
+
+    except Exception as e:  # 捕获所有其他异常（已产出的工具调用不受影响）
+        logger.error("[FunctionCalling] 流式调用 Qwen API 失败: %s", e)  # 记录错误
+
+    finally:
+        if stream is not None:  # 提前结束迭代时也释放连接
+            with contextlib.suppress(Exception):  # 忽略关闭异常
+                stream.close()  # 关闭流式响应
+
+
 # 导出公共接口
 __all__ = [
     'get_dashscope_api_key',
     'init_dashscope_endpoints',
     'get_openai_client',
-    'call_qwen_for_tool_use'
+    'prewarm_openai_client',
+    'call_qwen_for_tool_use',
+    'iter_qwen_tool_calls'
 ]  # 定义模块导出列表
@@ -18,6 +18,49 @@ import contextlib  # 导入上下文管理模块
 import time  # 导入时间模块
 import logging  # 导入日志模块
 import pyaudio  # 导入音频处理模块
+import numpy as np  # 导入数值计算模块
+from ring_buffer import SPSCRing  # 导入无锁环形缓冲区
+
+try:
+    import pybase64  # SIMD 加速的 Base64 解码（可选，pip install pybase64）
+    _b64decode = pybase64.b64decode  # 与标准库接口一致
+except ImportError:
+    _b64decode = base64.b64decode  # 回退到标准库
+
+REFERENCE_SAMPLE_RATE = 16000  # AEC 参考信号采样率（与麦克风一致）
+REFERENCE_FRAME_SAMPLES = 320  # get_reference_frame 默认帧长（20ms @ 16kHz）
+REFERENCE_IDLE_TIMEOUT_NS = 500_000_000  # 超过 500ms 无人读取参考信号时视为 AEC 未运行，跳过参考信号重采样
+B64_COALESCE_LIMIT = 16 * 1024  # 解码线程单次合并的 Base64 字符数上限（约 12KB PCM / 250ms @ 24kHz）
+
+
+def _decode_b64_batch(pieces: list) -> bytes:
+    """
+    解码一批连续的 Base64 片段
+
+    只有除最后一段外每段长度都是 4 的倍数且不含 '=' 填充时，拼接后的字符串才与逐段解码等价，
+    此时整批只解码一次；否则逐段解码后拼接（跳过无法解码的片段）。
+
+    Args:
+        pieces: 按到达顺序排列的 Base64 字符串
+
+    Returns:
+        解码后的 PCM 字节串（全部失败时为空）
+    """
+    if len(pieces) == 1:  # 单条消息
+        try:
+            return _b64decode(pieces[0], validate=False)  # 解码 Base64（不做额外的字符集校验）
+        except Exception:  # 捕获解码异常
+            return b""  # 丢弃无效消息
+    if all(len(p) % 4 == 0 and not p.endswith("=") for p in pieces[:-1]):  # 可以安全拼接
+        try:
+            return _b64decode("".join(pieces), validate=False)  # 整批一次解码
+        except Exception:  # 其中有无效片段，逐段解码以保留有效数据
+            pass
+    out = []  # 逐段解码结果
+    for p in pieces:  # 遍历片段
+        with contextlib.suppress(Exception):  # 跳过无效片段
+            out.append(_b64decode(p, validate=False))  # 解码
+    return b"".join(out)  # 拼接
 
 # 配置日志记录器
 logger = logging.getLogger(__name__)  # 获取当前模块的日志记录器
@@ -25,58 +68,93 @@ logger = logging.getLogger(__name__)  # 获取当前模块的日志记录器
 
 class B64PCMPlayer:
     """
-    流式播放：不断接收 b64 PCM -> 解码 -> 分片 -> write 到声卡。
+    流式播放：不断接收 b64 PCM -> 解码 -> 写入无锁样本环 -> 分块 write 到声卡。
+    - raw 环中保存的是设备采样率的样本：解码线程按批完成播放重采样，播放端只负责搬运
+    - use_callback=True 时改为 PortAudio 回调拉取（无播放线程）
     - wait_until_idle(): 判断"本地播放是否真正结束"
     - interrupt(): 立刻清空队列并重置输出流（尽可能立即停）
     """
     
-    def __init__(self, pya: pyaudio.PyAudio, sample_rate=24000, chunk_size_ms=100):
+    def __init__(self, pya: pyaudio.PyAudio, sample_rate=24000, chunk_size_ms=40, use_callback=False):
         """
         初始化音频播放器
         
         Args:
             pya: PyAudio 实例
             sample_rate: 采样率（默认 24kHz）
-            chunk_size_ms: 每个播放块的毫秒数（默认 100ms）
+            chunk_size_ms: 每个播放块的毫秒数（默认 40ms，即单次 write 的粒度，决定打断延迟上限）
+            use_callback: 是否使用 PortAudio 回调模式（默认 False，使用播放线程阻塞写入）
         """
         self.pya = pya  # 保存 PyAudio 实例
         self.sample_rate = sample_rate  # 原始采样率
-        self.chunk_size_bytes = int(chunk_size_ms * sample_rate * 2 // 1000)  # 计算每块字节数
+        self._chunk_size_ms = chunk_size_ms  # 播放块时长（设备采样率变化时按此重新分配播放缓冲区）
 
-        self._stream_lock = threading.Lock()  # 音频流操作锁
+        self._stream_lock = threading.Lock()  # 音频流重建/关闭锁（interrupt、shutdown 与后台补充备用流互斥；播放线程独占写入，不加锁）
         
         # 检测设备支持的采样率
         self._device_sample_rate = self._detect_device_sample_rate()
         logger.info(f"[Player] 原始采样率: {self.sample_rate}Hz, 设备采样率: {self._device_sample_rate}Hz")
-        
-        self.player_stream = self._open_stream()  # 创建输出流
 
-        self.raw_audio_buffer: "queue.Queue[bytes]" = queue.Queue()  # 原始音频缓冲区
+        # 回调模式：PortAudio 在自己的线程中按 20ms 拉取样本（raw 环已是设备采样率，回调内只做拷贝）
+        self._use_callback = use_callback
+        self._cb_frames = int(self._device_sample_rate * 0.02)  # 回调每次请求的帧数（20ms）
+        
+        self.player_stream = self._open_stream()  # 创建输出流（回退时可能改变设备采样率与 _cb_frames）
+        # 阻塞写入模式下预先打开一条已停止的备用流，interrupt 直接换用，关闭/重新打开设备的耗时移到后台线程
+        self._spare_stream = None if use_callback else self._open_spare_stream()
+
+        # 原始音频缓冲区：解码线程（唯一生产者）→ 播放线程（唯一消费者）的无锁 int16 样本环
+        # 解码线程写入前已重采样到设备采样率，播放端取出即可直接写入声卡
+        self.raw_audio_buffer = SPSCRing(self._device_sample_rate * 10)  # 设备采样率样本，约 10 秒
+        self._play_buf = np.empty(int(chunk_size_ms * self._device_sample_rate // 1000), dtype=np.int16)  # 播放线程的预分配取数缓冲区
+        self._player_parked = threading.Event()  # 播放线程已停在打断分支（不再读取 raw 环），供 interrupt 清空
+        self._decoder_parked = threading.Event()  # 解码线程已停在打断分支（不再修改计数器），供 interrupt 同步计数
+        self._cb_buf = np.zeros(self._cb_frames, dtype=np.int16)  # 回调模式的预分配输出缓冲区
         self.b64_audio_buffer: "queue.Queue[str]" = queue.Queue()  # Base64 音频缓冲区
 
         self._status_lock = threading.Lock()  # 状态锁
         self._status = "playing"  # 播放状态
 
-        self._cnt_lock = threading.Lock()  # 计数器锁
-        self._pending_b64 = 0  # 待处理的 Base64 块计数
-        self._pending_raw_bytes = 0  # 待播放的原始字节计数
+        # 待处理计数拆成只增不减的"入/出"两个计数器，每个只由一个线程写入（GIL 下单写者整数更新无需加锁）
+        # 待处理量 = 入 - 出；interrupt 在两个线程都停靠后把"出"同步为"入"
+        self._b64_in = 0  # 已入队的 Base64 消息数（仅 add_data 调用方线程写入）
+        self._b64_out = 0  # 已取出解码的 Base64 消息数（仅解码线程写入）
+        self._raw_in = 0  # 已解码待播放的原始字节数（仅解码线程写入）
+        self._raw_out = 0  # 已播放/丢弃的原始字节数（仅播放线程或回调写入）
 
         self._idle_event = threading.Event()  # 空闲事件
         self._idle_event.set()  # 初始为空闲状态
 
         self._abort_event = threading.Event()  # 打断事件：置位时丢弃所有待播数据
+        self._resume_event = threading.Event()  # 恢复事件：未处于打断时置位（打断期间线程阻塞等待它）
+        self._resume_event.set()  # 初始为可播放状态
+
+        # 线程间唤醒事件（替代固定间隔的 sleep 轮询）
+        self._data_event = threading.Event()  # 解码线程写入 raw 环后置位，唤醒播放线程
+        self._space_event = threading.Event()  # 播放线程读出样本后置位，唤醒等待空间的解码线程
 
         # === AEC 支持：参考信号缓冲区 ===
-        self.reference_buffer: "queue.Queue[bytes]" = queue.Queue(maxsize=100)  # 保存播放的参考信号（16kHz）
-        self.resampler = None  # 重采样器实例
-        self._playback_resampler = None  # 播放重采样器
+        # 播放线程（生产者）写入连续的 16kHz 样本流，麦克风循环（消费者）按帧读取，无锁无阻塞
+        # 覆盖模式：消费者跟不上（或 AEC 未读取）时丢弃最旧样本，保证读到的总是最近播放的内容
+        self.reference_buffer = SPSCRing(8192, overwrite=True)  # 保存播放的参考信号（16kHz，约 0.5 秒）
+        # 解码线程按整条消息一次性重采样到 16kHz，写入待发布环；播放端每播放 n 个设备采样率样本
+        # 只搬运对应的 n × 16000 / 设备采样率 个，既把重采样调用降到每条消息一次，又保持参考信号与实际播放对齐
+        self._pending_reference = SPSCRing(REFERENCE_SAMPLE_RATE * 10)  # 与 raw 环等时长的 16kHz 待发布参考样本
+        self._ref_buf = np.empty(int(chunk_size_ms * REFERENCE_SAMPLE_RATE // 1000) + 1, dtype=np.int16)  # 播放端搬运参考样本的预分配缓冲区
+        # 解码线程与播放端按同一规则（以设备采样率样本数计）累计取整余数，保证两边的参考样本总数完全一致
+        self._ref_in_phase = 0  # 解码线程的累计余数
+        self._ref_out_phase = 0  # 播放端的累计余数
+        self._silence_ref = bytes(REFERENCE_FRAME_SAMPLES * 2)  # 预分配的静音参考帧（无参考信号时直接返回）
+        self._last_ref_read_ns = 0  # 最近一次读取参考信号的时间（monotonic_ns，由 AEC 消费端更新）
+        # 两个重采样器都是流式的（跨批保持滤波器状态，批边界连续无咔哒声），只由解码线程调用
+        self.resampler = None  # AEC 参考信号重采样器（源采样率 → 16kHz）
+        self._playback_resampler = None  # 播放重采样器（源采样率 → 设备采样率）
         try:
-            from aec_processor import AudioResampler  # 导入重采样工具
-            self.resampler = AudioResampler()  # 用于 24kHz → 16kHz 重采样
+            from aec_processor import StreamingResampler  # 导入流式重采样器
+            self.resampler = StreamingResampler(self.sample_rate, REFERENCE_SAMPLE_RATE)
             # 初始化播放重采样器（如果需要）
             if self._device_sample_rate != self.sample_rate:
-                from aec_processor import AudioResampler
-                self._playback_resampler = AudioResampler()  # 使用通用的重采样方法
+                self._playback_resampler = StreamingResampler(self.sample_rate, self._device_sample_rate)
                 logger.info(f"[Player] 启用播放重采样: {self.sample_rate}Hz → {self._device_sample_rate}Hz")
         except ImportError:
             logger.warning("[Player] AEC 模块未找到，参考信号功能禁用")  # 打印警告
@@ -85,7 +163,7 @@ class B64PCMPlayer:
         self._decoder_thread = threading.Thread(target=self._decoder_loop, daemon=True)  # 解码线程
         self._player_thread = threading.Thread(target=self._player_loop, daemon=True)  # 播放线程
         self._decoder_thread.start()  # 启动解码线程
-        self._player_thread.start()  # 启动播放线程
+        self._start_playback()  # 启动播放线程或回调流
 
     def _detect_device_sample_rate(self):
         """检测默认输出设备支持的采样率"""
@@ -93,12 +171,56 @@ class B64PCMPlayer:
             default_output = self.pya.get_default_output_device_info()
             device_rate = default_output['defaultSampleRate']
             device_rate = int(float(device_rate))
+            if device_rate < 8000:  # 不合理的采样率（raw 环与播放块按设备采样率分配）
+                raise ValueError(f"设备报告的采样率异常: {device_rate}Hz")
             logger.info(f"[Player] 默认输出设备: {default_output['name']}, 支持采样率: {device_rate}Hz")
             return device_rate
         except Exception as e:
             logger.warning(f"[Player] 无法检测设备采样率，使用默认 24000Hz: {e}")
             return self.sample_rate
 
+    def _callback_kwargs(self) -> dict:
+        """回调模式下传给 pya.open 的额外参数（先不启动，缓冲区就绪后由 _start_playback 启动）"""
+        if not self._use_callback:  # 阻塞写入模式
+            return {}  # 无额外参数
+        return {
+            'stream_callback': self._pa_callback,  # PortAudio 拉取回调
+            'frames_per_buffer': self._cb_frames,  # 每次拉取 20ms
+            'start': False,  # 延迟启动
+        }
+
+    def _set_device_rate(self, rate: int):
+        """打开流的回退路径改用其他采样率时，同步设备采样率与回调帧数"""
+        self._device_sample_rate = rate  # 解码线程按此采样率重采样
+        self._cb_frames = int(rate * 0.02)  # 回调每次请求的帧数（20ms）
+
+    def _apply_device_rate(self):
+        """
+        运行期重建流时回退到了其他设备采样率：按新采样率重建所有依赖它的状态
+
+        只在 interrupt 的同步重建路径中、持有 _stream_lock 且解码/播放线程已停靠时调用
+        （raw 环与参考信号待发布环此时均已清空）。
+        """
+        rate = self._device_sample_rate  # 新的设备采样率
+        logger.warning("[Player] 重建音频流后设备采样率变为 %sHz，重建播放缓冲区与重采样器", rate)
+        self.raw_audio_buffer = SPSCRing(rate * 10)  # raw 环按设备采样率样本计，约 10 秒
+        self._play_buf = np.empty(int(self._chunk_size_ms * rate // 1000), dtype=np.int16)  # 播放块
+        self._cb_buf = np.zeros(self._cb_frames, dtype=np.int16)  # 回调输出缓冲区（_cb_frames 已按新采样率更新）
+        self._ref_in_phase = 0  # 参考信号取整余数以设备采样率计，重新开始
+        self._ref_out_phase = 0
+        self._playback_resampler = None  # 同采样率时不重采样
+        if rate != self.sample_rate and self.resampler is not None:  # 需要播放重采样（且 aec_processor 可用）
+            from aec_processor import StreamingResampler  # 导入流式重采样器
+            self._playback_resampler = StreamingResampler(self.sample_rate, rate)
+            logger.info(f"[Player] 启用播放重采样: {self.sample_rate}Hz → {rate}Hz")
+
+    def _start_playback(self):
+        """启动播放：回调模式启动流，否则启动播放线程"""
+        if self._use_callback:  # 回调模式
+            self.player_stream.start_stream()  # PortAudio 开始拉取
+        elif not self._player_thread.is_alive():  # 播放线程尚未运行（含回调模式回退的情况）
+            self._player_thread.start()  # 启动播放线程
+
     def _open_stream(self):
         """创建并返回 PyAudio 输出流（使用设备支持的采样率）"""
         try:
@@ -106,7 +228,8 @@ class B64PCMPlayer:
                 format=pyaudio.paInt16,  # 16位 PCM 格式
                 channels=1,  # 单声道
                 rate=self._device_sample_rate,  # 使用设备支持的采样率
-                output=True  # 输出流
+                output=True,  # 输出流
+                **self._callback_kwargs()  # 回调模式参数
             )
         except OSError as e:
             logger.error(f"[Player] 无法使用 {self._device_sample_rate}Hz 打开音频流: {e}")
@@ -114,34 +237,78 @@ class B64PCMPlayer:
             try:
                 default_output = self.pya.get_default_output_device_info()
                 logger.info(f"[Player] 尝试使用默认输出设备: {default_output['name']}")
+                self._set_device_rate(int(float(default_output['defaultSampleRate'])))  # 以默认设备采样率播放
                 return self.pya.open(
                     format=pyaudio.paInt16,
                     channels=1,
-                    rate=int(float(default_output['defaultSampleRate'])),
+                    rate=self._device_sample_rate,
                     output=True,
-                    output_device_index=default_output['index']
+                    output_device_index=default_output['index'],
+                    **self._callback_kwargs()  # 回调模式参数
                 )
             except Exception as e2:
                 logger.error(f"[Player] 默认设备也失败: {e2}")
                 # 最后尝试 44100Hz
                 logger.info("[Player] 尝试使用 44100Hz 作为备选")
-                self._device_sample_rate = 44100
+                self._set_device_rate(44100)
                 return self.pya.open(
                     format=pyaudio.paInt16,
                     channels=1,
                     rate=44100,
-                    output=True
+                    output=True,
+                    **self._callback_kwargs()  # 回调模式参数（按新采样率的帧数）
                 )
 
+    def _open_spare_stream(self):
+        """打开一条未启动的备用输出流（与当前设备采样率一致，不走回退路径；失败返回 None）"""
+        try:
+            return self.pya.open(
+                format=pyaudio.paInt16,  # 16位 PCM 格式
+                channels=1,  # 单声道
+                rate=self._device_sample_rate,  # 与当前输出流相同的采样率
+                output=True,  # 输出流
+                start=False,  # 换用时再启动
+            )
+        except Exception as e:  # 打开失败：interrupt 回退到同步重建
+            logger.warning("[Player] 备用音频流打开失败: %s", e)  # 记录警告
+            return None
+
+    def _recycle_stream(self, old):
+        """后台线程：关闭换下的旧流并补充新的备用流"""
+        with contextlib.suppress(Exception):  # 忽略异常
+            old.close()  # 直接关闭（Pa_CloseStream 丢弃驱动中尚未播放的缓冲，不像 stop_stream 那样先播完）
+        rate = self._device_sample_rate  # 备用流的采样率
+        spare = self._open_spare_stream()  # 补充备用流
+        if spare is None:  # 打开失败
+            return
+        with self._stream_lock:  # 与 interrupt/shutdown 互斥
+            with self._status_lock:  # 读取播放状态
+                stopped = self._status == "stop"  # 播放器已关闭
+            if stopped or self._spare_stream is not None or rate != self._device_sample_rate:  # 已关闭、已有备用流，或期间同步重建改变了采样率
+                with contextlib.suppress(Exception):  # 忽略异常
+                    spare.close()  # 丢弃多余的备用流
+            else:
+                self._spare_stream = spare  # 供下一次打断使用
+
     def _set_not_idle(self):
         """设置为非空闲状态"""
         self._idle_event.clear()  # 清除空闲事件
 
+    @property
+    def _pending_b64(self) -> int:
+        """待处理的 Base64 块计数"""
+        return self._b64_in - self._b64_out
+
+    @property
+    def _pending_raw_bytes(self) -> int:
+        """待播放的原始字节计数"""
+        return self._raw_in - self._raw_out
+
     def _try_set_idle(self):
         """尝试设置为空闲状态（当所有待播数据处理完毕时）"""
-        with self._cnt_lock:  # 获取计数器锁
-            ok = (self._pending_b64 == 0 and self._pending_raw_bytes == 0)  # 检查是否无待处理数据
-        if ok:  # 如果无待处理数据
+        # 先读 Base64 计数再读字节计数：解码线程先加 _raw_in 再加 _b64_out，
+        # 看到消息已取出时一定也能看到它的字节计数，不会在两者之间误判空闲
+        if self._b64_in == self._b64_out and self._raw_in == self._raw_out:  # 检查是否无待处理数据
             self._idle_event.set()  # 设置空闲事件
 
     def add_data(self, b64_pcm: str):
@@ -156,54 +323,99 @@ class B64PCMPlayer:
         if self._abort_event.is_set():  # 检查是否正在被打断
             return  # 正在被打断：直接丢弃新到的音频
         self._set_not_idle()  # 设置为非空闲状态
-        with self._cnt_lock:  # 获取计数器锁
-            self._pending_b64 += 1  # 增加待处理计数
+        self._b64_in += 1  # 增加待处理计数（单写者）
         self.b64_audio_buffer.put(b64_pcm)  # 放入缓冲区
 
     def _clear_queue(self, q: queue.Queue):
         """清空队列中的所有数据"""
-        while True:  # 循环清空
-            with contextlib.suppress(queue.Empty):  # 忽略队列空异常
+        try:
+            while True:  # 循环清空（整个循环只建立一次异常处理）
                 q.get_nowait()  # 非阻塞取出
-                continue  # 继续清空
-            break  # 队列已空，退出循环
+        except queue.Empty:  # 队列已空
+            pass  # 清空完成
 
     def interrupt(self, reset_stream: bool = True):
         """
         立即停止当前播放：
         - 置位 abort_event，让 decoder/player 立刻进入丢弃模式
-        - 清空 b64/raw 队列 + pending 计数清零
-        - 强制 stop_stream + close + reopen，尽最大可能清掉声卡缓冲
+        - 清空 b64 队列与 raw 环 + pending 计数清零
+        - 阻塞写入模式：换用预先打开的备用流，旧流在后台关闭（丢弃声卡缓冲）并补充新的备用流；
+          没有备用流时同步 stop_stream + close + reopen
+        - 回调模式：不重建流，回调从下一块起输出静音
         
         Args:
             reset_stream: 是否重置音频流（默认 True）
         """
+        self._player_parked.clear()  # 先清除停靠标志，之后的置位一定是播放线程看到本次打断后设置的
+        self._decoder_parked.clear()  # 同上（解码线程）
+        self._resume_event.clear()  # 打断期间解码/播放线程阻塞等待
         self._abort_event.set()  # 置位打断事件
+        self._data_event.set()  # 唤醒等待数据的播放线程，使其立即进入打断分支
+        self._space_event.set()  # 唤醒等待空间的解码线程，使其放弃剩余样本
         self._set_not_idle()  # 设置为非空闲
 
         # 清空内部队列
         self._clear_queue(self.b64_audio_buffer)  # 清空 Base64 队列
-        self._clear_queue(self.raw_audio_buffer)  # 清空原始音频队列
-
-        with self._cnt_lock:  # 获取计数器锁
-            self._pending_b64 = 0  # 清零 Base64 计数
-            self._pending_raw_bytes = 0  # 清零原始字节计数
-
-        if reset_stream:  # 如果需要重置流
+        self.b64_audio_buffer.put("")  # 空串唤醒阻塞在 get 上的解码线程（不计数，取到后直接跳过）
+
+        # raw 环只允许消费者清空、音频流只允许在播放线程不写入时重建：
+        # 等待播放线程停在打断分支（最多多写完一个播放块）后再操作
+        consumer_running = self._player_thread.is_alive() or (
+            self._use_callback and self.player_stream.is_active()
+        )  # 回调模式下 PortAudio 回调同样是 raw 环的消费者
+        parked = not consumer_running or self._player_parked.wait(timeout=0.2)  # 是否已停靠
+        if not parked:  # 停靠超时
+            logger.warning("[Player] 等待播放线程停靠超时，强制清空缓冲区")  # 记录警告
+        self.raw_audio_buffer.clear()  # 清空原始音频环
+        self._pending_reference.clear()  # 待发布参考样本同样只由播放线程消费，此时一并丢弃
+
+        # 计数器的写者线程都停靠后，把"出"同步为"入"即为清零
+        if self._decoder_thread.is_alive() and not self._decoder_parked.wait(timeout=0.2):
+            logger.warning("[Player] 等待解码线程停靠超时，强制清零计数")  # 记录警告
+        self._b64_out = self._b64_in  # 清零 Base64 计数
+        self._raw_out = self._raw_in  # 清零原始字节计数
+
+        # 回调模式不重建流：回调已在输出静音，而 stop_stream（Pa_StopStream）会先播完驱动中已排队的缓冲，
+        # 重建既不能更快停声，还会让打断阻塞在关闭/重新打开设备上
+        if reset_stream and self._use_callback:  # 回调模式
+            pass
+        elif reset_stream and not parked:  # 播放线程可能仍在 write 中
+            logger.warning("[Player] 播放线程仍在写入，跳过重置音频流")  # 不与写入并发关闭流
+        elif reset_stream:  # 如果需要重置流
             with self._stream_lock:  # 获取流操作锁
-                with contextlib.suppress(Exception):  # 忽略异常
-                    if self.player_stream.is_active():  # 检查流是否活跃
-                        self.player_stream.stop_stream()  # 停止流
-                with contextlib.suppress(Exception):  # 忽略异常
-                    self.player_stream.close()  # 关闭流
-                with contextlib.suppress(Exception):  # 忽略异常
-                    self.player_stream = self._open_stream()  # 重新打开流
+                old = self.player_stream  # 当前输出流
+                spare, self._spare_stream = self._spare_stream, None  # 取出备用流
+                if spare is not None:  # 有备用流：换用，不在打断路径上等待设备关闭/打开
+                    try:
+                        spare.start_stream()  # 启动备用流
+                        self.player_stream = spare  # 播放线程下一次 write 写入新流
+                    except Exception as e:  # 启动失败：回退到同步重建
+                        logger.warning("[Player] 备用音频流启动失败: %s", e)  # 记录警告
+                        with contextlib.suppress(Exception):  # 忽略异常
+                            spare.close()  # 关闭失败的备用流
+                        spare = None
+            if spare is not None:  # 已换用备用流
+                threading.Thread(target=self._recycle_stream, args=(old,), daemon=True).start()  # 后台关闭旧流并补充备用流
+            else:
+                with self._stream_lock:  # 获取流操作锁
+                    rate = self._device_sample_rate  # 重建前的设备采样率
+                    with contextlib.suppress(Exception):  # 忽略异常
+                        if self.player_stream.is_active():  # 检查流是否活跃
+                            self.player_stream.stop_stream()  # 停止流
+                    with contextlib.suppress(Exception):  # 忽略异常
+                        self.player_stream.close()  # 关闭流
+                    with contextlib.suppress(Exception):  # 忽略异常
+                        self.player_stream = self._open_stream()  # 重新打开流
+                        self._start_playback()  # 回调模式需要重新启动流
+                    if self._device_sample_rate != rate:  # 打开流走了回退路径，采样率已改变
+                        self._apply_device_rate()  # 两个线程都已停靠，按新采样率重建状态
 
         # 立即标记 idle
         self._idle_event.set()  # 设置空闲事件
 
         # 解除 abort（允许后续新的 response 正常播放）
         self._abort_event.clear()  # 清除打断事件
+        self._resume_event.set()  # 唤醒解码/播放线程
 
     def _decoder_loop(self):
         """解码线程：将 Base64 编码的 PCM 解码为原始音频数据"""
@@ -213,7 +425,10 @@ class B64PCMPlayer:
                     break  # 退出循环
 
             if self._abort_event.is_set():  # 检查是否被打断
-                time.sleep(0.01)  # 短暂休眠
+                self._ref_in_phase = 0  # 新的回复从零余数开始
+                self._reset_resamplers()  # 新的回复从静音开始（丢弃被打断音频的滤波器状态）
+                self._decoder_parked.set()  # 通知 interrupt：不再修改计数器
+                self._resume_event.wait(timeout=0.1)  # 阻塞到打断结束（超时用于检查停止标志）
                 continue  # 跳过本次循环
 
             recv_b64 = None  # 初始化接收变量
@@ -224,97 +439,161 @@ class B64PCMPlayer:
                 self._try_set_idle()  # 尝试设置空闲
                 continue  # 继续下一次循环
 
-            with self._cnt_lock:  # 获取计数器锁
-                if self._pending_b64 > 0:  # 如果有待处理计数
-                    self._pending_b64 -= 1  # 减少计数
-
-            try:
-                raw = base64.b64decode(recv_b64)  # 解码 Base64
-            except Exception:  # 捕获解码异常
+            # 合并已在队列中排队的后续小消息，整批解码并一次写入 raw 环（摊薄每条消息的固定开销）
+            pieces = [recv_b64]  # 本批片段
+            total = len(recv_b64)  # 本批字符数
+            while total < B64_COALESCE_LIMIT:  # 未达到合并上限
+                try:
+                    nxt = self.b64_audio_buffer.get_nowait()  # 非阻塞取下一条
+                except queue.Empty:  # 队列已空
+                    break  # 结束合并
+                if nxt:  # 跳过 interrupt 的唤醒空串（不计数）
+                    pieces.append(nxt)  # 加入本批
+                    total += len(nxt)  # 累计字符数
+
+            raw = _decode_b64_batch(pieces)  # 解码 Base64
+            if not raw or self._abort_event.is_set():  # 全部解码失败，或解码期间被打断
+                self._b64_out += len(pieces)  # 减少计数
                 self._try_set_idle()  # 尝试设置空闲
                 continue  # 继续下一次循环
 
-            if self._abort_event.is_set():  # 解码后再次检查打断
-                self._try_set_idle()  # 尝试设置空闲
-                continue  # 跳过本次循环
-
-            # 将解码后的数据分片放入原始音频队列
-            for i in range(0, len(raw), self.chunk_size_bytes):  # 按块大小遍历
-                chunk = raw[i:i + self.chunk_size_bytes]  # 提取数据块
-                if not chunk:  # 如果块为空
-                    continue  # 跳过
-                with self._cnt_lock:  # 获取计数器锁
-                    self._pending_raw_bytes += len(chunk)  # 增加原始字节计数
-                self.raw_audio_buffer.put(chunk)  # 放入原始音频队列
+            # 将解码后的样本写入原始音频环（零拷贝解析，整条消息一次写入；环满时等待播放线程消费）
+            samples = np.frombuffer(raw, dtype=np.int16, count=len(raw) // 2)  # 零拷贝解析为 int16 样本
+            play = self._to_device_rate(samples)  # 整批重采样到设备采样率（同采样率时为零拷贝视图）
+            self._stage_reference(samples, len(play))  # AEC 参考信号：整批只重采样一次（先于 raw 写入，播放时必有可搬运的样本）
+            self._raw_in += play.nbytes  # 增加待播放字节计数（整批只加一次，且先于 _b64_out）
+            self._b64_out += len(pieces)  # 减少 Base64 计数
+            written = 0  # 已写入样本数
+            while written < len(play) and not self._abort_event.is_set():  # 打断时放弃剩余样本
+                self._space_event.clear()  # 先清除再写入，避免错过播放线程的唤醒
+                written += self.raw_audio_buffer.push(play[written:])  # 写入能容纳的部分
+                self._data_event.set()  # 唤醒播放线程
+                if written < len(play):  # 环已满
+                    self._space_event.wait(timeout=0.1)  # 等待播放线程消费
 
             self._try_set_idle()  # 尝试设置空闲
 
+    def _reset_resamplers(self):
+        """解码线程：清空流式重采样器的滤波器状态"""
+        if self.resampler is not None:
+            self.resampler.reset()
+        if self._playback_resampler is not None:
+            self._playback_resampler.reset()
+
+    def _to_device_rate(self, samples: np.ndarray) -> np.ndarray:
+        """解码线程：将一批原始采样率样本重采样到设备采样率（流式，批边界连续）"""
+        if self._device_sample_rate == self.sample_rate or self._playback_resampler is None:  # 无需重采样
+            return samples  # 原样返回
+        try:
+            return self._playback_resampler.process(samples)  # 多相 FIR 重采样（延续上一批的滤波器状态）
+        except Exception:  # 重采样失败，使用原始数据
+            return samples
+
+    def _stage_reference(self, samples: np.ndarray, n_play: int) -> None:
+        """
+        解码线程：将整条消息重采样到 16kHz 并写入待发布环（由播放端随播放进度发布）
+
+        Args:
+            samples: 原始采样率（24kHz）样本
+            n_play: 这批样本对应写入 raw 环的设备采样率样本数
+        """
+        if self.resampler is None or not len(samples):  # 重采样器不可用或空消息
+            return  # 无需处理
+        total = self._ref_in_phase + REFERENCE_SAMPLE_RATE * n_play  # 与 _release_reference 相同的取整规则
+        count = total // self._device_sample_rate  # 本批应发布的参考样本数
+        self._ref_in_phase = total - count * self._device_sample_rate  # 保存余数，避免逐批取整累积漂移
+        if time.monotonic_ns() - self._last_ref_read_ns > REFERENCE_IDLE_TIMEOUT_NS:  # AEC 未在读取
+            # 跳过重采样，只写入等长静音占位，保证 AEC 恢复读取时后续参考信号仍与播放对齐
+            self._pending_reference.push(np.zeros(count, dtype=np.int16))
+            self.resampler.reset()  # 恢复读取时从静音重新开始
+            return  # 无需重采样
+        try:
+            ref_16k = self.resampler.process(samples)[:count]  # 整批一次流式重采样
+            self._pending_reference.push(ref_16k)  # 拷入待发布环
+            if len(ref_16k) < count:  # 设备采样率取整多出的样本（最多 1 个）：补零，保持两端总数一致
+                self._pending_reference.push(np.zeros(count - len(ref_16k), dtype=np.int16))
+        except Exception:  # 捕获异常
+            pass  # 重采样失败不影响播放
+
+    def _release_reference(self, n: int) -> None:
+        """播放端：即将播放 n 个设备采样率样本时，把对应的 16kHz 参考样本发布到 reference_buffer"""
+        total = self._ref_out_phase + REFERENCE_SAMPLE_RATE * n  # 与解码线程相同的取整规则
+        count = total // self._device_sample_rate  # 对应的参考样本数
+        self._ref_out_phase = total - count * self._device_sample_rate  # 保存余数
+        if count > len(self._ref_buf):  # 回调请求的帧数超出预分配大小
+            self._ref_buf = np.empty(count, dtype=np.int16)  # 扩容
+        got = self._pending_reference.pop_into(self._ref_buf[:count])  # 无锁读取
+        if got:  # 有样本
+            self.reference_buffer.push(self._ref_buf[:got])  # 发布给 AEC（已满时覆盖最旧样本）
+
     def _player_loop(self):
         """播放线程：将原始音频数据写入声卡"""
-        # 细分为更短的写入粒度（40ms），让"打断"更灵敏
-        sub_bytes = int(40 * self.sample_rate * 2 // 1000)  # 40ms 音频数据长度
-
         while True:  # 主循环
             with self._status_lock:  # 获取状态锁
                 if self._status == "stop":  # 检查是否需要停止
                     break  # 退出循环
 
             if self._abort_event.is_set():  # 检查是否被打断
-                time.sleep(0.005)  # 短暂休眠
+                self._ref_out_phase = 0  # 新的回复从零余数开始
+                self._player_parked.set()  # 通知 interrupt：已停止读取 raw 环
+                self._resume_event.wait(timeout=0.1)  # 阻塞到打断结束（超时用于检查停止标志）
                 continue  # 跳过本次循环
 
-            chunk = None  # 初始化数据块
-            with contextlib.suppress(queue.Empty):  # 忽略队列空异常
-                chunk = self.raw_audio_buffer.get(timeout=0.1)  # 从队列取数据
-
-            if not chunk:  # 如果没有数据
+            self._data_event.clear()  # 先清除再读取，避免错过解码线程的唤醒
+            n = self.raw_audio_buffer.pop_into(self._play_buf)  # 无锁读取最多一块样本
+            if not n:  # 如果没有数据
                 self._try_set_idle()  # 尝试设置空闲
+                self._data_event.wait(timeout=0.1)  # 阻塞到解码线程写入（超时用于检查停止标志）
                 continue  # 继续下一次循环
+            self._space_event.set()  # 唤醒等待空间的解码线程
+            samples = self._play_buf[:n]  # 本块样本（设备采样率，预分配缓冲区视图）
+            nbytes = n * 2  # 本块字节数
 
             # 写入前检查打断
             if self._abort_event.is_set():  # 检查是否被打断
-                with self._cnt_lock:  # 修复：Lock 对象不是 callable，不需要括号
-                    self._pending_raw_bytes = max(0, self._pending_raw_bytes - len(chunk))  # 减少计数
+                self._raw_out += nbytes  # 减少计数
                 self._try_set_idle()  # 尝试设置空闲
-                continue  # 跳过本次循环
+                continue  # 跳过本次循环（下一轮进入打断分支并停靠）
 
             # === AEC 支持：播放前保存参考信号 ===
             if self.resampler is not None:  # 检查重采样器是否可用
-                try:
-                    # 将 24kHz 数据重采样到 16kHz，用作 AEC 参考信号
-                    ref_16k = self.resampler.resample_24k_to_16k(chunk)  # 执行重采样
-                    if ref_16k and not self.reference_buffer.full():  # 检查缓冲区未满
-                        self.reference_buffer.put_nowait(ref_16k)  # 非阻塞放入缓冲区
-                except Exception:  # 捕获异常
-                    pass  # 重采样失败不影响播放
-
-            # === 重采样到设备支持的采样率 ===
-            chunk_to_play = chunk  # 默认使用原始数据
-            if self._device_sample_rate != self.sample_rate and self._playback_resampler is not None:
-                try:
-                    chunk_to_play = self._playback_resampler.resample(chunk, self.sample_rate, self._device_sample_rate)
-                except Exception:  # 如果重采样失败，使用原始数据
-                    chunk_to_play = chunk
+                self._release_reference(n)  # 发布与本块对应的已重采样参考样本（不在播放线程重采样）
+
+            play_bytes = samples.tobytes()  # 已是设备采样率；PyAudio.write 只接受只读的 bytes 类对象，每个样本只拷贝一次
 
             try:
-                # 把一次 chunk 再拆成更小片，避免 write 阻塞太久
-                sub_bytes = int(40 * self._device_sample_rate * 2 // 1000)  # 40ms 音频数据长度（使用设备采样率）
-                for i in range(0, len(chunk_to_play), sub_bytes):  # 按子块大小遍历
-                    if self._abort_event.is_set():  # 检查是否被打断
-                        break  # 退出循环
-                    sub = chunk_to_play[i:i + sub_bytes]  # 提取子块
-                    if not sub:  # 如果子块为空
-                        continue  # 跳过
-                    with self._stream_lock:  # 获取流操作锁
-                        self.player_stream.write(sub)  # 写入音频流
+                # 播放块本身已是较短的粒度（默认 40ms），整块一次 write，打断延迟不超过一个块
+                # 不加锁：只有本线程写流，interrupt 等本线程停靠后才重建流
+                self.player_stream.write(play_bytes)  # 写入音频流
             except Exception as e:  # 捕获写入异常
                 logger.error(f"[Player] write failed: {e}")  # 记录错误
                 time.sleep(0.01)  # 短暂休眠
             finally:
-                with self._cnt_lock:  # 获取计数器锁
-                    self._pending_raw_bytes = max(0, self._pending_raw_bytes - len(chunk))  # 减少计数
+                self._raw_out += nbytes  # 减少计数
                 self._try_set_idle()  # 尝试设置空闲
 
+    def _pa_callback(self, in_data, frame_count, time_info, status):
+        """PortAudio 回调（回调模式）：直接从 raw 环拉取样本，不足部分补静音"""
+        if self._status == "stop":  # 已关闭
+            return bytes(frame_count * 2), pyaudio.paComplete  # 输出静音并结束流
+        if self._abort_event.is_set():  # 被打断：输出静音，不再读取 raw 环
+            self._ref_out_phase = 0  # 新的回复从零余数开始
+            self._player_parked.set()  # 通知 interrupt：可以清空 raw 环
+            return bytes(frame_count * 2), pyaudio.paContinue  # 输出静音
+
+        if frame_count > len(self._cb_buf):  # 请求超出预分配大小（个别后端不遵守 frames_per_buffer）
+            self._cb_buf = np.zeros(frame_count, dtype=np.int16)  # 扩容
+        out = self._cb_buf[:frame_count]  # 本次输出视图
+        n = self.raw_audio_buffer.pop_into(out)  # 无锁读取
+        if n:  # 有样本
+            self._space_event.set()  # 唤醒等待空间的解码线程
+            if self.resampler is not None:  # 检查重采样器是否可用
+                self._release_reference(n)  # 发布对应的参考信号
+            self._raw_out += n * 2  # 减少计数
+        out[n:] = 0  # 欠载部分补静音
+        self._try_set_idle()  # 尝试设置空闲
+        return out.tobytes(), pyaudio.paContinue  # 交给 PortAudio
+
     def wait_until_idle(self, timeout: float = 10.0) -> bool:
         """
         等待播放器进入空闲状态
@@ -327,32 +606,63 @@ class B64PCMPlayer:
         """
         return self._idle_event.wait(timeout=timeout)  # 等待空闲事件
 
-    def get_reference_frame(self, timeout: float = 0.01) -> bytes:
+    def get_reference_frame(self, timeout: float = 0.01, num_samples: int = REFERENCE_FRAME_SAMPLES) -> bytes:
         """
         获取一帧参考信号（用于 AEC）
         
         Args:
-            timeout: 等待超时时间（默认 10ms）
+            timeout: 缓冲区为空时的等待时间（默认 10ms）
+            num_samples: 每帧样本数（默认 320 = 20ms @ 16kHz）
         
         Returns:
-            16kHz 单声道 16-bit PCM 数据，如果队列为空返回空字节串
+            num_samples 个样本的 16kHz 单声道 16-bit PCM 数据，不足部分补零；
+            缓冲区为空时返回静音帧（而不是空字节串，调用方无需处理短帧）
         """
-        try:
-            return self.reference_buffer.get(timeout=timeout)  # 从缓冲区获取参考帧
-        except queue.Empty:  # 队列为空
-            return b""  # 返回空数据
+        self._last_ref_read_ns = time.monotonic_ns()  # 标记 AEC 正在消费参考信号
+        if self.reference_buffer.empty() and timeout > 0:  # 缓冲区为空，等待一次
+            time.sleep(timeout)  # 短暂等待播放线程写入
+        if self.reference_buffer.empty():  # 仍然没有参考信号（未在播放）
+            if num_samples == REFERENCE_FRAME_SAMPLES:  # 默认帧长
+                return self._silence_ref  # 复用预分配的静音帧
+            return bytes(num_samples * 2)  # 其他帧长的静音
+        return self.get_reference_samples(num_samples)  # 读取可用样本并补零
+
+    def get_reference_samples(self, num_samples: int) -> bytes:
+        """
+        非阻塞读取定长参考信号（用于 AEC 批量处理）
+        
+        Args:
+            num_samples: 需要的样本数（如 200ms 麦克风块对应的样本数）
+        
+        Returns:
+            num_samples 个样本的 16-bit PCM 数据，不足部分补零（未播放视为静音）
+        """
+        self._last_ref_read_ns = time.monotonic_ns()  # 标记 AEC 正在消费参考信号
+        out = np.zeros(num_samples, dtype=np.int16)  # 预填静音
+        self.reference_buffer.pop_into(out)  # 读取可用样本
+        return out.tobytes()  # 转为字节
 
     def shutdown(self):
         """关闭播放器，释放资源"""
         with self._status_lock:  # 获取状态锁
             self._status = "stop"  # 设置停止状态
+        # 唤醒所有阻塞等待，让线程立即看到停止标志
+        self._resume_event.set()
+        self._data_event.set()
+        self._space_event.set()
         self._decoder_thread.join(timeout=1)  # 等待解码线程结束
-        self._player_thread.join(timeout=1)  # 等待播放线程结束
+        if self._player_thread.is_alive():  # 回调模式下播放线程未启动
+            self._player_thread.join(timeout=1)  # 等待播放线程结束
         with contextlib.suppress(Exception):  # 忽略异常
             with self._stream_lock:  # 获取流操作锁
                 if self.player_stream and self.player_stream.is_active():
                     self.player_stream.stop_stream()
                 self.player_stream.close()  # 关闭音频流
+        with contextlib.suppress(Exception):  # 忽略异常
+            with self._stream_lock:  # 获取流操作锁
+                spare, self._spare_stream = self._spare_stream, None  # 取出备用流
+                if spare is not None:
+                    spare.close()  # 关闭备用流
         logger.info("[Player] 播放器已关闭")
 
 
@@ -9,17 +9,114 @@ Bridge 层：LLM 工具调用到机器人控制的转换桥梁
 - 返回执行结果
 """
 
+import functools  # lru_cache 缓存工具名称映射
 import math  # 数学库用于角度转换
+from math import copysign  # 取符号（无 Python 分支）
 import logging  # 日志库
-from typing import List, Dict, Tuple, Any, Optional  # 类型提示
+from types import MappingProxyType  # 只读字典视图
+from typing import List, Dict, Mapping, Tuple, Any, Optional  # 类型提示
 from action_manager import ActionManager  # 导入ActionManager类型定义
-from config import SAFETY_CONFIG, LOGGING_CONFIG  # 导入配置参数
+from config import SAFETY, LOGGING  # 导入配置参数（不可变 NamedTuple）
 from tool_schema import TOOL_NAME_CN  # 导入工具名称中文映射
 
+# 可选依赖：numba（将截断核心编译为机器码，不可用时使用纯 Python 实现）
+try:
+    from numba import njit  # JIT 编译装饰器
+    NUMBA_AVAILABLE = True  # 标记 numba 可用
+except ImportError:
+    njit = None  # numba 未安装
+    NUMBA_AVAILABLE = False  # 标记 numba 不可用
+
 # 配置日志记录器
 logger = logging.getLogger(__name__)  # 获取当前模块的日志记录器
 
 
+# ===================== 安全参数常量 =====================
+# 配置在运行期间不变：导入时展开为模块级常量，校验函数中每次访问只是一次全局变量读取（无字典查找）
+
+def refresh_safety_constants() -> None:
+    """从 SAFETY / LOGGING 重新加载模块级常量（配置不可变，仅供测试在替换 bridge.SAFETY 后调用）"""
+    global _VX_MAX, _VY_MAX, _OMEGA_MAX, _MIN_DUR, _MAX_DUR, _DEF_DUR, _ROT_MIN, _ROT_MAX
+    global _LOG_TOOL_CALLS, _LOG_PARAM_VALIDATION, _LOG_RESULTS
+    _VX_MAX = float(SAFETY.MAX_SAFE_SPEED_VX)  # 前进/后退最大安全速度
+    _VY_MAX = float(SAFETY.MAX_SAFE_SPEED_VY)  # 横向最大安全速度
+    _OMEGA_MAX = float(SAFETY.MAX_SAFE_OMEGA)  # 最大安全角速度
+    _MIN_DUR = float(SAFETY.MIN_DURATION)  # 最小持续时间
+    _MAX_DUR = float(SAFETY.MAX_DURATION)  # 最大持续时间
+    _DEF_DUR = float(SAFETY.DEFAULT_DURATION)  # 默认持续时间
+    _ROT_MIN = float(SAFETY.MIN_ROTATION_DEGREES)  # 最小旋转角度
+    _ROT_MAX = float(SAFETY.MAX_ROTATION_DEGREES)  # 最大旋转角度
+    _LOG_TOOL_CALLS = bool(LOGGING.LOG_TOOL_CALLS)  # 是否记录工具调用日志
+    _LOG_PARAM_VALIDATION = bool(LOGGING.LOG_PARAMETER_VALIDATION)  # 是否记录参数验证日志
+    _LOG_RESULTS = bool(LOGGING.LOG_EXECUTION_RESULTS)  # 是否记录执行结果日志
+
+
+refresh_safety_constants()  # 导入时加载一次
+
+# 旋转指令：固定角速度 1.0 rad/s，角度 -> 持续时间只需一次乘法
+_DEG2RAD = math.pi / 180.0  # 度 -> 弧度
+_ROTATE_OMEGA = 1.0  # 固定角速度 (rad/s)
+_ROTATE_SEC_PER_DEG = _DEG2RAD / _ROTATE_OMEGA  # 每度所需旋转时间（秒）
+
+
+# ===================== 截断计算核心 =====================
+# 只做标量浮点运算，返回截断结果与位掩码；警告字符串仅在掩码非零时由外层 Python 函数生成
+
+_CLIP_VX = 1  # vx 被截断
+_CLIP_VY = 2  # vy 被截断
+_CLIP_VYAW = 4  # vyaw 被截断
+_CLIP_DURATION = 8  # duration 被截断
+
+
+def _clamp_movement_core(vx, vy, vyaw, has_duration, duration, vx_max, vy_max, omega_max, min_d, max_d, def_d):
+    """截断运动参数，has_duration 为 False 时使用默认持续时间；返回 (vx, vy, vyaw, duration, 截断位掩码)"""
+    vx_s = vx_max if vx > vx_max else (-vx_max if vx < -vx_max else vx)  # 限制vx
+    vy_s = vy_max if vy > vy_max else (-vy_max if vy < -vy_max else vy)  # 限制vy
+    vyaw_s = omega_max if vyaw > omega_max else (-omega_max if vyaw < -omega_max else vyaw)  # 限制vyaw
+    flags = 0  # 截断位掩码
+    if abs(vx - vx_s) > 0.001:  # 浮点数比较使用阈值
+        flags |= _CLIP_VX
+    if abs(vy - vy_s) > 0.001:
+        flags |= _CLIP_VY
+    if abs(vyaw - vyaw_s) > 0.001:
+        flags |= _CLIP_VYAW
+    if not has_duration:  # 未提供持续时间
+        dur_s = def_d  # 使用默认持续时间
+    elif duration != duration:  # NaN：非法持续时间，按截断处理并使用默认值
+        dur_s = def_d
+        flags |= _CLIP_DURATION
+    else:
+        dur_s = max_d if duration > max_d else (min_d if duration < min_d else duration)  # 限制duration
+        if abs(duration - dur_s) > 0.001:
+            flags |= _CLIP_DURATION
+    return vx_s, vy_s, vyaw_s, dur_s, flags
+
+
+def _clamp_rotation_core(degrees, rot_min, rot_max):
+    """截断旋转角度；返回 (截断后角度, 是否被截断)"""
+    degrees_s = rot_max if degrees > rot_max else (rot_min if degrees < rot_min else degrees)  # 限制degrees
+    return degrees_s, abs(degrees - degrees_s) > 0.001
+
+
+# 不使用 fastmath：其 no-NaN 假设会让 LLVM 改写比较，安全截断必须保持严格 IEEE 语义
+# 磁盘缓存记录了写入时的模块名：由另一导入路径（如 VoiceInteraction.bridge）写入的缓存无法加载，此时不使用缓存重新编译
+if NUMBA_AVAILABLE:
+    for _use_cache in (True, False):
+        try:
+            _clamp_movement_jit = njit(cache=_use_cache, error_model="numpy")(_clamp_movement_core)  # 编译运动参数截断
+            _clamp_rotation_jit = njit(cache=_use_cache, error_model="numpy")(_clamp_rotation_core)  # 编译角度截断
+            _clamp_movement_jit(0.0, 0.0, 0.0, False, 0.0, 1.0, 1.0, 1.0, 0.1, 10.0, 1.0)  # 导入时预热（加载/生成缓存）
+            _clamp_rotation_jit(0.0, -180.0, 180.0)  # 预热
+        except Exception as e:  # 加载或编译失败
+            _jit_error = e
+        else:
+            _clamp_movement_core = _clamp_movement_jit  # 编译成功后替换为机器码版本
+            _clamp_rotation_core = _clamp_rotation_jit
+            break
+    else:  # 两次都失败时保留纯 Python 实现
+        logger.warning("[Safety] numba 编译失败，使用纯 Python 截断: %s", _jit_error)
+
+
 # ===================== 参数验证函数 =====================
 
 def validate_movement_params(
@@ -40,43 +137,25 @@ def validate_movement_params(
     Returns:
         (是否有效, 警告信息, 修正后的参数字典)
     """
+    # 截断速度与持续时间到安全范围（未提供 duration 时由核心函数使用默认值）
+    vx, vy, vyaw = float(vx), float(vy), float(vyaw)  # 统一为 float，避免 numba 按参数类型重复编译
+    has_duration = duration is not None  # 是否提供了持续时间
+    vx_safe, vy_safe, vyaw_safe, duration_safe, flags = _clamp_movement_core(
+        vx, vy, vyaw, has_duration, float(duration) if has_duration else 0.0,
+        _VX_MAX, _VY_MAX, _OMEGA_MAX, _MIN_DUR, _MAX_DUR, _DEF_DUR
+    )  # 返回截断结果与截断位掩码
+    
+    # 仅在发生截断时生成警告信息
     warnings = []  # 警告信息列表
-    
-    # 截断速度参数到安全范围
-    vx_safe = max(
-        -SAFETY_CONFIG["MAX_SAFE_SPEED_VX"], 
-        min(vx, SAFETY_CONFIG["MAX_SAFE_SPEED_VX"])
-    )  # 限制vx在[-MAX_SAFE_SPEED_VX, MAX_SAFE_SPEED_VX]范围内
-    
-    vy_safe = max(
-        -SAFETY_CONFIG["MAX_SAFE_SPEED_VY"], 
-        min(vy, SAFETY_CONFIG["MAX_SAFE_SPEED_VY"])
-    )  # 限制vy在[-MAX_SAFE_SPEED_VY, MAX_SAFE_SPEED_VY]范围内
-    
-    vyaw_safe = max(
-        -SAFETY_CONFIG["MAX_SAFE_OMEGA"], 
-        min(vyaw, SAFETY_CONFIG["MAX_SAFE_OMEGA"])
-    )  # 限制vyaw在[-MAX_SAFE_OMEGA, MAX_SAFE_OMEGA]范围内
-    
-    # 检测是否发生截断
-    if abs(vx - vx_safe) > 0.001:  # 检测vx是否被截断（浮点数比较使用阈值）
-        warnings.append(f"vx={vx:.2f} 超限，已截断为 {vx_safe:.2f}")  # 添加截断警告
-    if abs(vy - vy_safe) > 0.001:  # 检测vy是否被截断
-        warnings.append(f"vy={vy:.2f} 超限，已截断为 {vy_safe:.2f}")  # 添加截断警告
-    if abs(vyaw - vyaw_safe) > 0.001:  # 检测vyaw是否被截断
-        warnings.append(f"vyaw={vyaw:.2f} 超限，已截断为 {vyaw_safe:.2f}")  # 添加截断警告
-    
-    # 处理持续时间参数
-    if duration is not None:  # 如果提供了持续时间参数
-        duration_safe = max(
-            SAFETY_CONFIG["MIN_DURATION"], 
-            min(duration, SAFETY_CONFIG["MAX_DURATION"])
-        )  # 限制duration在[MIN_DURATION, MAX_DURATION]范围内
-        
-        if abs(duration - duration_safe) > 0.001:  # 检测duration是否被截断
+    if flags:  # 至少一个参数被截断
+        if flags & _CLIP_VX:  # vx被截断
+            warnings.append(f"vx={vx:.2f} 超限，已截断为 {vx_safe:.2f}")  # 添加截断警告
+        if flags & _CLIP_VY:  # vy被截断
+            warnings.append(f"vy={vy:.2f} 超限，已截断为 {vy_safe:.2f}")  # 添加截断警告
+        if flags & _CLIP_VYAW:  # vyaw被截断
+            warnings.append(f"vyaw={vyaw:.2f} 超限，已截断为 {vyaw_safe:.2f}")  # 添加截断警告
+        if flags & _CLIP_DURATION:  # duration被截断
             warnings.append(f"duration={duration:.2f} 超限，已截断为 {duration_safe:.2f}")  # 添加截断警告
-    else:
-        duration_safe = SAFETY_CONFIG["DEFAULT_DURATION"]  # 使用默认持续时间
     
     # 构建修正后的参数字典
     safe_params = {
@@ -87,8 +166,8 @@ def validate_movement_params(
     }
     
     # 记录验证日志
-    if LOGGING_CONFIG["LOG_PARAMETER_VALIDATION"] and warnings:  # 如果启用参数验证日志且有警告
-        logger.warning(f"[Safety] 参数验证警告: {'; '.join(warnings)}")  # 记录警告信息
+    if _LOG_PARAM_VALIDATION and warnings:  # 如果启用参数验证日志且有警告
+        logger.warning("[Safety] 参数验证警告: %s", '; '.join(warnings))  # 记录警告信息
     
     # 返回验证结果
     is_valid = len(warnings) == 0  # 无警告则认为参数有效
@@ -107,17 +186,15 @@ def validate_rotation_angle(degrees: float) -> Tuple[bool, str, float]:
         (是否有效, 警告信息, 修正后的角度)
     """
     # 截断角度到安全范围
-    degrees_safe = max(
-        SAFETY_CONFIG["MIN_ROTATION_DEGREES"], 
-        min(degrees, SAFETY_CONFIG["MAX_ROTATION_DEGREES"])
-    )  # 限制degrees在[MIN_ROTATION_DEGREES, MAX_ROTATION_DEGREES]范围内
+    degrees = float(degrees)  # 统一为 float
+    degrees_safe, clipped = _clamp_rotation_core(degrees, _ROT_MIN, _ROT_MAX)  # 限制degrees在[MIN_ROTATION_DEGREES, MAX_ROTATION_DEGREES]范围内
     
     # 检测是否发生截断
     warning = ""  # 初始化警告信息
-    if abs(degrees - degrees_safe) > 0.001:  # 检测degrees是否被截断
+    if clipped:  # 检测degrees是否被截断
         warning = f"角度={degrees:.1f}° 超限，已截断为 {degrees_safe:.1f}°"  # 生成警告信息
-        if LOGGING_CONFIG["LOG_PARAMETER_VALIDATION"]:  # 如果启用参数验证日志
-            logger.warning(f"[Safety] {warning}")  # 记录警告
+        if _LOG_PARAM_VALIDATION:  # 如果启用参数验证日志
+            logger.warning("[Safety] %s", warning)  # 记录警告
     
     is_valid = warning == ""  # 无警告则认为角度有效
     return is_valid, warning, degrees_safe  # 返回（是否有效, 警告信息, 修正后角度）
@@ -125,6 +202,8 @@ def validate_rotation_angle(degrees: float) -> Tuple[bool, str, float]:
 
 # ===================== 工具执行函数 =====================
 
+_EMPTY_ARGS: Dict[str, Any] = {}  # 缺省工具参数（共享实例，只读，切勿修改）
+
 def execute_tool_calls_sequential(
     tool_calls: List[Dict[str, Any]], 
     action_manager: ActionManager, 
@@ -141,31 +220,29 @@ def execute_tool_calls_sequential(
     Returns:
         执行结果列表，每个元素对应一个工具调用的结果
     """
-    results = []  # 初始化结果列表
-    
     if not tool_calls:  # 检查工具调用列表是否为空
         logger.warning("[Bridge] 工具调用列表为空")  # 记录警告
-        return results  # 返回空结果列表
+        return []  # 返回空结果列表
     
-    logger.info(f"[Bridge] 开始顺序执行 {len(tool_calls)} 个工具调用")  # 记录日志
+    total = len(tool_calls)  # 工具调用数量
+    results = [None] * total  # 预分配结果列表，避免逐个 append 扩容
+    _get = dict.get  # 局部绑定，省去循环内的方法查找
+    failed = 0  # 执行失败的工具数量
     
     for idx, tool_call in enumerate(tool_calls):  # 遍历工具调用列表
-        tool_name = tool_call.get("name", "unknown")  # 获取工具名称
-        params = tool_call.get("arguments", {})  # 获取工具参数
-        
-        logger.info(f"[Bridge] 执行工具 {idx+1}/{len(tool_calls)}: {tool_name}")  # 记录当前执行进度
+        tool_name = _get(tool_call, "name", "unknown")  # 获取工具名称
+        params = _get(tool_call, "arguments", _EMPTY_ARGS)  # 获取工具参数（缺省时共享只读空字典）
+        logger.debug("[Bridge] 执行工具 %d/%d: %s", idx + 1, total, tool_name)  # 记录当前执行进度（仅 DEBUG 级别）
         
-        # 调用单个工具执行函数
         result = execute_tool_call(tool_name, params, action_manager, g1_client)  # 执行工具
-        results.append(result)  # 添加结果到列表
+        results[idx] = result  # 写入对应位置
         
-        # 如果执行失败，记录错误但继续执行后续工具（可选：根据策略决定是否继续）
-        if result.get("status") == "error":  # 检查执行结果
-            logger.error(f"[Bridge] 工具 {tool_name} 执行失败: {result.get('message')}")  # 记录错误
-            # 这里可以选择：continue (继续) 或 break (停止)
-            # 当前策略：继续执行后续工具
+        # 执行失败时记录错误但继续执行后续工具
+        if result.get("status") == "error":  # 检查执行结果（结果可能是共享的只读映射，不能用 dict.get）
+            failed += 1  # 失败计数
+            logger.error("[Bridge] 工具 %s 执行失败: %s", tool_name, result.get("message"))  # 记录错误
     
-    logger.info(f"[Bridge] 所有工具调用已添加到队列，共 {len(results)} 个")  # 记录完成日志
+    logger.info("[Bridge] 顺序执行 %d 个工具调用完成，失败 %d 个", total, failed)  # 汇总日志
     return results  # 返回结果列表
 
 
@@ -193,49 +270,53 @@ def execute_tool_call(
     # 检查 ActionManager 是否就绪
     if not action_manager:  # 检查action_manager是否为None
         error_msg = "ActionManager 未初始化"  # 错误信息
-        logger.error(f"[Bridge] {error_msg}")  # 记录错误日志
+        logger.error("[Bridge] %s", error_msg)  # 记录错误日志
         return {"status": "error", "message": error_msg}  # 返回错误结果
     
     if not action_manager._running:  # 检查ActionManager是否正在运行
         error_msg = "ActionManager 未运行"  # 错误信息
-        logger.error(f"[Bridge] {error_msg}")  # 记录错误日志
+        logger.error("[Bridge] %s", error_msg)  # 记录错误日志
         return {"status": "error", "message": error_msg}  # 返回错误结果
     
     # 记录工具调用日志
-    tool_name_cn = TOOL_NAME_CN.get(tool_name, tool_name)  # 获取工具的中文名称
-    if LOGGING_CONFIG["LOG_TOOL_CALLS"]:  # 如果启用工具调用日志
-        logger.info(f"[Bridge] 执行工具: {tool_name_cn} ({tool_name}), 参数: {params}")  # 记录工具调用信息
+    if _LOG_TOOL_CALLS:  # 如果启用工具调用日志（关闭时不做名称查找）
+        logger.info("[Bridge] 执行工具: %s (%s), 参数: %s", _tool_name_cn(tool_name), tool_name, params)  # 记录工具调用信息
     
     try:
-        # 根据工具名称分发执行
-        if tool_name == "move_robot":  # 移动机器人工具
-            return _execute_move_robot(params, action_manager)  # 调用移动机器人函数
-        
-        elif tool_name == "stop_robot":  # 停止机器人工具
-            return _execute_stop_robot(action_manager)  # 调用停止机器人函数
-        
-        elif tool_name == "rotate_angle":  # 旋转角度工具
-            return _execute_rotate_angle(params, action_manager)  # 调用旋转角度函数
-        
-        elif tool_name == "emergency_stop":  # 紧急停止工具
-            return _execute_emergency_stop(action_manager)  # 调用紧急停止函数
-        
-        elif tool_name == "wave_hand":  # 挥手动作
-            return _execute_wave_hand(g1_arm_client)
-        
-        else:  # 未知工具名称
+        # 根据工具名称分发执行（一次字典查找代替 if/elif 逐个比较）
+        handler = _TOOL_DISPATCH.get(tool_name)  # 查找工具处理函数
+        if handler is None:  # 未知工具名称
             error_msg = f"未知工具: {tool_name}"  # 错误信息
-            logger.error(f"[Bridge] {error_msg}")  # 记录错误日志
+            logger.error("[Bridge] %s", error_msg)  # 记录错误日志
             return {"status": "error", "message": error_msg}  # 返回错误结果
+        
+        return handler(params, action_manager, g1_client, g1_arm_client)  # 调用工具处理函数
     
     except Exception as e:  # 捕获所有异常
         error_msg = f"执行工具 {tool_name} 时发生异常: {str(e)}"  # 错误信息
-        logger.exception(f"[Bridge] {error_msg}")  # 记录异常日志（包含堆栈）
+        logger.exception("[Bridge] %s", error_msg)  # 记录异常日志（包含堆栈）
         return {"status": "error", "message": error_msg}  # 返回错误结果
 
 
 # ===================== 具体工具实现 =====================
 
+# 固定内容的成功结果：模块加载时构建一次，只读共享（调用方只读取 status/message/data，修改会抛出 TypeError）
+_STOP_RESULT = MappingProxyType({
+    "status": "success",  # 状态：成功
+    "message": "机器人已停止运动",  # 执行信息
+    "data": MappingProxyType({"vx": 0.0, "vy": 0.0, "vyaw": 0.0}),  # 停止后的速度
+})
+_ESTOP_RESULT = MappingProxyType({
+    "status": "success",  # 状态：成功
+    "message": "执行紧急停止！机器人已进入阻尼模式",  # 执行信息
+    "data": MappingProxyType({"emergency": True}),  # 紧急停止标志
+})
+_WAVE_RESULT = MappingProxyType({
+    "status": "success",  # 状态：成功
+    "message": "挥手动作已执行",  # 执行信息
+    "data": MappingProxyType({"action": "wave_hand", "type": "face_wave"}),  # 动作详情
+})
+
 def _execute_move_robot(params: Dict[str, Any], action_manager: ActionManager) -> Dict[str, Any]:
     """执行移动机器人指令"""
     # 提取参数
@@ -278,28 +359,21 @@ def _execute_move_robot(params: Dict[str, Any], action_manager: ActionManager) -
     if warning:  # 如果有警告信息
         result["warning"] = warning  # 添加警告字段
     
-    if LOGGING_CONFIG["LOG_EXECUTION_RESULTS"]:  # 如果启用执行结果日志
-        logger.info(f"[Bridge] {result['message']}")  # 记录执行结果
+    if _LOG_RESULTS:  # 如果启用执行结果日志
+        logger.info("[Bridge] %s", result['message'])  # 记录执行结果
     
     return result  # 返回执行结果
 
 
-def _execute_stop_robot(action_manager: ActionManager) -> Dict[str, Any]:
+def _execute_stop_robot(action_manager: ActionManager) -> Mapping[str, Any]:
     """执行停止机器人指令"""
     # 调用 ActionManager 的停止方法
     action_manager.set_idle()  # 设置为空闲状态（速度归零）
     
-    # 构建返回结果
-    result = {
-        "status": "success",  # 状态：成功
-        "message": "机器人已停止运动",  # 执行信息
-        "data": {"vx": 0.0, "vy": 0.0, "vyaw": 0.0}  # 停止后的速度
-    }
-    
-    if LOGGING_CONFIG["LOG_EXECUTION_RESULTS"]:  # 如果启用执行结果日志
-        logger.info(f"[Bridge] {result['message']}")  # 记录执行结果
+    if _LOG_RESULTS:  # 如果启用执行结果日志
+        logger.info("[Bridge] %s", _STOP_RESULT['message'])  # 记录执行结果
     
-    return result  # 返回执行结果
+    return _STOP_RESULT  # 返回共享的只读结果
 
 
 def _execute_rotate_angle(params: Dict[str, Any], action_manager: ActionManager) -> Dict[str, Any]:
@@ -312,16 +386,12 @@ def _execute_rotate_angle(params: Dict[str, Any], action_manager: ActionManager)
     
     # 计算旋转所需的角速度和时间
     # 策略：使用固定角速度 1.0 rad/s，根据角度计算持续时间
-    omega = 1.0  # 固定角速度 (rad/s)
-    radians = math.radians(degrees_safe)  # 将角度转换为弧度
-    duration = abs(radians) / omega  # 计算持续时间（秒）
-    vyaw = omega if radians > 0 else -omega  # 根据角度正负确定旋转方向
+    radians = degrees_safe * _DEG2RAD  # 将角度转换为弧度
+    duration = abs(degrees_safe) * _ROTATE_SEC_PER_DEG  # 计算持续时间（秒）= |弧度| / 角速度
+    vyaw = copysign(_ROTATE_OMEGA, degrees_safe)  # 根据角度正负确定旋转方向（0° 按正方向）
     
     # 限制持续时间在安全范围内
-    duration = max(
-        SAFETY_CONFIG["MIN_DURATION"], 
-        min(duration, SAFETY_CONFIG["MAX_DURATION"])
-    )  # 限制duration在[MIN_DURATION, MAX_DURATION]范围内
+    duration = _MAX_DUR if duration > _MAX_DUR else (_MIN_DUR if duration < _MIN_DUR else duration)  # 限制duration在[MIN_DURATION, MAX_DURATION]范围内
     
     # 使用任务队列（新增）
     task_id = action_manager.add_task(
@@ -354,56 +424,59 @@ def _execute_rotate_angle(params: Dict[str, Any], action_manager: ActionManager)
     if warning:  # 如果有警告信息
         result["warning"] = warning  # 添加警告字段
     
-    if LOGGING_CONFIG["LOG_EXECUTION_RESULTS"]:  # 如果启用执行结果日志
-        logger.info(f"[Bridge] {result['message']}")  # 记录执行结果
+    if _LOG_RESULTS:  # 如果启用执行结果日志
+        logger.info("[Bridge] %s", result['message'])  # 记录执行结果
     
     return result  # 返回执行结果
 
 
-def _execute_emergency_stop(action_manager: ActionManager) -> Dict[str, Any]:
+def _execute_emergency_stop(action_manager: ActionManager) -> Mapping[str, Any]:
     """执行紧急停止指令"""
     # 调用 ActionManager 的紧急停止方法
     action_manager.emergency_stop()  # 立即切换到阻尼模式并停止运动
     
-    # 构建返回结果
-    result = {
-        "status": "success",  # 状态：成功
-        "message": "执行紧急停止！机器人已进入阻尼模式",  # 执行信息
-        "data": {"emergency": True}  # 紧急停止标志
-    }
-    
-    if LOGGING_CONFIG["LOG_EXECUTION_RESULTS"]:  # 如果启用执行结果日志
-        logger.warning(f"[Bridge] {result['message']}")  # 记录执行结果（使用warning级别强调）
+    if _LOG_RESULTS:  # 如果启用执行结果日志
+        logger.warning("[Bridge] %s", _ESTOP_RESULT['message'])  # 记录执行结果（使用warning级别强调）
     
-    return result  # 返回执行结果
+    return _ESTOP_RESULT  # 返回共享的只读结果
 
 
-def _execute_wave_hand(g1_arm_client: Any) -> Dict[str, Any]:
+def _execute_wave_hand(g1_arm_client: Any) -> Mapping[str, Any]:
     """执行挥手动作指令"""
     # 检查 g1_arm_client 是否可用
     if not g1_arm_client:  # 检查 g1_arm_client 是否为 None
         error_msg = "G1 手臂动作客户端未初始化"  # 错误信息
-        logger.error(f"[Bridge] {error_msg}")  # 记录错误日志
+        logger.error("[Bridge] %s", error_msg)  # 记录错误日志
         return {"status": "error", "message": error_msg}  # 返回错误结果
     
     try:
         # 调用 SDK 挥手接口 (face wave = 25)
         g1_arm_client.ExecuteAction(25)
         
-        # 构建返回结果
-        result = {
-            "status": "success",  # 状态：成功
-            "message": "挥手动作已执行",  # 执行信息
-            "data": {"action": "wave_hand", "type": "face_wave"}  # 动作详情
-        }
-        
-        if LOGGING_CONFIG["LOG_EXECUTION_RESULTS"]:  # 如果启用执行结果日志
-            logger.info(f"[Bridge] {result['message']}")  # 记录执行结果
+        if _LOG_RESULTS:  # 如果启用执行结果日志
+            logger.info("[Bridge] %s", _WAVE_RESULT['message'])  # 记录执行结果
         
-        return result  # 返回执行结果
+        return _WAVE_RESULT  # 返回共享的只读结果
     
     except Exception as e:  # 捕获所有异常
         error_msg = f"挥手动作执行失败: {str(e)}"  # 错误信息
-        logger.error(f"[Bridge] {error_msg}", exc_info=True)  # 记录异常日志（包含堆栈）
+        logger.error("[Bridge] %s", error_msg, exc_info=True)  # 记录异常日志（包含堆栈）
         return {"status": "error", "message": error_msg}  # 返回错误结果
 
+
+# ===================== 工具分发表 =====================
+# 统一签名 (params, action_manager, g1_client, g1_arm_client)，由 execute_tool_call 查表调用
+
+_TOOL_DISPATCH = {
+    "move_robot": lambda p, am, g1, arm: _execute_move_robot(p, am),  # 移动机器人工具
+    "stop_robot": lambda p, am, g1, arm: _execute_stop_robot(am),  # 停止机器人工具
+    "rotate_angle": lambda p, am, g1, arm: _execute_rotate_angle(p, am),  # 旋转角度工具
+    "emergency_stop": lambda p, am, g1, arm: _execute_emergency_stop(am),  # 紧急停止工具
+    "wave_hand": lambda p, am, g1, arm: _execute_wave_hand(arm),  # 挥手动作
+}
+
+@functools.lru_cache(maxsize=32)  # 工具名称来自固定小集合，命中率接近 100%；上限防止异常名称无限增长
+def _tool_name_cn(name: str) -> str:
+    """获取工具的中文名称（未知工具返回原名）"""
+    return TOOL_NAME_CN.get(name, name)  # 查找中文映射
+
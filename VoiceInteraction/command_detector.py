@@ -10,9 +10,10 @@
 创建时间: 2026-01-29
 """
 
+import functools  # lru_cache 缓存位掩码到类别集合的转换
 import re  # 导入正则表达式模块
 import logging  # 导入日志模块
-from typing import TYPE_CHECKING  # 导入类型检查
+from typing import TYPE_CHECKING, Optional, Union  # 导入类型检查
 
 if TYPE_CHECKING:
     from action_manager import ActionManager  # 仅用于类型提示
@@ -21,7 +22,151 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)  # 获取当前模块的日志记录器
 
 
-def is_interrupt_command(transcript: str) -> bool:
+# 可选依赖：pyahocorasick（Aho-Corasick 自动机，多模式单次扫描）
+try:
+    import ahocorasick  # 多模式字符串匹配库
+    AHOCORASICK_AVAILABLE = True  # 标记 pyahocorasick 可用
+except ImportError:
+    ahocorasick = None  # 未安装时回退到正则实现
+    AHOCORASICK_AVAILABLE = False  # 标记 pyahocorasick 不可用
+
+
+# ===================== 关键词分组 =====================
+# 同一关键词可以属于多个类别（如"停止"同时是强打断、弱打断停止词和停止意图）
+
+_KEYWORD_GROUPS = {
+    # 打断命令：强触发关键词
+    "interrupt_strong": (
+        "打断", "别说了", "不要说了", "闭嘴", "安静",
+        "停止播放", "暂停播放", "停止回答", "停止讲", "停止说话",
+        "停播", "停一下声音", "不要播了", "停止",
+    ),
+    "interrupt_weak_stop": ("停止", "暂停", "停一下"),  # 弱触发：停止意图
+    "interrupt_weak_verb": ("说", "讲", "回答", "播放", "声音", "语音"),  # 弱触发：语音相关词
+    # 自我介绍关键词
+    "intro": (
+        "我是", "我的名字", "我叫", "你好我是",
+        "大家好我是", "你可以叫我", "我的名字叫",
+        "让我介绍一下", "我来介绍", "自我介绍",
+    ),
+    # 复杂指令：阿拉伯数字（半角/全角）+ 中文数字/量词/修饰词/复合动作关键词
+    "complex": tuple("0123456789０１２３４５６７８９") + (
+        # "一" 太容易误触（如"介绍一下"），改为更明确的量词搭配
+        "一米", "一度", "一秒", "一步", "一圈",
+        "二", "三", "四", "五", "六", "七", "八", "九", "十", "半",
+        "慢慢", "快速", "缓缓", "稍微", "一点",
+        "并且", "同时", "然后",
+    ),
+    # 本地关键词意图
+    "estop": ("急停", "停止电机", "别动"),  # 急停
+    "wave": ("挥手", "招招手", "打个招呼", "挥挥手", "招手"),  # 挥手
+    "forward": ("前进", "向前", "往前"),  # 前进
+    "backward": ("后退", "往后", "向后"),  # 后退
+    "left": ("左转", "向左"),  # 左转
+    "right": ("右转", "向右"),  # 右转
+    "stop": ("停止", "停车", "站住"),  # 停止
+}
+
+
+_CATEGORY_BITS = {category: 1 << i for i, category in enumerate(_KEYWORD_GROUPS)}  # 类别 -> 位
+
+
+def _build_keyword_payloads():
+    """构建 关键词 -> 类别位掩码 的映射，每个关键词的掩码包含其所有子串关键词的类别"""
+    direct = {}  # 关键词 -> 直接所属类别的位掩码
+    for category, keywords in _KEYWORD_GROUPS.items():  # 遍历分组
+        for kw in keywords:
+            direct[kw] = direct.get(kw, 0) | _CATEGORY_BITS[category]  # 合并重复关键词的类别
+    # 匹配到较长关键词意味着其中的子串关键词也出现了（正则回退路径每个位置只报告最长匹配）
+    payloads = {}
+    for kw in direct:
+        mask = 0
+        for sub, bits in direct.items():
+            if sub in kw:  # 子串关键词
+                mask |= bits
+        payloads[kw] = mask
+    return payloads
+
+
+_KEYWORD_PAYLOADS = _build_keyword_payloads()  # 关键词 -> 类别位掩码（全局只读）
+_FIRST_CHARS = frozenset(kw[0] for kw in _KEYWORD_PAYLOADS)  # 所有关键词的首字符（不含其中任一字符的文本不可能命中）
+
+
+@functools.lru_cache(maxsize=256)  # 实际出现的类别组合很少，命中后不再分配集合
+def _categories_of(mask: int) -> frozenset:
+    """位掩码 -> 类别集合"""
+    return frozenset(category for category, bit in _CATEGORY_BITS.items() if mask & bit)
+
+if AHOCORASICK_AVAILABLE:
+    _AUTOMATON = ahocorasick.Automaton()  # 构建自动机（全局只读）
+    for _kw, _mask in _KEYWORD_PAYLOADS.items():
+        _AUTOMATON.add_word(_kw, _mask)  # 负载为类别位掩码
+    _AUTOMATON.make_automaton()  # 生成失败转移
+    _KEYWORD_RE = None
+else:
+    _AUTOMATON = None
+    # 回退：零宽前瞻交替式，长关键词优先，finditer 在每个位置报告以此开头的最长关键词
+    _KEYWORD_RE = re.compile(
+        "(?=(" + "|".join(map(re.escape, sorted(_KEYWORD_PAYLOADS, key=len, reverse=True))) + "))"
+    )
+
+
+def classify(text: str) -> frozenset:
+    """
+    单次扫描文本，返回命中的关键词类别集合
+
+    类别：interrupt_strong / interrupt_weak_stop / interrupt_weak_verb / intro /
+    complex / estop / wave / forward / backward / left / right / stop
+
+    Args:
+        text: 待检测文本（调用方负责去除空白）
+
+    Returns:
+        命中的类别集合
+    """
+    if _FIRST_CHARS.isdisjoint(text):  # 快速否定：一次 C 层集合检查，省去完整扫描
+        return _categories_of(0)
+    mask = 0  # 命中类别的位掩码（逐个匹配只做整数或运算，不分配集合）
+    if _AUTOMATON is not None:  # Aho-Corasick：报告全部（含重叠）匹配
+        for _end, bits in _AUTOMATON.iter(text):
+            mask |= bits  # 合并类别
+    else:
+        for m in _KEYWORD_RE.finditer(text):
+            mask |= _KEYWORD_PAYLOADS[m.group(1)]  # 合并类别（含子串关键词）
+    return _categories_of(mask)
+
+
+class NormalizedUtterance:
+    """
+    归一化后的语音转写文本
+
+    每条 ASR 结果只做一次 strip()/lower()，并缓存关键词分类结果，
+    多个检测函数共享同一对象，避免重复分配字符串和重复扫描。
+    """
+
+    __slots__ = ("raw", "norm", "_categories")
+
+    def __init__(self, text: Optional[str]):
+        self.raw = text or ""  # 原始文本
+        self.norm = self.raw.strip().lower()  # 去除空白并转小写（中文关键词不受影响）
+        self._categories = None  # 分类结果（首次访问时计算）
+
+    @property
+    def categories(self) -> frozenset:
+        """命中的关键词类别集合（惰性计算并缓存）"""
+        if self._categories is None:  # 首次访问
+            self._categories = classify(self.norm)  # 单次扫描
+        return self._categories
+
+
+def normalize(text: Union[str, NormalizedUtterance, None]) -> NormalizedUtterance:
+    """将文本归一化为 NormalizedUtterance；已归一化的对象直接复用"""
+    if isinstance(text, NormalizedUtterance):  # 已归一化
+        return text  # 直接复用
+    return NormalizedUtterance(text)  # 归一化一次
+
+
+def is_interrupt_command(transcript: Union[str, NormalizedUtterance]) -> bool:
     """
     检测是否为打断命令
     
@@ -30,40 +175,30 @@ def is_interrupt_command(transcript: str) -> bool:
     - 弱触发：出现"停止/暂停/停一下"且同时包含"说/讲/回答/播放/声音"
     
     Args:
-        transcript: 用户语音转写文本
+        transcript: 用户语音转写文本（或已归一化的 NormalizedUtterance）
         
     Returns:
         是否为打断命令
     """
-    t = (transcript or "").strip().lower()  # 转换为小写并去除空白
+    utt = normalize(transcript)  # 转换为小写并去除空白（已归一化则复用）
+    t = utt.norm  # 归一化文本
     if not t:  # 如果文本为空
         return False  # 返回 False
 
-    # 强触发关键词列表
-    strong = [
-        "打断", "别说了", "不要说了", "闭嘴", "安静",
-        "停止播放", "暂停播放", "停止回答", "停止讲", "停止说话",
-        "停播", "停一下声音", "不要播了", "停止",
-    ]
-    for k in strong:  # 遍历强触发关键词
-        if k in t:  # 如果包含关键词
-            return True  # 返回 True
-
-    # 弱触发：同时包含停止意图和语音相关词
-    if ("停止" in t or "暂停" in t or "停一下" in t or "停" == t) and any(
-        x in t for x in ["说", "讲", "回答", "播放", "声音", "语音"]
-    ):
+    cats = utt.categories  # 单次扫描（结果跨检测函数共享）
+    if "interrupt_strong" in cats:  # 如果包含强触发关键词
         return True  # 返回 True
 
-    return False  # 未匹配到打断命令
+    # 弱触发：同时包含停止意图和语音相关词
+    return ("interrupt_weak_stop" in cats or t == "停") and "interrupt_weak_verb" in cats
 
 
-def detect_self_introduction(text: str) -> bool:
+def detect_self_introduction(text: Union[str, NormalizedUtterance]) -> bool:
     """
     检测文本是否为自我介绍
     
     Args:
-        text: LLM 输出的文本内容
+        text: LLM 输出的文本内容（或已归一化的 NormalizedUtterance）
         
     Returns:
         是否为自我介绍
@@ -71,20 +206,11 @@ def detect_self_introduction(text: str) -> bool:
     if not text:  # 检查文本是否为空
         return False  # 空文本不是自我介绍
     
-    t = text.strip()  # 去除文本两端空白字符
-    
-    # 自我介绍关键词列表
-    intro_keywords = [
-        "我是", "我的名字", "我叫", "你好我是", 
-        "大家好我是", "你可以叫我", "我的名字叫",
-        "让我介绍一下", "我来介绍", "自我介绍"
-    ]
-    
     # 检查是否包含任何自我介绍关键词
-    return any(kw in t for kw in intro_keywords)
+    return "intro" in normalize(text).categories
 
 
-def is_complex_command(text: str) -> bool:
+def is_complex_command(text: Union[str, NormalizedUtterance]) -> bool:
     """
     检测指令是否为复杂指令（需要 Function Calling 处理）
     
@@ -94,35 +220,47 @@ def is_complex_command(text: str) -> bool:
     - 包含修饰词或复合动作关键词
     
     Args:
-        text: 用户语音转写文本
+        text: 用户语音转写文本（或已归一化的 NormalizedUtterance）
         
     Returns:
         是否为复杂指令
     """
-    t = (text or "").strip()  # 去除两端空白
-    if not t:  # 如果文本为空
+    utt = normalize(text)  # 去除两端空白（已归一化则复用）
+    if not utt.norm:  # 如果文本为空
         return False  # 返回 False
     
-    # 检测阿拉伯数字
-    if re.search(r'\d+', t):  # 如果包含数字
-        return True  # 返回 True
-    
-    # 检测中文数字和修饰词
-    complex_markers = [
-        # "一" 太容易误触（如"介绍一下"），改为更明确的量词搭配
-        "一米", "一度", "一秒", "一步", "一圈",
-        "二", "三", "四", "五", "六", "七", "八", "九", "十", "半",
-        "慢慢", "快速", "缓缓", "稍微", "一点",
-        "并且", "同时", "然后",
-    ]
-    if any(marker in t for marker in complex_markers):  # 如果包含复杂标记
-        return True  # 返回 True
-    
-    return False  # 非复杂指令
+    # 检测阿拉伯数字、中文数字和修饰词
+    return "complex" in utt.categories  # 包含复杂标记则为复杂指令
+
+
+def _do_wave(action_manager, g1_arm, t):
+    """执行挥手动作"""
+    logger.info("[Local] 检测到挥手指令: %s", t)  # 记录检测到挥手指令
+    if g1_arm:  # 检查 g1_arm 手臂动作客户端是否可用
+        try:
+            # 使用 G1ArmActionClient 执行挥手动作（face wave = 25, high wave = 26）
+            g1_arm.ExecuteAction(25)  # 调用 SDK 执行 face wave 动作
+            logger.info("[Local] 挥手动作执行成功（face wave）")  # 记录成功日志
+        except Exception as e:  # 捕获执行异常
+            logger.error("[Local] 挥手动作执行失败: %s", e)  # 记录错误日志
+    else:
+        logger.warning("[Local] g1_arm 客户端未初始化，无法执行挥手")  # 记录警告
+
+
+# 本地意图分派表（按优先级排列），处理函数签名 (action_manager, g1_arm, 归一化文本)
+_INTENT_DISPATCH = (
+    ("estop", lambda am, arm, t: am.emergency_stop()),  # 急停
+    ("wave", _do_wave),  # 挥手
+    ("forward", lambda am, arm, t: am.update_target_velocity(vx=0.5, vy=0.0, vyaw=0.0, duration=2.0)),  # 前进
+    ("backward", lambda am, arm, t: am.update_target_velocity(vx=-0.5, vy=0.0, vyaw=0.0, duration=2.0)),  # 后退
+    ("left", lambda am, arm, t: am.update_target_velocity(vx=0.0, vy=0.0, vyaw=0.8, duration=2.0)),  # 左转
+    ("right", lambda am, arm, t: am.update_target_velocity(vx=0.0, vy=0.0, vyaw=-0.8, duration=2.0)),  # 右转
+    ("stop", lambda am, arm, t: am.set_idle()),  # 停止
+)
 
 
 def try_execute_g1_by_local_keywords(
-    text: str, 
+    text: Union[str, NormalizedUtterance], 
     action_manager: "ActionManager",
     g1_arm=None
 ) -> bool:
@@ -130,7 +268,7 @@ def try_execute_g1_by_local_keywords(
     基于本地关键词匹配执行 G1 机器人动作
     
     Args:
-        text: 用户语音转写文本
+        text: 用户语音转写文本（或已归一化的 NormalizedUtterance）
         action_manager: 动作管理器实例
         g1_arm: G1 手臂动作客户端实例（可选）
         
@@ -146,57 +284,24 @@ def try_execute_g1_by_local_keywords(
         logger.warning("[G1] ActionManager 未运行，指令被忽略")  # 记录警告
         return False  # 返回 False
     
-    t = (text or "").strip()  # 去除文本两端空白字符
-    
-    # 急停关键词检测
-    if "急停" in t or "停止电机" in t or "别动" in t:  # 检测急停关键词
-        action_manager.emergency_stop()  # 执行急停
-        return True  # 返回 True
-    
-    # 挥手关键词检测
-    if any(kw in t for kw in ["挥手", "招招手", "打个招呼", "挥挥手", "招手"]):  # 检测挥手关键词
-        logger.info(f"[Local] 检测到挥手指令: {t}")  # 记录检测到挥手指令
-        if g1_arm:  # 检查 g1_arm 手臂动作客户端是否可用
-            try:
-                # 使用 G1ArmActionClient 执行挥手动作（face wave = 25, high wave = 26）
-                g1_arm.ExecuteAction(25)  # 调用 SDK 执行 face wave 动作
-                logger.info("[Local] 挥手动作执行成功（face wave）")  # 记录成功日志
-            except Exception as e:  # 捕获执行异常
-                logger.error(f"[Local] 挥手动作执行失败: {e}")  # 记录错误日志
-        else:
-            logger.warning("[Local] g1_arm 客户端未初始化，无法执行挥手")  # 记录警告
-        return True  # 返回 True
-    
-    # 前进关键词检测
-    if "前进" in t or "向前" in t or "往前" in t:  # 检测前进关键词
-        action_manager.update_target_velocity(vx=0.5, vy=0.0, vyaw=0.0, duration=2.0)  # 设置前进速度
-        return True  # 返回 True
-    
-    # 后退关键词检测
-    if "后退" in t or "往后" in t or "向后" in t:  # 检测后退关键词
-        action_manager.update_target_velocity(vx=-0.5, vy=0.0, vyaw=0.0, duration=2.0)  # 设置后退速度
-        return True  # 返回 True
-    
-    # 左转关键词检测
-    if "左转" in t or "向左" in t:  # 检测左转关键词
-        action_manager.update_target_velocity(vx=0.0, vy=0.0, vyaw=0.8, duration=2.0)  # 设置左转速度
-        return True  # 返回 True
-    
-    # 右转关键词检测
-    if "右转" in t or "向右" in t:  # 检测右转关键词
-        action_manager.update_target_velocity(vx=0.0, vy=0.0, vyaw=-0.8, duration=2.0)  # 设置右转速度
-        return True  # 返回 True
+    utt = normalize(text)  # 去除文本两端空白字符（已归一化则复用）
+    t = utt.norm  # 归一化文本
+    cats = utt.categories  # 单次扫描得到全部命中意图，以下按优先级分派
     
-    # 停止关键词检测
-    if "停止" in t or "停车" in t or "站住" in t:  # 检测停止关键词
-        action_manager.set_idle()  # 设置空闲状态
-        return True  # 返回 True
+    # 按优先级取第一个命中的意图（急停始终优先，与意图在文本中的先后顺序无关）
+    for category, handler in _INTENT_DISPATCH:  # 遍历意图分派表
+        if category in cats:  # 命中意图
+            handler(action_manager, g1_arm, t)  # 执行动作
+            return True  # 返回 True
         
     return False  # 未匹配到任何关键词
 
 
 # 导出公共接口
 __all__ = [
+    'classify',
+    'NormalizedUtterance',
+    'normalize',
     'is_interrupt_command',
     'detect_self_introduction', 
     'is_complex_command',
@@ -7,50 +7,67 @@
 - 配置 Function Calling 功能的行为（是否启用、超时、回退策略等）
 """
 
+from types import MappingProxyType  # 只读字典视图
+from typing import NamedTuple, Optional  # 不可变配置结构
+
+
 # ===================== 安全参数配置 =====================
 
-SAFETY_CONFIG = {
+class SafetyConfig(NamedTuple):
+    """安全参数（不可变；热路径用属性访问 SAFETY.MAX_SAFE_SPEED_VX）"""
     # 运动速度限制
-    "MAX_SAFE_SPEED_VX": 1.0,      # 前进/后退最大安全速度 (m/s)
-    "MAX_SAFE_SPEED_VY": 1.0,      # 横向最大安全速度 (m/s)
-    "MAX_SAFE_OMEGA": 2.0,         # 旋转最大安全角速度 (rad/s)
+    MAX_SAFE_SPEED_VX: float = 1.0      # 前进/后退最大安全速度 (m/s)
+    MAX_SAFE_SPEED_VY: float = 1.0      # 横向最大安全速度 (m/s)
+    MAX_SAFE_OMEGA: float = 2.0         # 旋转最大安全角速度 (rad/s)
     
     # 时间参数
-    "MAX_DURATION": 10.0,          # 单次移动最大持续时间 (秒)
-    "DEFAULT_DURATION": 1.0,       # 默认持续时间 (秒)
-    "MIN_DURATION": 0.1,           # 最小持续时间 (秒)
+    MAX_DURATION: float = 10.0          # 单次移动最大持续时间 (秒)
+    DEFAULT_DURATION: float = 1.0       # 默认持续时间 (秒)
+    MIN_DURATION: float = 0.1           # 最小持续时间 (秒)
     
     # 角度参数
-    "MAX_ROTATION_DEGREES": 180,   # 单次旋转最大角度 (度)
-    "MIN_ROTATION_DEGREES": -180,  # 单次旋转最小角度 (度)
-}
+    MAX_ROTATION_DEGREES: float = 180   # 单次旋转最大角度 (度)
+    MIN_ROTATION_DEGREES: float = -180  # 单次旋转最小角度 (度)
+
+
+SAFETY = SafetyConfig()  # 安全参数实例
+SAFETY_CONFIG = MappingProxyType(SAFETY._asdict())  # 只读字典视图（兼容按键访问）
 
 
 # ===================== Function Calling 配置 =====================
 
-FUNCTION_CALLING_CONFIG = {
+class FunctionCallingConfig(NamedTuple):
+    """Function Calling 设置（不可变）"""
     # 功能开关
-    "ENABLED": True,                       # 是否启用工具调用功能
-    "FALLBACK_TO_KEYWORDS": True,          # 工具调用失败时是否回退到关键词匹配
+    ENABLED: bool = True                       # 是否启用工具调用功能
+    FALLBACK_TO_KEYWORDS: bool = True          # 工具调用失败时是否回退到关键词匹配
     
     # 性能参数
-    "TIMEOUT": 3.0,                        # LLM 推理超时时间 (秒)
-    "MAX_RETRIES": 2,                      # 调用失败时的最大重试次数
+    TIMEOUT: float = 3.0                       # LLM 推理超时时间 (秒)
+    MAX_RETRIES: int = 2                       # 调用失败时的最大重试次数
     
     # 模型配置
-    "MODEL": "qwen-max",                   # 使用的模型名称 (qwen-max / qwen-plus)
-    "TEMPERATURE": 0.3,                    # 温度参数 (降低随机性，提高一致性)
-    "MAX_TOKENS": 500,                     # 最大生成token数
-}
+    MODEL: str = "qwen-max"                    # 使用的模型名称 (qwen-max / qwen-plus)
+    TEMPERATURE: float = 0.3                   # 温度参数 (降低随机性，提高一致性)
+    MAX_TOKENS: int = 500                      # 最大生成token数
+
+
+FUNCTION_CALLING = FunctionCallingConfig()  # Function Calling 设置实例
+FUNCTION_CALLING_CONFIG = MappingProxyType(FUNCTION_CALLING._asdict())  # 只读字典视图（兼容按键访问）
 
 
 # ===================== 日志配置 =====================
 
-LOGGING_CONFIG = {
-    "LOG_TOOL_CALLS": True,                # 是否记录工具调用日志
-    "LOG_PARAMETER_VALIDATION": True,      # 是否记录参数验证日志
-    "LOG_EXECUTION_RESULTS": True,         # 是否记录执行结果日志
-}
+class LoggingConfig(NamedTuple):
+    """日志设置（不可变）"""
+    LOG_TOOL_CALLS: bool = True                # 是否记录工具调用日志
+    LOG_PARAMETER_VALIDATION: bool = True      # 是否记录参数验证日志
+    LOG_EXECUTION_RESULTS: bool = True         # 是否记录执行结果日志
+    LOG_FILE: Optional[str] = None             # 日志文件路径（None 表示只输出到终端）
+
+
+LOGGING = LoggingConfig()  # 日志设置实例
+LOGGING_CONFIG = MappingProxyType(LOGGING._asdict())  # 只读字典视图（兼容按键访问）
 
 
 # ==================== AEC 配置 ====================
@@ -60,5 +77,23 @@ AEC_CONFIG = {
     "FRAME_SIZE": 320,  # 帧大小（20ms @ 16kHz）
     "FILTER_LENGTH": 2048,  # 自适应滤波器长度（影响效果和性能）
     "SAMPLE_RATE": 16000,  # 采样率（16kHz，与麦克风一致）
+    "USE_WORKER_PROCESS": True,  # 是否在独立子进程中运行 AEC（避免与控制循环争抢 GIL，启动失败自动回退到进程内）
     # 注意：speexdsp 在 Linux 上可用，Windows 安装较困难
 }
+
+
+# ==================== 线程调度配置 ====================
+
+THREAD_CONFIG = {
+    "CONTROL_LOOP_CPU": None,  # 100Hz 控制循环线程绑定的 CPU 核心编号（None 表示不绑定，仅 Linux 生效）
+    "TASK_EXECUTOR_CPU": None,  # 任务执行器线程绑定的 CPU 核心编号（None 表示不绑定）
+    "CONTROL_LOOP_RT_PRIORITY": 0,  # 控制循环 SCHED_FIFO 实时优先级（0 表示不启用，需 root 或 CAP_SYS_NICE）
+    # 注意：绑定的核心最好通过 isolcpus 预留，避免与大模型/音频线程共享
+}
+
+
+# ==================== 播放器配置 ====================
+
+PLAYER_CONFIG = {
+    "USE_CALLBACK": False,  # 是否使用 PortAudio 回调模式播放（无播放线程；解码线程已重采样到设备采样率，任意设备采样率均可用）
+}
@@ -9,9 +9,9 @@
 
 import threading
 import logging
+import os
 import sys
 import platform
-import time  # 移至顶部：避免在循环内部重复导入
 
 # 根据操作系统导入不同的键盘监听库
 IS_WINDOWS = platform.system() == "Windows"
@@ -26,14 +26,22 @@ else:
 # 配置日志记录器
 logger = logging.getLogger(__name__)
 
+# 关闭管道 (读端, 写端)：Linux 监听线程阻塞在 select 上，写入一个字节即可唤醒并退出
+_shutdown_pipe = None
+_listener_thread = None  # 当前监听线程（stop_keyboard_listener 等待其恢复终端设置后再返回）
+
 def start_keyboard_listener(action_manager, g1_client):
     """
     启动终端键盘监听线程
     
     注意：在 SSH 模式下，必须保持终端窗口处于激活状态按键才有效。
     """
+    global _shutdown_pipe, _listener_thread
     logger.info("[EmergencyStop] 正在启动终端键盘监听线程...")
     
+    if not IS_WINDOWS and _shutdown_pipe is None:
+        _shutdown_pipe = os.pipe()  # 创建关闭管道
+    
     # 创建并启动守护线程
     t = threading.Thread(
         target=_monitor_terminal_input,
@@ -41,10 +49,33 @@ def start_keyboard_listener(action_manager, g1_client):
         daemon=True  # 守护线程，主程序退出时自动关闭
     )
     t.start()
+    _listener_thread = t  # 保存线程引用，退出时等待
     
     logger.info("[EmergencyStop] 键盘监听已启动 (请保持终端窗口激活，按 Space 键急停)")
     return t
 
+def stop_keyboard_listener(timeout: float = 1.0):
+    """
+    通知 Linux 监听线程退出，并等待它恢复终端设置
+    
+    监听线程是守护线程：调用方随后 sys.exit 时解释器不会等待它，
+    因此必须在这里 join，保证 finally 中的 tcsetattr 在进程退出前执行完毕。
+    Windows 下 getwch() 无法被中断，守护线程随主程序退出（不等待）。
+    
+    Args:
+        timeout: 等待监听线程退出的最长时间（秒）
+    """
+    pipe = _shutdown_pipe  # 读取一次，避免检查后被监听线程置空
+    if pipe is None:
+        return
+    try:
+        os.write(pipe[1], b"x")  # 唤醒 select
+    except OSError:
+        return  # 管道已关闭（监听线程已退出）
+    t = _listener_thread
+    if t is not None and t is not threading.current_thread():
+        t.join(timeout=timeout)  # 等待线程恢复终端设置后退出
+
 def _monitor_terminal_input(action_manager, g1_client):
     """
     监听标准输入流 (stdin) 的空格键
@@ -59,26 +90,19 @@ def _monitor_windows(action_manager, g1_client):
     """Windows 平台监听逻辑"""
     try:
         while True:
-            # kbhit() 检测是否有按键按下
-            if msvcrt.kbhit():
-                # getch() 读取一个字符（字节）
-                key = msvcrt.getch()
-                try:
-                    char_key = key.decode('utf-8')
-                except:
-                    continue
-                
-                if char_key == ' ':
-                    _trigger_emergency_stop(action_manager, g1_client)
-            else:
-                time.sleep(0.1)  # time 已在文件顶部导入
+            # getwch() 阻塞直到有按键，直接返回 Unicode 字符，无需 kbhit() 轮询
+            if msvcrt.getwch() == ' ':
+                _trigger_emergency_stop(action_manager, g1_client)
     except Exception as e:
-        logger.error(f"[EmergencyStop] Windows 监听异常: {e}")
+        logger.error("[EmergencyStop] Windows 监听异常: %s", e)
 
 def _monitor_linux(action_manager, g1_client):
     """Linux 平台监听逻辑"""
+    global _shutdown_pipe
     # 获取标准输入的文件描述符
     fd = sys.stdin.fileno()
+    shutdown_r = _shutdown_pipe[0] if _shutdown_pipe is not None else None  # 关闭管道读端
+    rlist = [fd] if shutdown_r is None else [fd, shutdown_r]  # select 监听列表
     
     # 保存旧的终端设置，以便退出时恢复
     old_settings = termios.tcgetattr(fd)
@@ -88,19 +112,39 @@ def _monitor_linux(action_manager, g1_client):
         tty.setcbreak(fd)
         
         while True:
-            # 使用 select 检测是否有输入，避免阻塞 CPU
-            if select.select([sys.stdin], [], [], 0.1)[0]:
-                key = sys.stdin.read(1) # 读取一个字符
+            # 无超时阻塞在内核中，直到有按键或收到关闭通知（空闲时零唤醒）
+            ready, _, _ = select.select(rlist, [], [])
+            
+            # 先处理按键：同时就绪时急停优先于退出
+            if fd in ready:
+                # 直接读 fd（绕过 sys.stdin 的文本解码与缓冲），一次读完已到达的全部字符
+                try:
+                    data = os.read(fd, 64)
+                except OSError as e:  # 终端已挂断（如 SSH 断开时返回 EIO）
+                    logger.info("[EmergencyStop] 终端输入已关闭，停止监听: %s", e)
+                    break
+                if not data:  # stdin 已关闭
+                    break
                 
                 # 检测空格键 (Space)
-                if key == ' ':
+                if b' ' in data:
                     _trigger_emergency_stop(action_manager, g1_client)
+            
+            if shutdown_r is not None and shutdown_r in ready:
+                break  # 收到关闭通知
                     
     except Exception as e:
-        logger.error(f"[EmergencyStop] Linux 监听异常: {e}")
+        logger.error("[EmergencyStop] Linux 监听异常: %s", e)
     finally:
         # 非常重要：程序结束前必须恢复终端设置，否则终端会乱码
-        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+        try:
+            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+        except (termios.error, OSError):
+            pass  # 终端已关闭，无需恢复
+        if shutdown_r is not None and _shutdown_pipe is not None:
+            pipe, _shutdown_pipe = _shutdown_pipe, None  # 先置空再关闭，迟到的 stop_keyboard_listener 不会写入被复用的 fd 编号
+            for pipe_fd in pipe:
+                os.close(pipe_fd)  # 关闭管道
 
 def _trigger_emergency_stop(action_manager, g1_client):
     """执行急停逻辑"""
@@ -122,4 +166,4 @@ def _trigger_emergency_stop(action_manager, g1_client):
         logger.warning("[EmergencyStop] 紧急停止完成，机器人已进入安全状态")
         
     except Exception as e:
-        logger.error(f"[EmergencyStop] 执行急停失败: {e}")
\ No newline at end of file
+        logger.error("[EmergencyStop] 执行急停失败: %s", e)
\ No newline at end of file
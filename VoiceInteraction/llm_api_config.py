@@ -1,25 +1,27 @@
 # API配置文件
 # 大语言模型API配置
 # ⚠️ 安全警告：请勿将真实 API Key 提交到代码仓库！
-# 请优先使用环境变量设置 API Key，例如：export DASHSCOPE_API_KEY="sk-..."
+# API Key 只从环境变量读取（导入时读取一次），例如：export DASHSCOPE_API_KEY="sk-..."
+
+import os
 
 # 阿里云通义千问API配置
 QWEN_API_CONFIG = {
-    'api_key': 'sk-2a523e5c07dd4a0b9993ba36242a1f38',  # 请替换为您的API密钥，或使用环境变量
-    'base_url': 'https://dashscope.aliyuncs.com/compatible-mode/v1',
-    'model_name': 'qwen-turbo-latest'  # 可选: qwen-max, qwen-plus, qwen-turbo
+    'api_key': os.environ.get('DASHSCOPE_API_KEY', ''),  # 环境变量 DASHSCOPE_API_KEY
+    'base_url': os.environ.get('DASHSCOPE_BASE_URL', 'https://dashscope.aliyuncs.com/compatible-mode/v1'),
+    'model_name': os.environ.get('QWEN_MODEL', 'qwen-turbo-latest')  # 可选: qwen-max, qwen-plus, qwen-turbo
 }
 
 # OpenAI API配置 (备用)
 OPENAI_API_CONFIG = {
-    'api_key': 'YOUR_OPENAI_API_KEY',
+    'api_key': os.environ.get('OPENAI_API_KEY', ''),  # 环境变量 OPENAI_API_KEY
     'base_url': 'https://api.openai.com/v1',
     'model_name': 'gpt-3.5-turbo'
 }
 
 # 硅基流动api配置
 SILICON_FLOW_API_CONFIG = {
-    'api_key': 'sk-qdzcjjfrcvnqglbpuptgtqedqtwtvtrmgwbcfxevwndukbtd',
+    'api_key': os.environ.get('SILICONFLOW_API_KEY', ''),  # 环境变量 SILICONFLOW_API_KEY
     'base_url': 'https://api.siliconflow.cn/v1',
     'model_voice': 'FunAudioLLM/CosyVoice2-0.5B', 
     'voice_name': 'FunAudioLLM/CosyVoice2-0.5B:david'
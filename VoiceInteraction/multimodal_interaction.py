@@ -21,30 +21,62 @@ pip install -U dashscope pyaudio opencv-python numpy openai
 import os  # 导入操作系统模块
 import sys  # 导入系统模块
 import time  # 导入时间模块
-import base64  # 导入 Base64 编解码模块
+import binascii  # 导入 Base64 编码（标准库 C 实现）
 import signal  # 导入信号处理模块
+import socket  # 导入套接字模块（TCP 选项）
 import threading  # 导入线程模块
 import contextlib  # 导入上下文管理模块
 import logging  # 导入日志模块
+import logging.handlers  # 导入 QueueHandler / QueueListener
+import queue  # 导入队列模块
+import atexit  # 导入退出钩子模块
+from typing import Optional  # 导入类型提示
+import numpy as np  # 导入数值计算模块
 
 try:
     import cv2  # 尝试导入 OpenCV
 except ImportError:
     cv2 = None  # OpenCV 不可用
 
-# 配置日志
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR  # libjpeg-turbo 绑定（可选，pip install PyTurboJPEG）
+    _turbo_jpeg = TurboJPEG()  # 加载 libjpeg-turbo（SIMD 编码，ARM 上使用 NEON）
+except Exception:  # 未安装 PyTurboJPEG 或找不到 libjpeg-turbo 动态库
+    _turbo_jpeg = None  # 回退到 cv2.imencode
+
+try:
+    import pybase64  # SIMD 加速的 Base64 编码（可选，pip install pybase64）
+    _b64encode_str = pybase64.b64encode_as_string  # 直接返回 str，省去 bytes → str 的 decode
+except ImportError:
+    def _b64encode_str(data: bytes) -> str:
+        """Base64 编码为 ASCII 字符串（标准库回退，直接调用 b64encode 底层的 binascii，少一层 Python 包装）"""
+        return binascii.b2a_base64(data, newline=False).decode("ascii")
+
+from config import LOGGING_CONFIG  # 导入日志配置
+
+# 配置日志：业务线程（控制分派、急停等）只合并消息参数并入队（QueueHandler.prepare 在调用线程执行），
+# 加时间戳等最终格式化与写 stdout/文件由后台 QueueListener 线程完成
+_log_queue = queue.Queue(-1)  # 无界日志队列
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')  # 设置日志格式
+_log_handlers = [logging.StreamHandler(sys.stdout)]  # 输出到标准输出
+if LOGGING_CONFIG.get("LOG_FILE"):  # 可选：同时写入日志文件
+    _log_handlers.append(logging.FileHandler(LOGGING_CONFIG["LOG_FILE"], encoding="utf-8"))
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)  # 最终格式化在后台线程执行
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)  # 后台写日志线程
+_log_listener.start()  # 启动监听线程
+atexit.register(_log_listener.stop)  # 退出时刷新队列中剩余日志
 logging.basicConfig(
     level=logging.INFO,  # 设置日志级别
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',  # 设置日志格式
-    handlers=[logging.StreamHandler(sys.stdout)]  # 输出到标准输出
+    handlers=[logging.handlers.QueueHandler(_log_queue)]  # 根记录器只入队
 )
 logger = logging.getLogger(__name__)  # 获取当前模块的日志记录器
 
 # 导入子模块
-from api_init import init_dashscope_endpoints  # 导入 API 初始化函数
+from api_init import init_dashscope_endpoints, prewarm_openai_client  # 导入 API 初始化函数
 from omni_callback import OmniCallback, MIC_CHUNK_FRAMES  # 导入 Omni 回调处理器
 from action_manager import ActionManager  # 导入 ActionManager 守护线程模块
-from emergency_stop import start_keyboard_listener  # 导入键盘急停监听模块
+from emergency_stop import start_keyboard_listener, stop_keyboard_listener  # 导入键盘急停监听模块
 
 # 导入 DashScope Omni SDK
 from dashscope.audio.qwen_omni import (
@@ -116,7 +148,63 @@ g1_arm = None  # 全局 G1 手臂动作客户端实例（G1ArmActionClient）
 action_manager = None  # 全局 ActionManager 实例（守护线程）
 
 
+# ===================== WebSocket 传输 =====================
+def _set_ws_nodelay(conversation: OmniRealtimeConversation) -> bool:
+    """
+    确保 Omni WebSocket 底层 TCP 连接关闭 Nagle 算法
+
+    麦克风块与打断相关的小帧不在内核里等待合并（最多约 40ms）。websocket-client 默认已设置
+    TCP_NODELAY，这里在连接建立后显式设置一次，不依赖所用客户端库的默认选项。
+
+    Args:
+        conversation: 已连接的 Omni 对话实例
+
+    Returns:
+        是否成功设置（找不到底层套接字时返回 False）
+    """
+    app = getattr(conversation, "ws", None)  # websocket.WebSocketApp
+    sock = getattr(getattr(app, "sock", None), "sock", None)  # WebSocketApp.sock（WebSocket）.sock（socket）
+    if not isinstance(sock, socket.socket):  # 底层套接字不可用
+        logger.debug("[Omni] 未找到 WebSocket 底层套接字，跳过 TCP_NODELAY")
+        return False
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # 关闭 Nagle
+    except OSError as e:  # 套接字已关闭等
+        logger.debug("[Omni] 设置 TCP_NODELAY 失败: %s", e)
+        return False
+    return True
+
+
 # ===================== 摄像头视频循环 =====================
+def _encode_frame(frame, scaled) -> Optional[str]:
+    """
+    将一帧 BGR 图像缩放到 640x360 并编码为 Base64 JPEG
+
+    Args:
+        frame: 摄像头原始帧（BGR）
+        scaled: 预分配的 640x360 缩放输出缓冲区（每帧复用）
+
+    Returns:
+        Base64 编码的 JPEG 字符串；编码失败或超过 500KB 时返回 None
+    """
+    if frame.shape != scaled.shape:  # 分辨率不是 640x360 时才缩放
+        frame = cv2.resize(frame, (640, 360), dst=scaled, interpolation=cv2.INTER_AREA)  # 区域插值缩小，写入复用缓冲区
+    if _turbo_jpeg is not None:  # libjpeg-turbo 可用
+        try:
+            jpg_bytes = _turbo_jpeg.encode(frame, quality=80, pixel_format=TJPF_BGR)  # 编码为 JPEG
+        except Exception as e:  # 编码失败
+            logger.debug("[Camera] TurboJPEG 编码失败: %s", e)
+            return None
+    else:
+        ok, buf = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), 80])  # 编码为 JPEG
+        if not ok:  # 如果编码失败
+            return None
+        jpg_bytes = buf.tobytes()  # 转换为字节
+    if len(jpg_bytes) > 500 * 1024:  # 如果超过 500KB
+        return None  # 跳过
+    return _b64encode_str(jpg_bytes)  # Base64 编码
+
+
 def start_camera_loop(
     conversation: OmniRealtimeConversation, 
     stop_event: threading.Event, 
@@ -155,36 +243,31 @@ def start_camera_loop(
     send_fps = float(os.getenv("SEND_FPS", "1"))  # 视频发送帧率(默认 1fps)
     interval = 1.0 / max(send_fps, 0.1)  # 计算发送间隔时间
     last = 0.0  # 上次发送时间
+    scaled = np.empty((360, 640, 3), dtype=np.uint8)  # 预分配的缩放输出缓冲区（每帧复用）
+    pending = None  # 已编码、尚未发出的最新一帧（新帧直接覆盖，最多保留一帧）
     
+    # 持续 grab 取走驱动队列中的帧（只抓取不解码，按摄像头帧率阻塞），发送时 retrieve 解码最近一帧；
+    # 若在发送间隔内休眠后再 read，拿到的是驱动缓冲里排队的旧帧，画面最多滞后一个发送间隔
     while not stop_event.is_set():  # 主循环
-        now = time.time()  # 当前时间
-        if now - last < interval:  # 如果未到发送间隔
+        if not cap.grab():  # 抓取失败（设备暂不可用）
             time.sleep(0.01)  # 休眠
             continue
-        last = now  # 更新上次发送时间
-
-        ok, frame = cap.read()  # 读取帧
-        if not ok:  # 如果读取失败
-            continue
-
-        frame = cv2.resize(frame, (640, 360))  # 调整分辨率
-        ok, buf = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), 80])  # 编码为 JPEG
-        if not ok:  # 如果编码失败
-            continue
-
-        jpg_bytes = buf.tobytes()  # 转换为字节
-        if len(jpg_bytes) > 500 * 1024:  # 如果超过 500KB
-            continue  # 跳过
-
-        b64_jpg = base64.b64encode(jpg_bytes).decode("ascii")  # Base64 编码
-        with contextlib.suppress(Exception):  # 忽略异常
-            # 优化：非阻塞获取锁，如果音频正在发送（锁被占用），则丢弃当前帧
-            if send_lock.acquire(blocking=False):  # 尝试获取锁
-                try:
-                    conversation.append_video(b64_jpg)  # 发送视频帧
-                finally:
-                    send_lock.release()  # 释放锁
-            # 锁被占用则丢帧
+        now = time.time()  # 当前时间
+        if now - last >= interval:  # 到达发送间隔
+            last = now  # 更新上次发送时间
+            ok, frame = cap.retrieve()  # 解码最近抓取的帧
+            if ok:  # 解码成功
+                pending = _encode_frame(frame, scaled) or pending  # 新帧覆盖尚未发出的旧帧（编码失败时保留旧帧）
+
+        # 音频优先：非阻塞获取锁，音频正在发送（锁被占用）时保留待发帧，下一次 grab 后（约一帧时间）重试，
+        # 而不是丢掉本帧、等满一个发送间隔
+        if pending is not None and send_lock.acquire(blocking=False):  # 有待发帧且锁空闲
+            try:
+                with contextlib.suppress(Exception):  # 忽略异常
+                    conversation.append_video(pending)  # 发送视频帧
+            finally:
+                send_lock.release()  # 释放锁
+            pending = None  # 已发出（发送失败同样丢弃，不重试旧帧）
 
     # 只有在内部创建的摄像头才释放
     if not external_cap:  # 如果是内部摄像头
@@ -199,6 +282,7 @@ def main():
     
     # 初始化 DashScope 端点
     default_omni_ws = init_dashscope_endpoints()  # 获取默认 WebSocket 端点
+    prewarm_openai_client()  # 后台预热工具调用客户端连接
 
     # 获取配置
     model = os.getenv("OMNI_MODEL", "qwen3-omni-flash-realtime")  # 模型名称
@@ -239,13 +323,26 @@ def main():
     aec_processor = None
     try:
         from aec_processor import AECProcessor, SPEEXDSP_AVAILABLE
-        if SPEEXDSP_AVAILABLE:
-            aec_processor = AECProcessor(
-                frame_size=320,  # 20ms @ 16kHz
-                filter_length=2048,
-                sample_rate=16000,
-                enabled=True
-            )
+        from config import AEC_CONFIG
+        if AEC_CONFIG["ENABLED"] and SPEEXDSP_AVAILABLE:
+            if AEC_CONFIG.get("USE_WORKER_PROCESS"):
+                # 优先在独立子进程中运行（独立 GIL）
+                from aec_worker import AECWorker
+                aec_processor = AECWorker(
+                    frame_size=AEC_CONFIG["FRAME_SIZE"],  # 20ms @ 16kHz
+                    filter_length=AEC_CONFIG["FILTER_LENGTH"],
+                    sample_rate=AEC_CONFIG["SAMPLE_RATE"]
+                )
+                if not aec_processor.enabled:
+                    logger.warning("[AEC] 独立进程不可用，回退到进程内处理")
+                    aec_processor = None
+            if aec_processor is None:
+                aec_processor = AECProcessor(
+                    frame_size=AEC_CONFIG["FRAME_SIZE"],  # 20ms @ 16kHz
+                    filter_length=AEC_CONFIG["FILTER_LENGTH"],
+                    sample_rate=AEC_CONFIG["SAMPLE_RATE"],
+                    enabled=True
+                )
             logger.info("[AEC] 回声消除处理器已启动")
         else:
             logger.warning("[AEC] speexdsp 库不可用，AEC 功能禁用")
@@ -255,7 +352,13 @@ def main():
     
     # 初始化并启动 ActionManager 守护线程（全局，只启动一次）
     if UNITREE_AVAILABLE and g1:  # 检查 SDK 和 g1 客户端是否就绪
-        action_manager = ActionManager(g1)  # 创建 ActionManager 实例
+        from config import THREAD_CONFIG
+        action_manager = ActionManager(
+            g1,
+            control_cpu=THREAD_CONFIG.get("CONTROL_LOOP_CPU"),  # 控制循环绑核（可选）
+            executor_cpu=THREAD_CONFIG.get("TASK_EXECUTOR_CPU"),  # 任务执行器绑核（可选）
+            control_rt_priority=THREAD_CONFIG.get("CONTROL_LOOP_RT_PRIORITY", 0)  # 实时优先级（可选）
+        )  # 创建 ActionManager 实例
         action_manager.start()  # 启动 100Hz 控制循环守护线程
         logger.info("[ActionManager] 已启动（100Hz 心跳维持）")  # 记录日志
         
@@ -343,7 +446,11 @@ def main():
     
     # 创建全局播放器
     logger.info("[Audio] 初始化播放器...")
-    global_player = B64PCMPlayer(global_pya, sample_rate=24000, chunk_size_ms=100)
+    from config import PLAYER_CONFIG
+    global_player = B64PCMPlayer(
+        global_pya, sample_rate=24000, chunk_size_ms=40,
+        use_callback=PLAYER_CONFIG.get("USE_CALLBACK", False)  # 回调模式（可选）
+    )
     logger.info("[Audio] 播放器已创建")
     
     # ===================== 摄像头初始化（重连循环外，只初始化一次）=====================
@@ -376,6 +483,7 @@ def main():
                 action_manager.stop()
                 print("[ActionManager] 已停止")
         
+        stop_keyboard_listener()  # 唤醒急停监听线程退出并恢复终端设置
         sys.exit(0)
     
     signal.signal(signal.SIGINT, _sigint)  # 注册信号处理
@@ -418,6 +526,7 @@ def main():
                 logger.info("[Omni] connecting ...")
             
             conversation.connect()  # 建立连接
+            _set_ws_nodelay(conversation)  # 小帧立即发送，不等待 Nagle 合并
             
             # 更新会话配置
             conversation.update_session(
@@ -499,33 +608,20 @@ def main():
                 # AEC 处理
                 if aec_processor and hasattr(aec_processor, 'enabled') and aec_processor.enabled:
                     frame_size_bytes = 320 * 2  # 640 bytes per frame
-                    cleaned_chunks = []
-                    
-                    for i in range(0, len(audio_data), frame_size_bytes):
-                        mic_frame = audio_data[i:i + frame_size_bytes]
-                        
-                        # 不足一帧，补零
-                        if len(mic_frame) < frame_size_bytes:
-                            mic_frame += b'\x00' * (frame_size_bytes - len(mic_frame))
-                        
-                        # 获取参考帧
-                        ref_frame = b""
-                        if callback.player:
-                            ref_frame = callback.player.get_reference_frame(timeout=0.001)
-                        
-                        # 参考帧长度不足，补零
-                        if len(ref_frame) < frame_size_bytes:
-                            ref_frame += b'\x00' * (frame_size_bytes - len(ref_frame))
-                        
-                        # 执行 AEC
-                        cleaned_frame = aec_processor.process(mic_frame, ref_frame)
-                        cleaned_chunks.append(cleaned_frame)
-                    
-                    audio_data = b"".join(cleaned_chunks)
+                    num_frames = -(-len(audio_data) // frame_size_bytes)  # 本块帧数（向上取整）
+
+                    # 一次性读取整块参考信号（无锁环形缓冲区，不足部分补零，不阻塞）
+                    if callback.player:
+                        reference_data = callback.player.get_reference_samples(num_frames * 320)
+                    else:
+                        reference_data = b""  # 无播放器，参考信号全零（由 process_batch 补齐）
+
+                    # 执行 AEC（整块一次调用）
+                    audio_data = aec_processor.process_batch(audio_data, reference_data)
 
                 # 发送音频
                 try:
-                    audio_b64 = base64.b64encode(audio_data).decode("ascii")
+                    audio_b64 = _b64encode_str(audio_data)  # Base64 编码（每 200ms 一块）
                     with send_lock:
                         conversation.append_audio(audio_b64)
                 except Exception as e:
@@ -571,6 +667,12 @@ def main():
         logger.info(f"[Reconnect] 将在 {RECONNECT_DELAY} 秒后尝试重连...")
         time.sleep(RECONNECT_DELAY)  # 等待后重连
     
+    # 停止 AEC 子进程（进程内处理器无需清理）
+    with contextlib.suppress(Exception):
+        if aec_processor is not None and hasattr(aec_processor, "close"):
+            aec_processor.close()
+    
+    stop_keyboard_listener()  # 停止键盘急停监听
     logger.info("[System] 程序已退出")
 
 
@@ -15,19 +15,27 @@ import threading  # 导入线程模块
 import time  # 导入时间模块
 import json  # 导入 JSON 模块
 import contextlib  # 导入上下文管理模块
+from concurrent.futures import ThreadPoolExecutor  # 导入线程池
 import logging  # 导入日志模块
 import pyaudio  # 导入音频处理模块
 
+try:
+    import orjson  # C 实现的 JSON 解析（可选，pip install orjson）
+    _loads = orjson.loads  # 每个 WebSocket 帧都要解析一次，直接接受 str/bytes
+except ImportError:
+    _loads = json.loads  # 回退到标准库
+
 from dashscope.audio.qwen_omni import OmniRealtimeCallback  # 导入 Omni 回调基类
 
 from audio_player import B64PCMPlayer  # 导入音频播放器
 from command_detector import (
+    normalize,
     is_interrupt_command,
     detect_self_introduction,
     is_complex_command,
     try_execute_g1_by_local_keywords
 )  # 导入命令检测函数
-from api_init import call_qwen_for_tool_use  # 导入工具调用函数
+from api_init import iter_qwen_tool_calls  # 导入流式工具调用函数
 from bridge import execute_tool_call  # 导入 Bridge 层工具执行函数
 from tool_schema import ROBOT_TOOLS  # 导入机器人控制工具定义
 from config import FUNCTION_CALLING_CONFIG  # 导入 Function Calling 配置
@@ -38,6 +46,11 @@ logger = logging.getLogger(__name__)  # 获取当前模块的日志记录器
 # 麦克风采样参数
 MIC_CHUNK_FRAMES = 9600  # 48kHz 下约 200ms（frames_per_buffer）
 
+# 自我介绍检测：按句扫描模型输出文本，而不是逐个转写增量扫描
+SENTENCE_ENDS = "。！？!?"  # 句末标点
+INTRO_SCAN_CHARS = 40  # 无句末标点时累积到该长度也扫描一次
+INTRO_TAIL_CHARS = 8  # 扫描后保留的尾部字符数（不少于最长自我介绍关键词长度 - 1，跨扫描边界的关键词不会漏检）
+
 
 class OmniCallback(OmniRealtimeCallback):
     """
@@ -86,7 +99,7 @@ class OmniCallback(OmniRealtimeCallback):
         self._resp_seq = 0  # 响应序号
 
         # 打断后：丢弃当前 response 后续的音频 delta（直到 done）
-        self._drop_lock = threading.Lock()  # 丢弃状态锁
+        self._drop_lock = threading.Lock()  # 丢弃状态锁（只保护写入；增量热路径直接读取布尔属性，GIL 下读取是原子的）
         self._drop_output = False  # 是否丢弃输出
         
         # 冷却时间：机器人说完话后的一小段时间内忽略 ASR（防止回声自激）
@@ -99,6 +112,28 @@ class OmniCallback(OmniRealtimeCallback):
         # 保活回调：由 main 函数注入，用于更新活动时间
         self._update_activity_time = None  # 活动时间更新函数（外部注入）
 
+        # 后台任务线程池（替代每个事件新建线程）：LLM 工具推理、本地关键词动作、自动挥手互不排队
+        self._llm_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="g1-llm")  # LLM 工具推理（单次最长约 TIMEOUT 秒）
+        self._action_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="g1-action")  # 本地关键词动作（按到达顺序执行）
+        self._arm_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="g1-arm")  # 自我介绍自动挥手
+        self._finish_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="g1-finish")  # response.done 后等待本地播放结束
+
+        # 事件类型 -> 处理方法（on_event 一次字典查找完成分派）
+        self._event_handlers = {
+            "session.created": self._on_session_created,  # 会话创建
+            "session.updated": self._on_session_updated,  # 会话更新
+            "conversation.item.input_audio_transcription.completed": self._on_input_transcript,  # 输入语音转写完成
+            "response.audio_transcript.delta": self._on_transcript_delta,  # 模型输出文本增量
+            "response.audio.delta": self._on_audio_delta,  # 模型输出音频增量
+            "response.audio_transcript.done": self._on_transcript_done,  # 模型输出文本完成
+            "response.audio.done": self._on_audio_done,  # 音频生成完成
+            "response.done": self._on_response_done,  # 响应完成
+        }
+
+        # 自我介绍检测（仅 WebSocket 事件线程访问）
+        self._intro_buffer = ""  # 尚未扫描的模型输出文本（含上次扫描的尾部）
+        self._intro_waved = False  # 本轮响应是否已触发挥手（每轮最多一次）
+
     def _inc_seq(self) -> int:
         """增加响应序号并返回新序号"""
         with self._seq_lock:  # 获取序号锁
@@ -127,6 +162,8 @@ class OmniCallback(OmniRealtimeCallback):
 
     def _enter_response_mode(self):
         """进入响应模式"""
+        if self._responding:  # 快速路径：本轮已进入响应模式（每个增量都会调用，无需取锁）
+            return
         with self._respond_lock:  # 获取响应状态锁
             if self._responding:  # 如果已在响应模式
                 return  # 直接返回
@@ -159,13 +196,45 @@ class OmniCallback(OmniRealtimeCallback):
         with self._cool_lock:  # 获取冷却状态锁
             self._last_speak_end_time = time.time()  # 记录结束时间
 
+    def _scan_self_introduction(self):
+        """扫描累积的模型输出文本，检测到自我介绍时延迟挥手（每轮响应最多一次）"""
+        text = self._intro_buffer  # 待扫描文本
+        self._intro_buffer = text[-INTRO_TAIL_CHARS:]  # 保留尾部，与下一段拼接后再扫描
+        if not detect_self_introduction(text):  # 检测是否为自我介绍
+            return
+        self._intro_waved = True  # 本轮不再触发
+        self._intro_buffer = ""  # 不再需要累积
+        logger.info(f"[Callback] 检测到自我介绍关键词：{text[:50]}...")  # 记录日志
+
+        # 延迟 0.5 秒后执行挥手（与语音播放同步）
+        def delayed_wave():
+            time.sleep(0.5)  # 延迟 0.5 秒
+            if self.g1_arm_client:  # 检查手臂客户端是否可用
+                try:
+                    self.g1_arm_client.ExecuteAction(25)  # 执行 face wave 动作
+                    logger.info("[Callback] 自我介绍自动挥手执行成功")  # 记录成功日志
+                except Exception as e:  # 捕获执行异常
+                    logger.error(f"[Callback] 自我介绍自动挥手失败: {e}")  # 记录错误日志
+            else:
+                logger.warning("[Callback] g1_arm 客户端未初始化，自动挥手跳过")  # 记录警告
+
+        # 在线程池中执行，不阻塞音频播放
+        self._submit(self._arm_pool, delayed_wave)  # 提交挥手任务
+
+    def _submit(self, pool: ThreadPoolExecutor, fn, *args):
+        """提交后台任务；连接关闭后线程池已停止，迟到的事件直接丢弃"""
+        try:
+            pool.submit(fn, *args)  # 提交任务
+        except RuntimeError:  # 线程池已关闭
+            logger.warning(f"[Callback] 连接已关闭，丢弃后台任务: {getattr(fn, '__name__', fn)}")  # 记录警告
+
     def _ensure_dict(self, message):
         """确保消息为字典格式"""
         if isinstance(message, dict):  # 如果已是字典
             return message  # 直接返回
-        if isinstance(message, str):  # 如果是字符串
+        if isinstance(message, (str, bytes)):  # 如果是字符串或字节
             with contextlib.suppress(Exception):  # 忽略解析异常
-                return json.loads(message)  # 尝试解析 JSON
+                return _loads(message)  # 尝试解析 JSON
         return {}  # 返回空字典
 
     def on_open(self) -> None:
@@ -259,7 +328,7 @@ class OmniCallback(OmniRealtimeCallback):
         # 播放器每次都需要重建（因为它依赖于当前会话的输出流）
         if self.player is None:
             try:
-                self.player = B64PCMPlayer(self.pya, sample_rate=24000, chunk_size_ms=100)
+                self.player = B64PCMPlayer(self.pya, sample_rate=24000, chunk_size_ms=40)
                 logger.info("[Omni] 播放器已创建")
             except Exception as e:
                 logger.error(f"[Omni] 播放器创建失败: {e}")
@@ -270,13 +339,13 @@ class OmniCallback(OmniRealtimeCallback):
                 # 检查播放器流是否有效
                 if self.player.player_stream and not self.player.player_stream.is_active():
                     logger.info("[Omni] 播放器流不活跃，尝试重建...")
-                    self.player = B64PCMPlayer(self.pya, sample_rate=24000, chunk_size_ms=100)
+                    self.player = B64PCMPlayer(self.pya, sample_rate=24000, chunk_size_ms=40)
                     logger.info("[Omni] 播放器已重建")
             except Exception as e:
                 logger.warning(f"[Omni] 播放器检查失败，将重建: {e}")
                 self.player = None
                 try:
-                    self.player = B64PCMPlayer(self.pya, sample_rate=24000, chunk_size_ms=100)
+                    self.player = B64PCMPlayer(self.pya, sample_rate=24000, chunk_size_ms=40)
                 except:
                     self.player = None
 
@@ -309,6 +378,10 @@ class OmniCallback(OmniRealtimeCallback):
                 self.mic_stream = None  # 清空引用
         # 注意：不终止 PyAudio，只关闭流，让设备可以重用
 
+        # 停止接收新的后台任务（不等待：已提交的动作指令照常执行完）
+        for pool in (self._llm_pool, self._action_pool, self._arm_pool, self._finish_pool):
+            pool.shutdown(wait=False)
+
     def _try_cancel_server_response(self):
         """
         尝试取消服务端响应
@@ -360,24 +433,25 @@ class OmniCallback(OmniRealtimeCallback):
         try:
             # 调用 Qwen API
             logger.info(f"[G1-Tool] 开始处理指令: {transcript}")  # 记录日志
-            tool_calls = call_qwen_for_tool_use(transcript, ROBOT_TOOLS)  # 调用 LLM
+            executed = 0  # 已执行的工具调用数量
+            # 流式调用：每个工具调用的参数一旦完整就立即执行，不等待整个响应结束
+            for tool_call in iter_qwen_tool_calls(transcript, ROBOT_TOOLS):  # 调用 LLM
+                executed += 1  # 计数
+                result = execute_tool_call(
+                    tool_name=tool_call["name"],  # 工具名称
+                    params=tool_call["arguments"],  # 工具参数
+                    action_manager=self.action_manager,  # 动作管理器
+                    g1_client=self.g1_client,  # G1 客户端
+                    g1_arm_client=self.g1_arm_client  # G1 手臂客户端
+                )
+                if result["status"] == "success":  # 如果成功
+                    logger.info(f"[G1] 工具调用成功: {result['message']}")  # 记录日志
+                elif result["status"] == "success_with_warning":  # 如果成功但有警告
+                    logger.warning(f"[G1] 工具调用成功（有警告）: {result['message']} | {result.get('warning', '')}")  # 记录警告
+                else:  # 如果失败
+                    logger.error(f"[G1] 工具调用失败: {result['message']}")  # 记录错误
             
-            if tool_calls:  # 如果有工具调用
-                for tool_call in tool_calls:  # 遍历工具调用
-                    result = execute_tool_call(
-                        tool_name=tool_call["name"],  # 工具名称
-                        params=tool_call["arguments"],  # 工具参数
-                        action_manager=self.action_manager,  # 动作管理器
-                        g1_client=self.g1_client,  # G1 客户端
-                        g1_arm_client=self.g1_arm_client  # G1 手臂客户端
-                    )
-                    if result["status"] == "success":  # 如果成功
-                        logger.info(f"[G1] 工具调用成功: {result['message']}")  # 记录日志
-                    elif result["status"] == "success_with_warning":  # 如果成功但有警告
-                        logger.warning(f"[G1] 工具调用成功（有警告）: {result['message']} | {result.get('warning', '')}")  # 记录警告
-                    else:  # 如果失败
-                        logger.error(f"[G1] 工具调用失败: {result['message']}")  # 记录错误
-                
+            if executed:  # 如果有工具调用
                 # 语音确认
                 with contextlib.suppress(Exception):  # 忽略异常
                     self.conversation.create_response(
@@ -394,199 +468,185 @@ class OmniCallback(OmniRealtimeCallback):
 
     def on_event(self, message) -> None:
         """
-        处理 WebSocket 事件
+        处理 WebSocket 事件（按事件类型查表分派，流式输出期间每秒数十个事件只做一次字典查找）
         
         Args:
             message: 事件消息
         """
         resp = self._ensure_dict(message)  # 转换为字典格式
-        etype = resp.get("type", "")  # 获取消息类型
-        
-        # ========= 自我介绍检测与自动挥手 =========
-        if etype == "response.audio_transcript.delta":  # 音频转写文本增量
-            delta_text = resp.get("delta", "")  # 获取文本增量
-            if delta_text and detect_self_introduction(delta_text):  # 检测是否为自我介绍
-                logger.info(f"[Callback] 检测到自我介绍关键词：{delta_text[:50]}...")  # 记录日志
+        handler = self._event_handlers.get(resp.get("type", ""))  # 查找事件处理方法
+        if handler is not None:  # 未注册的事件类型直接忽略
+            handler(resp)  # 分派
+
+    def _on_session_created(self, resp: dict) -> None:
+        """会话创建事件"""
+        sid = (resp.get("session") or {}).get("id", "")  # 获取会话 ID
+        logger.info(f"[Omni] session.created: {sid}")  # 记录日志
+
+    def _on_session_updated(self, resp: dict) -> None:
+        """会话更新事件"""
+        logger.info("[Omni] session.updated")  # 记录日志
+
+    def _on_input_transcript(self, resp: dict) -> None:
+        """输入语音转写完成：打断检测 / 本地动作指令 / 工具调用"""
+        transcript = (resp.get("transcript") or "").strip()  # 获取转写文本
+        if not transcript:  # 如果文本为空
+            return  # 直接返回
+        utterance = normalize(transcript)  # 每条 ASR 结果只归一化/扫描一次，各检测函数共享
+
+        # 若当前模型正在输出/播放：
+        # 1. 监听"打断类命令"（强打断）
+        # 2. 监听"复杂控制指令"（如"前进一米"），视为打断并执行
+        if self.is_responding() or self._get_flag() == 1:
+            # 检测是否为复杂指令
+            is_complex_cmd = is_complex_command(utterance)  # 使用命令检测函数
+
+            if is_interrupt_command(utterance) or is_complex_cmd:  # 如果是打断或复杂指令
+                logger.info(f"[ASR-Interrupt] 触发打断 (Complex={is_complex_cmd}): {transcript}")  # 记录日志
+                self._interrupt_playback(transcript)  # 打断播放
                 
-                # 延迟 0.5 秒后执行挥手（与语音播放同步）
-                def delayed_wave():
-                    time.sleep(0.5)  # 延迟 0.5 秒
-                    if self.g1_arm_client:  # 检查手臂客户端是否可用
-                        try:
-                            self.g1_arm_client.ExecuteAction(25)  # 执行 face wave 动作
-                            logger.info("[Callback] 自我介绍自动挥手执行成功")  # 记录成功日志
-                        except Exception as e:  # 捕获执行异常
-                            logger.error(f"[Callback] 自我介绍自动挥手失败: {e}")  # 记录错误日志
-                    else:
-                        logger.warning("[Callback] g1_arm 客户端未初始化，自动挥手跳过")  # 记录警告
+                # 安全修复：如果包含停止意图，立即停止机器人运动
+                stop_keywords = ["停", "急停", "别动", "站住"]  # 停止关键词
+                is_stop = any(x in transcript for x in stop_keywords)  # 检测停止意图
                 
-                # 在独立线程中执行，不阻塞音频播放
-                wave_thread = threading.Thread(target=delayed_wave, daemon=True)  # 创建守护线程
-                wave_thread.start()  # 启动线程
-
-        if etype == "session.created":  # 会话创建事件
-            sid = (resp.get("session") or {}).get("id", "")  # 获取会话 ID
-            logger.info(f"[Omni] session.created: {sid}")  # 记录日志
+                if is_stop:  # 如果包含停止意图
+                    logger.warning(
+                        f"[Safety] 检测到打断指令包含停止意图: {transcript}，"
+                        "强制停止运动"
+                    )
+                    if self.action_manager:  # 如果 action_manager 存在
+                        if "急停" in transcript:  # 如果是急停
+                            self.action_manager.emergency_stop()  # 执行急停
+                            logger.warning("[Safety] 触发 ActionManager.emergency_stop()")
+                        else:
+                            self.action_manager.set_idle()  # 设置空闲
+                            logger.info("[Safety] 触发 ActionManager.set_idle()")
+                
+                # 修复：如果是复杂指令且不是纯粹的停止，执行工具调用
+                if is_complex_cmd and not is_stop:  # 复杂指令且非停止
+                    logger.info(f"[G1-Interrupt] 这是一个复杂动作指令，启动执行线程: {transcript}")
+                    self._submit(self._llm_pool, self._execute_tool_command, transcript)  # 提交工具调用
+            else:
+                # 非打断命令：只打印（可按需关闭）
+                print(f"[ASR-IGNORED] {transcript}")  # 打印忽略的文本
             return
 
-        if etype == "session.updated":  # 会话更新事件
-            logger.info("[Omni] session.updated")  # 记录日志
-            return
+        # 空闲态：正常打印 + 本地动作指令
+        
+        # 检查冷却时间（防止回声自激）
+        with self._cool_lock:  # 获取冷却状态锁
+            cool_time = 1.5  # 1.5秒冷却期
+            if time.time() - self._last_speak_end_time < cool_time:  # 如果在冷却期内
+                logger.info(f"[ASR-COOLED] 处于回声冷却期，忽略输入: {transcript}")  # 记录日志
+                return  # 返回
 
-        # 输入语音转写完成
-        if etype == "conversation.item.input_audio_transcription.completed":
-            transcript = (resp.get("transcript") or "").strip()  # 获取转写文本
-            if not transcript:  # 如果文本为空
-                return  # 直接返回
+        logger.info(f"[ASR] {transcript}")  # 记录 ASR 结果
+        
+        # 更新活动时间（用户说话表示连接活跃）
+        if callable(self._update_activity_time):  # 检查回调是否已注入
+            self._update_activity_time()  # 更新活动时间
 
-            # 若当前模型正在输出/播放：
-            # 1. 监听"打断类命令"（强打断）
-            # 2. 监听"复杂控制指令"（如"前进一米"），视为打断并执行
-            if self.is_responding() or self._get_flag() == 1:
-                # 检测是否为复杂指令
-                is_complex_cmd = is_complex_command(transcript)  # 使用命令检测函数
-
-                if is_interrupt_command(transcript) or is_complex_cmd:  # 如果是打断或复杂指令
-                    logger.info(f"[ASR-Interrupt] 触发打断 (Complex={is_complex_cmd}): {transcript}")  # 记录日志
-                    self._interrupt_playback(transcript)  # 打断播放
-                    
-                    # 安全修复：如果包含停止意图，立即停止机器人运动
-                    stop_keywords = ["停", "急停", "别动", "站住"]  # 停止关键词
-                    is_stop = any(x in transcript for x in stop_keywords)  # 检测停止意图
-                    
-                    if is_stop:  # 如果包含停止意图
-                        logger.warning(
-                            f"[Safety] 检测到打断指令包含停止意图: {transcript}，"
-                            "强制停止运动"
-                        )
-                        if self.action_manager:  # 如果 action_manager 存在
-                            if "急停" in transcript:  # 如果是急停
-                                self.action_manager.emergency_stop()  # 执行急停
-                                logger.warning("[Safety] 触发 ActionManager.emergency_stop()")
-                            else:
-                                self.action_manager.set_idle()  # 设置空闲
-                                logger.info("[Safety] 触发 ActionManager.set_idle()")
-                    
-                    # 修复：如果是复杂指令且不是纯粹的停止，执行工具调用
-                    if is_complex_cmd and not is_stop:  # 复杂指令且非停止
-                        logger.info(f"[G1-Interrupt] 这是一个复杂动作指令，启动执行线程: {transcript}")
-                        threading.Thread(
-                            target=self._execute_tool_command, 
-                            args=(transcript,), 
-                            daemon=True
-                        ).start()  # 启动执行线程
-                else:
-                    # 非打断命令：只打印（可按需关闭）
-                    print(f"[ASR-IGNORED] {transcript}")  # 打印忽略的文本
-                return
+        # 检测复杂指令（分类结果已缓存，不阻塞事件线程）
+        if is_complex_command(utterance):  # 如果是复杂指令
+            logger.info(f"[G1] 检测到复杂指令，跳过关键词匹配: {transcript}")
+            self._submit(self._llm_pool, self._execute_tool_command, transcript)  # 提交工具调用
+            return
 
-            # 空闲态：正常打印 + 本地动作指令
-            
-            # 检查冷却时间（防止回声自激）
-            with self._cool_lock:  # 获取冷却状态锁
-                cool_time = 1.5  # 1.5秒冷却期
-                if time.time() - self._last_speak_end_time < cool_time:  # 如果在冷却期内
-                    logger.info(f"[ASR-COOLED] 处于回声冷却期，忽略输入: {transcript}")  # 记录日志
-                    return  # 返回
+        def _do_g1():
+            """执行 G1 动作的内部函数"""
+            try:
+                # 简单指令使用本地关键词匹配（快速路径）
+                executed = try_execute_g1_by_local_keywords(
+                    utterance, 
+                    self.action_manager,
+                    self.g1_arm_client
+                )
+                if executed:  # 如果关键词匹配成功
+                    logger.info("[G1] 本地关键词指令已执行")  # 记录日志
+                    with contextlib.suppress(Exception):  # 忽略异常
+                        self.conversation.create_response(
+                            instructions=(
+                                f"用户下达了动作指令：{transcript}。"
+                                "请用一句简短中文确认你已执行，不要解释原理。"
+                            )
+                        )  # 创建确认响应
+                    return
+                
+                # 关键词未匹配，尝试调用 LLM 工具推理（不占用本地动作线程）
+                self._submit(self._llm_pool, self._execute_tool_command, transcript)  # 提交工具调用
+                
+            except Exception as e:  # 捕获异常
+                logger.error(f"[G1] 执行失败：{e}")  # 记录错误
 
-            logger.info(f"[ASR] {transcript}")  # 记录 ASR 结果
-            
-            # 更新活动时间（用户说话表示连接活跃）
-            if callable(self._update_activity_time):  # 检查回调是否已注入
-                self._update_activity_time()  # 更新活动时间
+        if "estop" in utterance.categories:  # 急停不进线程池排队（可能排在阻塞中的挥手之后），直接在事件线程执行
+            _do_g1()
+        else:
+            self._submit(self._action_pool, _do_g1)  # 提交本地动作
 
-            def _do_g1():
-                """执行 G1 动作的内部函数"""
-                try:
-                    t = (transcript or "").strip()  # 获取文本
-                    
-                    # 检测复杂指令
-                    if is_complex_command(t):  # 如果是复杂指令
-                        logger.info(f"[G1] 检测到复杂指令，跳过关键词匹配: {transcript}")
-                        self._execute_tool_command(transcript)  # 执行工具调用
-                        return
-                    
-                    # 简单指令使用本地关键词匹配（快速路径）
-                    executed = try_execute_g1_by_local_keywords(
-                        transcript, 
-                        self.action_manager,
-                        self.g1_arm_client
-                    )
-                    if executed:  # 如果关键词匹配成功
-                        logger.info("[G1] 本地关键词指令已执行")  # 记录日志
-                        with contextlib.suppress(Exception):  # 忽略异常
-                            self.conversation.create_response(
-                                instructions=(
-                                    f"用户下达了动作指令：{transcript}。"
-                                    "请用一句简短中文确认你已执行，不要解释原理。"
-                                )
-                            )  # 创建确认响应
-                        return
-                    
-                    # 关键词未匹配，尝试调用 LLM 工具推理
-                    self._execute_tool_command(transcript)  # 执行工具调用
-                    
-                except Exception as e:  # 捕获异常
-                    logger.error(f"[G1] 执行失败：{e}")  # 记录错误
-
-            threading.Thread(target=_do_g1, daemon=True).start()  # 启动执行线程
+    def _on_transcript_delta(self, resp: dict) -> None:
+        """模型输出文本增量：自我介绍检测 + 进入响应模式"""
+        delta = resp.get("delta", "")  # 获取文本增量
+        if not delta:  # 空增量
             return
 
+        # ========= 自我介绍检测与自动挥手 =========
+        if not self._intro_waved:  # 本轮尚未挥手（已挥手后不再累积/扫描）
+            self._intro_buffer += delta  # 累积增量（关键词可能跨多个增量）
+            if len(self._intro_buffer) >= INTRO_SCAN_CHARS or any(ch in SENTENCE_ENDS for ch in delta):
+                self._scan_self_introduction()  # 句末或累积足够长时扫描一次
+
         # ====== 模型开始输出（文本/音频任一到来）-> flag=1 ======
-        if etype == "response.audio_transcript.delta":  # 音频转写增量
-            delta = resp.get("delta", "")  # 获取增量
-            if delta:  # 如果有增量
-                if not self._should_drop_output():  # 如果不应丢弃
-                    self._enter_response_mode()  # 进入响应模式
-                    print(delta, end="", flush=True)  # 打印增量
-            return
+        if not self._drop_output:  # 如果不应丢弃（热路径直接读取，不取锁）
+            self._enter_response_mode()  # 进入响应模式
+            print(delta, end="", flush=True)  # 打印增量
+
+    def _on_audio_delta(self, resp: dict) -> None:
+        """模型输出音频增量：交给播放器"""
+        b64_pcm = resp.get("delta", "")  # 获取 Base64 PCM 数据
+        if b64_pcm:  # 如果有数据
+            if not self._drop_output:  # 如果不应丢弃（每秒数十次的热路径，直接读取，不取锁）
+                self._enter_response_mode()  # 进入响应模式（已在响应中时直接返回）
+                if self.player:  # 如果播放器存在
+                    self.player.add_data(b64_pcm)  # 添加数据到播放器
 
-        if etype == "response.audio.delta":  # 音频增量
-            b64_pcm = resp.get("delta", "")  # 获取 Base64 PCM 数据
-            if b64_pcm:  # 如果有数据
-                if not self._should_drop_output():  # 如果不应丢弃
-                    self._enter_response_mode()  # 进入响应模式
-                    if self.player:  # 如果播放器存在
-                        self.player.add_data(b64_pcm)  # 添加数据到播放器
-            return
+    def _on_transcript_done(self, resp: dict) -> None:
+        """模型输出文本完成"""
+        if self._intro_buffer and not self._intro_waved:  # 末尾不足一句的文本
+            self._scan_self_introduction()  # 扫描剩余文本
+        print("\n[Omni] transcript done")  # 打印完成信息
 
-        if etype == "response.audio_transcript.done":  # 转写完成
-            print("\n[Omni] transcript done")  # 打印完成信息
-            return
+    def _on_audio_done(self, resp: dict) -> None:
+        """兼容：音频生成结束（文档有 response.audio.done）"""
+        print("\n[Omni] response.audio.done")  # 打印完成信息
 
-        # 兼容：音频生成结束（文档有 response.audio.done）
-        if etype == "response.audio.done":  # 音频生成完成
-            print("\n[Omni] response.audio.done")  # 打印完成信息
+    def _on_response_done(self, resp: dict) -> None:
+        """服务端输出结束：未被打断时，等本地播放 idle 后再 flag=0"""
+        rid = ""  # 初始化响应 ID
+        with contextlib.suppress(Exception):  # 忽略异常
+            rid = self.conversation.get_last_response_id()  # 获取响应 ID
+        print(f"\n[Omni] response.done (id={rid})")  # 打印完成信息
+        self._intro_buffer = ""  # 下一轮响应重新检测自我介绍
+        self._intro_waved = False
+
+        # 若刚发生打断：直接恢复输入，不再等 idle（播放器已被清空）
+        if self._should_drop_output():  # 如果应丢弃输出
+            self._set_drop_output(False)  # 清除丢弃状态
+            self._force_exit_response_mode(reason="server_done_after_interrupt")  # 强制退出
             return
 
-        # ====== 服务端输出结束：未被打断时，等本地播放 idle 后再 flag=0 ======
-        if etype == "response.done":  # 响应完成
-            rid = ""  # 初始化响应 ID
-            with contextlib.suppress(Exception):  # 忽略异常
-                rid = self.conversation.get_last_response_id()  # 获取响应 ID
-            print(f"\n[Omni] response.done (id={rid})")  # 打印完成信息
-
-            # 若刚发生打断：直接恢复输入，不再等 idle（播放器已被清空）
-            if self._should_drop_output():  # 如果应丢弃输出
-                self._set_drop_output(False)  # 清除丢弃状态
-                self._force_exit_response_mode(reason="server_done_after_interrupt")  # 强制退出
-                return
+        seq = self._get_seq()  # 获取当前序号
 
-            seq = self._get_seq()  # 获取当前序号
+        def _finish_after_local_playback(local_seq: int):
+            """等待本地播放完成后退出响应模式"""
+            if self.player:  # 如果播放器存在
+                self.player.wait_until_idle(timeout=10.0)  # 等待空闲
+            self._exit_response_mode_if_seq(local_seq, reason="local_playback_end")  # 退出响应模式
+            # 更新说话结束时间，开启冷却窗口
+            with self._cool_lock:  # 获取冷却状态锁
+                self._last_speak_end_time = time.time()  # 记录结束时间
 
-            def _finish_after_local_playback(local_seq: int):
-                """等待本地播放完成后退出响应模式"""
-                if self.player:  # 如果播放器存在
-                    self.player.wait_until_idle(timeout=10.0)  # 等待空闲
-                self._exit_response_mode_if_seq(local_seq, reason="local_playback_end")  # 退出响应模式
-                # 更新说话结束时间，开启冷却窗口
-                with self._cool_lock:  # 获取冷却状态锁
-                    self._last_speak_end_time = time.time()  # 记录结束时间
-
-            threading.Thread(
-                target=_finish_after_local_playback, args=(seq,), daemon=True
-            ).start()  # 启动等待线程
-            return
+        # 单线程按序等待即可：interrupt 会立即置位 idle，排在后面的过期收尾随之被序号校验丢弃
+        self._submit(self._finish_pool, _finish_after_local_playback, seq)  # 提交等待任务
 
 
 # 导出公共接口
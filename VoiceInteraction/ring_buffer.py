@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+单生产者单消费者（SPSC）无锁环形缓冲区
+
+用于音频线程之间传递 int16 PCM 样本：
+- 预分配固定容量的 numpy int16 数组，运行期间不再为每帧分配对象
+- 容量取 2 的幂，取模用位与（& mask）代替
+- 写位置 _tail 只由生产者修改，读位置 _head 只由消费者修改；
+  两者均为单次属性赋值（GIL 下原子），数据先写入、后发布位置，无需互斥锁
+
+覆盖模式（overwrite=True）：缓冲区满时丢弃最旧的样本而不是新样本，
+适合只关心"最近播放内容"的参考信号；消费者读取时跳过已被覆盖的部分。
+
+注意：仅支持一个生产者线程与一个消费者线程。
+"""
+
+import numpy as np
+
+
+class SPSCRing:
+    """
+    int16 样本环形缓冲区（单生产者单消费者，无锁）
+
+    参数：
+        capacity: 最小容量（样本数），实际容量向上取整为 2 的幂
+        overwrite: 满时是否覆盖最旧样本（默认 False：丢弃写不下的新样本）
+    """
+
+    def __init__(self, capacity: int, overwrite: bool = False):
+        """
+        初始化环形缓冲区
+
+        Args:
+            capacity: 最小容量（样本数）
+            overwrite: 满时是否覆盖最旧样本
+        """
+        size = 1  # 实际容量
+        while size < capacity:  # 向上取整为 2 的幂
+            size <<= 1
+        self._buf = np.zeros(size, dtype=np.int16)  # 预分配样本存储
+        self._mask = size - 1  # 取模掩码
+        self._head = 0  # 读位置（单调递增，仅消费者修改）
+        self._tail = 0  # 写位置（单调递增，仅生产者修改）
+        self._overwrite = overwrite  # 覆盖模式
+
+    @property
+    def capacity(self) -> int:
+        """缓冲区容量（样本数）"""
+        return self._mask + 1
+
+    def available(self) -> int:
+        """可读样本数"""
+        return min(self._tail - self._head, self._mask + 1)  # 覆盖模式下最多为容量
+
+    def free_space(self) -> int:
+        """可写样本数（覆盖模式下不含可被覆盖的旧样本）"""
+        return max(0, self._mask + 1 - (self._tail - self._head))
+
+    def empty(self) -> bool:
+        """缓冲区是否为空"""
+        return self._tail == self._head
+
+    def push(self, data) -> int:
+        """
+        写入样本（生产者调用）
+        普通模式下空间不足时只写入能容纳的部分；覆盖模式下总是写入（最多保留最近 capacity 个样本）
+
+        Args:
+            data: int16 PCM 数据（bytes / memoryview / np.ndarray）
+
+        Returns:
+            实际写入的样本数
+        """
+        samples = data if isinstance(data, np.ndarray) else np.frombuffer(data, dtype=np.int16)  # 零拷贝视图
+        total = len(samples)  # 输入样本数
+        tail = self._tail  # 本地快照
+        if self._overwrite:  # 覆盖模式：只需保留最后 capacity 个样本
+            if total > self._mask + 1:  # 超出容量的部分本身就是"最旧"的
+                tail += total - (self._mask + 1)  # 视为已写入后立即被覆盖
+                samples = samples[-(self._mask + 1):]
+            n = len(samples)
+        else:
+            n = min(len(samples), self._mask + 1 - (tail - self._head))  # 实际可写样本数
+        if n <= 0:  # 缓冲区已满（或无数据）
+            return 0
+
+        start = tail & self._mask  # 起始下标
+        first = min(n, self._mask + 1 - start)  # 到数组末尾前的样本数
+        self._buf[start:start + first] = samples[:first]  # 写入第一段
+        if first < n:  # 发生回绕
+            self._buf[:n - first] = samples[first:n]  # 写入第二段
+
+        self._tail = tail + n  # 数据写完后再发布写位置
+        return total if self._overwrite else n
+
+    def pop_into(self, out: np.ndarray) -> int:
+        """
+        读取样本到调用方提供的数组（消费者调用），不足时只读取可用部分
+
+        Args:
+            out: 目标 int16 数组（读取长度上限为 len(out)）
+
+        Returns:
+            实际读取的样本数
+        """
+        tail = self._tail  # 本地快照
+        head = self._head
+        if self._overwrite and tail - head > self._mask + 1:  # 生产者已覆盖最旧数据
+            head = tail - (self._mask + 1)  # 跳过被覆盖的部分（与生产者并发时边界处样本可能是新旧混合）
+        n = min(len(out), tail - head)  # 实际可读样本数
+        if n <= 0:  # 缓冲区为空
+            return 0
+
+        start = head & self._mask  # 起始下标
+        first = min(n, self._mask + 1 - start)  # 到数组末尾前的样本数
+        out[:first] = self._buf[start:start + first]  # 读取第一段
+        if first < n:  # 发生回绕
+            out[first:n] = self._buf[:n - first]  # 读取第二段
+
+        self._head = head + n  # 数据读完后再释放空间
+        return n
+
+    def pop(self, num_samples: int) -> np.ndarray:
+        """
+        读取最多 num_samples 个样本（消费者调用）
+
+        Args:
+            num_samples: 最大读取样本数
+
+        Returns:
+            读取到的 int16 数组（长度可能小于 num_samples）
+        """
+        out = np.empty(num_samples, dtype=np.int16)  # 输出数组
+        return out[:self.pop_into(out)]
+
+    def clear(self):
+        """丢弃所有未读样本（消费者调用）"""
+        self._head = self._tail  # 读位置追上写位置
+
+
+# 导出公共接口
+__all__ = ['SPSCRing']  # 定义模块导出列表
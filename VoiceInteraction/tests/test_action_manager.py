@@ -62,7 +62,7 @@ class TestActionManager:
         mock_g1_client.Squat2StandUp.assert_called()  # 验证起立指令被调用
 
     @patch('time.sleep')
-    @patch('time.time')
+    @patch('time.monotonic_ns')
     def test_control_loop_integration(self, mock_time, mock_sleep, manager, mock_g1_client):
         """
         测试控制循环逻辑 (集成测试)。
@@ -72,8 +72,8 @@ class TestActionManager:
         manager._running = True  # 设置为运行状态
         manager.update_target_velocity(0.8, 0.0, 0.0)  # 设置目标速度
 
-        # Mock time.time 以返回递增的值
-        self._current_sim_time = 0.0  # 初始化模拟时间
+        # Mock time.monotonic_ns 以返回递增的值（纳秒）
+        self._current_sim_ns = 0  # 初始化模拟时间
         self._time_call_count = 0  # 初始化调用计数
 
         def time_side_effect():
@@ -81,14 +81,14 @@ class TestActionManager:
             if self._time_call_count > 20:  # 安全网：防止死循环
                 manager._running = False  # 停止循环
 
-            self._current_sim_time += 0.005  # 小幅递增模拟时间
-            return self._current_sim_time  # 返回模拟时间
+            self._current_sim_ns += 1_000_000  # 小幅递增模拟时间（1ms）
+            return self._current_sim_ns  # 返回模拟时间
 
         mock_time.side_effect = time_side_effect  # 设置side_effect
 
         # Mock sleep
         def sleep_side_effect(seconds):
-            self._current_sim_time += seconds  # 将模拟时间向前推进
+            self._current_sim_ns += int(seconds * 1e9)  # 将模拟时间向前推进
             if mock_sleep.call_count >= 3:  # 经过3次sleep后
                 manager._running = False  # 停止循环
 
@@ -106,20 +106,20 @@ class TestActionManager:
         # 注意: 实际实现不使用 continous_move 关键字参数
 
     @patch('time.sleep')
-    @patch('time.time')
+    @patch('time.monotonic_ns')
     def test_control_loop_emergency_priority(self, mock_time, mock_sleep, manager, mock_g1_client):
         """验证紧急停止在控制循环中具有最高优先级（不发送移动指令）"""
         manager._running = True  # 设置为运行状态
         manager.emergency_stop()  # 设置为 EMERGENCY 状态
 
-        # 无限时间 mock (带安全网)
+        # 递增时间 mock (带安全网，保证截止前自旋能够结束)
         self._time_call_count_2 = 0  # 初始化调用计数
 
         def time_side_effect_2():
             self._time_call_count_2 += 1  # 增加调用计数
             if self._time_call_count_2 > 20:  # 安全网
                 manager._running = False  # 停止循环
-            return 0.01  # 返回固定时间
+            return self._time_call_count_2 * 1_000_000  # 每次调用推进 1ms
 
         mock_time.side_effect = time_side_effect_2  # 设置side_effect
         # sleep 时直接终止循环
@@ -131,3 +131,104 @@ class TestActionManager:
         mock_g1_client.Move.assert_not_called()  # 验证Move未被调用
         # 实际实现在 EMERGENCY 状态下调用 Damp() 而非 StopMove()
         assert mock_g1_client.Damp.call_count >= 1  # 验证Damp被调用
+
+    def test_start_stop_restores_switch_interval(self, manager):
+        """验证 start() 缩短 GIL 切换间隔, stop() 后恢复原值"""
+        import sys  # 导入系统模块
+        from VoiceInteraction.action_manager import CONTROL_LOOP_SWITCH_INTERVAL  # 导入常量
+
+        original = sys.getswitchinterval()  # 记录原始值
+        manager.start()  # 启动守护线程
+        try:
+            assert sys.getswitchinterval() == pytest.approx(CONTROL_LOOP_SWITCH_INTERVAL)  # 验证已缩短
+        finally:
+            manager.stop()  # 停止守护线程
+        assert sys.getswitchinterval() == pytest.approx(original)  # 验证已恢复
+
+    def test_clear_task_queue_cancels_pending(self, manager):
+        """验证清空任务队列会取消所有待执行任务"""
+        task_a = manager.add_task("move", {"vx": 0.3}, 1.0)  # 添加移动任务
+        task_b = manager.add_task("rotate", {"vyaw": 0.5}, 1.0)  # 添加旋转任务
+        assert manager.get_task_status(task_a)["status"] == "pending"  # 验证队列中任务可查询
+
+        assert manager.clear_task_queue() == 2  # 验证取消数量
+        assert manager.get_task_status(task_a)["status"] == "cancelled"  # 验证已取消
+        assert manager.get_task_status(task_b)["status"] == "cancelled"  # 验证已取消
+        assert manager._task_queue.empty()  # 验证队列已清空
+
+    def test_task_status_times_are_epoch_seconds(self, manager):
+        """验证任务状态中的时间字段仍为 time.time() 语义的 epoch 秒"""
+        before = time.time()  # 添加任务前的墙上时钟
+        task_id = manager.add_task("move", {"vx": 0.3}, 1.0)  # 添加移动任务
+        after = time.time()  # 添加任务后的墙上时钟
+        status = manager.get_task_status(task_id)  # 查询任务状态
+        assert before - 0.5 <= status["created_time"] <= after + 0.5  # 与墙上时钟一致
+        assert status["start_time"] is None  # 尚未开始执行
+
+    def test_finish_timed_move_keeps_newer_command(self, manager):
+        """验证定时移动到期时不会覆盖其后发布的新指令"""
+        manager.update_target_velocity(0.3, 0.0, 0.0, duration=1.0)  # 定时移动
+        stale = manager._state  # 控制循环读取的快照
+        manager.update_target_velocity(0.5, 0.0, 0.0)  # 期间到达的新指令
+        assert manager._finish_timed_move(stale) is False  # 快照已过期, 不切换
+        assert manager._target_vx == 0.5  # 验证新指令保留
+
+        assert manager._finish_timed_move(manager._state) is True  # 快照仍有效, 切换
+        assert manager._current_action == ActionType.IDLE  # 验证已空闲
+
+    def test_completed_history_evicts_oldest(self, manager):
+        """验证历史记录超出上限时按 FIFO 淘汰最早记录"""
+        manager._max_history_size = 3  # 缩小上限便于测试
+        ids = [manager.add_task("move", {"vx": 0.1}, 1.0) for _ in range(5)]  # 添加 5 个任务
+        manager.clear_task_queue()  # 全部取消并写入历史记录
+
+        assert list(manager._completed_tasks) == ids[2:]  # 只保留最近 3 条
+        assert manager.get_task_status(ids[0]) is None  # 最早记录已淘汰
+
+    def test_update_target_velocity_coalesces_duplicates(self, manager):
+        """验证持续移动中重复下发几乎相同的指令时不重新发布快照"""
+        manager.update_target_velocity(0.5, 0.0, 0.1)  # 持续移动
+        snapshot = manager._state  # 记录快照
+        manager.update_target_velocity(0.5004, 0.0, 0.1)  # 差值小于阈值
+        assert manager._state is snapshot  # 验证被合并
+
+        manager.update_target_velocity(0.5, 0.0, 0.1, duration=1.0)  # 定时移动不合并
+        assert manager._state is not snapshot  # 验证已发布新快照
+        assert manager._move_duration == 1.0  # 验证持续时间已设置
+
+    def test_set_idle_coalesces_repeated_stops(self, manager):
+        """验证已空闲时重复的停止指令不重新发布快照, 移动后停止仍然生效"""
+        idle = manager._state  # 初始即为空闲快照
+        manager.set_idle()  # 重复停止
+        assert manager._state is idle  # 验证被合并
+
+        manager.update_target_velocity(0.5, 0.0, 0.0)  # 开始移动
+        manager.set_idle()  # 停止
+        assert manager._state is idle  # 回到共享的空闲快照
+        assert manager._target_vx == 0.0  # 速度清零
+
+    def test_thread_scheduling_failure_is_non_fatal(self):
+        """验证绑核/实时调度失败只记录警告, 不影响线程运行"""
+        from VoiceInteraction.action_manager import _apply_thread_scheduling
+        with patch('os.sched_setaffinity', side_effect=OSError("invalid"), create=True) as mock_aff, \
+                patch('os.sched_setscheduler', side_effect=PermissionError("EPERM"), create=True) as mock_sched:
+            _apply_thread_scheduling("Test", cpu=3, rt_priority=50)  # 不应抛出异常
+        mock_aff.assert_called_once_with(0, {3})  # 验证绑定当前线程
+        mock_sched.assert_called_once()  # 验证尝试设置实时调度
+
+        with patch('os.sched_setaffinity', create=True) as mock_aff:
+            _apply_thread_scheduling("Test")  # 默认参数不做任何修改
+        mock_aff.assert_not_called()  # 验证未绑核
+
+    def test_get_task_status_history_is_lock_free(self, manager):
+        """验证查询已结束任务时不需要获取任务队列锁"""
+        task_id = manager.add_task("move", {"vx": 0.1}, 1.0)  # 添加任务
+        manager.clear_task_queue()  # 取消并写入历史记录
+
+        result = {}  # 查询结果
+        with manager._task_lock:  # 模拟执行器长时间持有锁
+            worker = threading.Thread(target=lambda: result.update(manager.get_task_status(task_id)))
+            worker.start()  # 在其他线程查询
+            worker.join(timeout=1.0)  # 等待查询完成
+            assert not worker.is_alive()  # 验证未被锁阻塞
+        assert result["status"] == "cancelled"  # 验证查询结果
@@ -0,0 +1,61 @@
+import multiprocessing  # 导入多进程模块（测试用管道）
+from unittest.mock import MagicMock  # 导入 Mock 工具
+
+import pytest  # 导入pytest测试框架
+from VoiceInteraction.aec_processor import SPEEXDSP_AVAILABLE  # 导入库可用标志
+from VoiceInteraction.aec_worker import AECWorker  # 导入被测模块
+
+
+def _connected_worker(max_timeouts: int = 3):
+    """构造一个已"就绪"的 AECWorker，测试代码通过返回的连接扮演子进程"""
+    worker = AECWorker.__new__(AECWorker)  # 跳过 __init__，不启动真实子进程
+    parent, child = multiprocessing.Pipe()  # 主进程端 / 模拟子进程端
+    worker.__dict__.update(
+        frame_size=320, filter_length=2048, sample_rate=16000,
+        start_timeout=1.0, reply_timeout=0.05, max_timeouts=max_timeouts,
+        enabled=True, _process=None, _conn=parent,
+        _timeouts=0, _stale_replies=0, _restarts=0,
+    )
+    return worker, child
+
+
+class TestAECWorker:
+    """AECWorker 独立进程 AEC 测试类"""
+
+    def test_worker_lifecycle(self):
+        """验证子进程启动、处理（或直通）与关闭"""
+        worker = AECWorker(start_timeout=30.0)  # 启动子进程
+        try:
+            assert worker.enabled is SPEEXDSP_AVAILABLE  # 库不可用时子进程报告初始化失败
+            mic = b'\x01\x00' * (320 * 10)  # 200ms 麦克风数据
+            result = worker.process_batch(mic, b"")  # 处理（参考信号内部补零）
+            assert len(result) == len(mic)  # 验证输出长度一致
+            if not SPEEXDSP_AVAILABLE:
+                assert result == mic  # 未启用时直通
+        finally:
+            worker.close()  # 关闭子进程
+        assert worker.enabled is False  # 验证已停用
+        assert worker._process is None  # 验证子进程已回收
+        assert worker.process_batch(b'\x01\x00', b"") == b'\x01\x00'  # 关闭后直通
+
+    def test_timeout_passes_through_and_drops_late_reply(self):
+        """验证单次超时只直通本块，迟到的响应在下次读取时被丢弃"""
+        worker, child = _connected_worker()
+        mic = b'\x01\x00' * 320  # 一帧麦克风数据
+        assert worker.process_batch(mic, b"") == mic  # 无响应：超时直通
+        assert worker.enabled is True  # 单次超时不停用
+        child.recv_bytes()  # 子进程收到第一次请求
+        child.send_bytes(b'late')  # 第一次请求的迟到响应
+        child.send_bytes(b'fresh')  # 第二次请求的响应（提前放入管道）
+        assert worker.process_batch(mic, b"") == b'fresh'  # 丢弃迟到响应，返回本次结果
+        assert worker._timeouts == 0  # 正常响应后清零
+
+    def test_repeated_timeouts_restart_worker(self):
+        """验证连续超时达到上限时重启子进程"""
+        worker, _child = _connected_worker(max_timeouts=2)
+        worker._restart = MagicMock()  # 不真正重启
+        mic = b'\x01\x00' * 320  # 一帧麦克风数据
+        worker.process_batch(mic, b"")  # 第一次超时
+        worker._restart.assert_not_called()  # 未达到上限
+        worker.process_batch(mic, b"")  # 第二次超时
+        worker._restart.assert_called_once()  # 达到上限，重启
@@ -118,6 +118,121 @@ class TestCallQwenForToolUse:
                 assert result == []
 
 
+def _stream_chunk(*deltas):
+    """构造一个流式响应块：deltas 为 (序号, 函数名, 参数片段)"""
+    tool_calls = []  # 工具调用增量
+    for index, name, arguments in deltas:
+        delta = MagicMock()
+        delta.index = index  # 工具调用序号
+        delta.function.name = name  # 函数名（仅首个增量携带）
+        delta.function.arguments = arguments  # 参数片段
+        tool_calls.append(delta)
+    chunk = MagicMock()
+    chunk.choices = [MagicMock()]
+    chunk.choices[0].delta.tool_calls = tool_calls or None  # 无工具调用时为 None
+    return chunk
+
+
+class TestIterQwenToolCalls:
+    """流式 Function Calling 测试类"""
+
+    FC_CONFIG = {"ENABLED": True, "MODEL": "qwen-max", "TEMPERATURE": 0.3, "MAX_TOKENS": 500, "TIMEOUT": 3.0}
+
+    def test_yields_each_call_once_arguments_complete(self):
+        """测试每个工具调用的参数一闭合就产出，不等待后续数据块"""
+        consumed = []  # 已被读取的数据块序号
+
+        def chunks():
+            yield _stream_chunk()  # 文本内容块
+            consumed.append(0)
+            yield _stream_chunk((0, "move_robot", '{"vx": 0.5,'))  # 第一个工具调用的前半段参数
+            consumed.append(1)
+            yield _stream_chunk((0, None, ' "duration": 2}'))  # 参数闭合
+            consumed.append(2)
+            yield _stream_chunk((0, None, " "), (1, "stop_robot", ""))  # 闭合后的空白 + 无参数工具
+            consumed.append(3)
+
+        stream = MagicMock()
+        stream.__iter__.side_effect = lambda: chunks()  # 模拟 SSE 流
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = stream
+
+        with patch('VoiceInteraction.api_init.FUNCTION_CALLING_CONFIG', self.FC_CONFIG), \
+                patch('VoiceInteraction.api_init.get_openai_client', return_value=mock_client):
+            from VoiceInteraction.api_init import iter_qwen_tool_calls
+
+            calls = iter_qwen_tool_calls("前进两秒然后停下", [])
+            first = next(calls)  # 第一个工具调用
+            assert first == {"name": "move_robot", "arguments": {"vx": 0.5, "duration": 2}}
+            assert consumed == [0, 1]  # 第三个数据块读完即产出，尚未读取后续数据块
+            assert list(calls) == [{"name": "stop_robot", "arguments": {}}]  # 流结束时产出无参数工具
+
+        assert mock_client.chat.completions.create.call_args.kwargs["stream"] is True  # 使用流式接口
+        stream.close.assert_called_once()  # 释放连接
+
+    def test_stream_error_keeps_emitted_calls(self):
+        """测试流中途失败时已产出的工具调用保留，之后不再产出"""
+        def chunks():
+            yield _stream_chunk((0, "stop_robot", "{}"))  # 完整的工具调用
+            raise ConnectionError("reset")  # 连接中断
+
+        stream = MagicMock()
+        stream.__iter__.side_effect = lambda: chunks()
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = stream
+
+        with patch('VoiceInteraction.api_init.FUNCTION_CALLING_CONFIG', self.FC_CONFIG), \
+                patch('VoiceInteraction.api_init.get_openai_client', return_value=mock_client):
+            from VoiceInteraction.api_init import iter_qwen_tool_calls
+
+            assert list(iter_qwen_tool_calls("停下", [])) == [{"name": "stop_robot", "arguments": {}}]
+
+    def test_disabled_yields_nothing(self):
+        """测试功能禁用时不发起请求"""
+        with patch('VoiceInteraction.api_init.FUNCTION_CALLING_CONFIG', {"ENABLED": False}), \
+                patch('VoiceInteraction.api_init.get_openai_client') as get_client:
+            from VoiceInteraction.api_init import iter_qwen_tool_calls
+
+            assert list(iter_qwen_tool_calls("前进", [])) == []
+            get_client.assert_not_called()
+
+
+class TestGetOpenaiClient:
+    """OpenAI 客户端单例测试类"""
+
+    def test_singleton_uses_pooled_http_client(self):
+        """测试单例只创建一次，并传入连接池 http_client"""
+        mock_openai = MagicMock()  # 模拟 OpenAI 类
+        mock_httpx = MagicMock()  # 模拟 httpx 模块
+
+        with patch('VoiceInteraction.api_init.OpenAI', mock_openai), \
+                patch('VoiceInteraction.api_init.httpx', mock_httpx), \
+                patch('VoiceInteraction.api_init._OPENAI_CLIENT', None), \
+                patch('VoiceInteraction.api_init.get_dashscope_api_key', return_value="test-key"):
+            from VoiceInteraction.api_init import get_openai_client
+
+            client = get_openai_client()  # 首次创建
+            assert get_openai_client() is client  # 再次获取为同一实例
+
+        mock_openai.assert_called_once()  # 只构造一次
+        assert mock_openai.call_args.kwargs["http_client"] is mock_httpx.Client.return_value  # 复用连接池
+        assert mock_httpx.Limits.call_args.kwargs["keepalive_expiry"] == 30.0  # 长连接保持
+
+    def test_without_httpx_uses_default_client(self):
+        """测试 httpx 不可用时不传 http_client"""
+        mock_openai = MagicMock()  # 模拟 OpenAI 类
+
+        with patch('VoiceInteraction.api_init.OpenAI', mock_openai), \
+                patch('VoiceInteraction.api_init.httpx', None), \
+                patch('VoiceInteraction.api_init._OPENAI_CLIENT', None), \
+                patch('VoiceInteraction.api_init.get_dashscope_api_key', return_value="test-key"):
+            from VoiceInteraction.api_init import get_openai_client
+
+            get_openai_client()  # 创建客户端
+
+        assert "http_client" not in mock_openai.call_args.kwargs  # 使用默认客户端
+
+
 class TestGetDashscopeApiKey:
     """DashScope API Key 获取测试类"""
 
@@ -157,6 +272,28 @@ class TestGetDashscopeApiKey:
                 assert "未找到 DashScope API Key" in str(exc_info.value)
 
 
+class TestLlmApiConfig:
+    """LLM API 配置测试类"""
+
+    def test_keys_loaded_from_env_at_import(self):
+        """测试 API Key 与端点在导入时从环境变量读取，源码中不含密钥"""
+        import importlib  # 重新加载模块
+        import llm_api_config  # 被测配置模块
+        env = {"DASHSCOPE_API_KEY": "env-key", "QWEN_MODEL": "qwen-plus"}
+        try:
+            with patch.dict(os.environ, env):
+                importlib.reload(llm_api_config)  # 在补丁环境下重新执行模块
+                assert llm_api_config.QWEN_API_CONFIG["api_key"] == "env-key"  # 来自环境变量
+                assert llm_api_config.QWEN_API_CONFIG["model_name"] == "qwen-plus"  # 可覆盖模型
+                assert llm_api_config.DEFAULT_CONFIG is llm_api_config.QWEN_API_CONFIG  # 默认配置
+            with patch.dict(os.environ, {}, clear=True):
+                importlib.reload(llm_api_config)  # 无环境变量
+                assert llm_api_config.QWEN_API_CONFIG["api_key"] == ""  # 不回退到硬编码密钥
+                assert llm_api_config.SILICON_FLOW_API_CONFIG["api_key"] == ""
+        finally:
+            importlib.reload(llm_api_config)  # 恢复为真实环境
+
+
 class TestInitDashscopeEndpoints:
     """DashScope 端点初始化测试类"""
 
@@ -14,6 +14,7 @@ import pytest  # 导入 pytest 测试框架
 import time  # 导入时间模块
 import base64  # 导入 Base64 编解码模块
 import threading  # 导入线程模块
+import numpy as np  # 预先导入，避免在 patch.dict(sys.modules) 内首次导入后被移除导致重复加载
 from unittest.mock import MagicMock, patch, PropertyMock  # 导入 Mock 工具
 
 
@@ -43,7 +44,7 @@ class TestB64PCMPlayer:
     def test_init(self, player, mock_pyaudio):
         """测试初始化"""
         assert player.sample_rate == 24000  # 验证采样率
-        assert player.chunk_size_bytes == 4800  # 验证块大小 (100ms * 24000 * 2 / 1000)
+        assert len(player._play_buf) == 2400  # 播放块大小 (100ms * 24000 / 1000 个样本)
         mock_pyaudio.open.assert_called()  # 验证 open 被调用
 
     def test_add_data_sets_not_idle(self, player):
@@ -93,6 +94,20 @@ class TestB64PCMPlayer:
         assert player._pending_b64 == 0  # 验证计数清零
         assert player._pending_raw_bytes == 0  # 验证计数清零
 
+    def test_interrupt_syncs_counters_after_threads_park(self, player):
+        """测试打断在解码/播放线程停靠后同步计数，且不因解码线程阻塞在 get 上而变慢"""
+        time.sleep(0.05)  # 让解码线程进入阻塞 get
+        player.add_data(base64.b64encode(b'\x00' * 48000).decode('ascii'))  # 1 秒音频
+        start = time.monotonic()  # 计时
+        player.interrupt(reset_stream=False)  # 打断
+        assert time.monotonic() - start < 0.15  # 空串唤醒解码线程，无需等到 get 超时
+        assert player._decoder_parked.is_set() is True  # 解码线程已停靠
+        assert player._pending_b64 == 0  # 验证计数清零
+        assert player._pending_raw_bytes == 0  # 验证计数清零
+
+        player.add_data(base64.b64encode(b'\x00' * 960).decode('ascii'))  # 打断后的新回复
+        assert player.wait_until_idle(timeout=2.0) is True  # 计数一致，能够再次进入空闲
+
     def test_interrupt_sets_idle(self, player):
         """测试打断后状态变为空闲"""
         # 先设置为非空闲
@@ -104,6 +119,67 @@ class TestB64PCMPlayer:
         # 验证状态变为空闲
         assert player._idle_event.is_set() is True  # 验证空闲
 
+    def test_interrupt_reopens_stream_after_player_parks(self, player, mock_pyaudio):
+        """测试没有备用流时，播放线程停靠后 interrupt 同步重建音频流"""
+        player._spare_stream = None  # 模拟备用流打开失败
+        opens = mock_pyaudio.open.call_count  # 初始化时的打开次数
+        player.interrupt(reset_stream=True)  # 打断并重置流
+        assert mock_pyaudio.open.call_count == opens + 1  # 验证重新打开
+
+    def test_interrupt_rebuild_fallback_updates_rate_state(self, mock_pyaudio):
+        """测试运行期同步重建流回退到其他采样率时，播放缓冲区与重采样器随之重建"""
+        mock_pyaudio.get_default_output_device_info.return_value = {
+            'name': 'mock', 'defaultSampleRate': 24000.0, 'index': 0
+        }  # 初始设备采样率与源一致，不做播放重采样
+        with patch.dict('sys.modules', {'aec_processor': MagicMock()}):
+            from VoiceInteraction.audio_player import B64PCMPlayer
+            player = B64PCMPlayer(mock_pyaudio, sample_rate=24000, chunk_size_ms=100)
+        try:
+            assert player._playback_resampler is None  # 同采样率
+            player._spare_stream = None  # 走同步重建路径
+            stream = mock_pyaudio.open.return_value  # 模拟音频流
+            mock_pyaudio.get_default_output_device_info.return_value = {
+                'name': 'mock', 'defaultSampleRate': 48000.0, 'index': 0
+            }  # 默认设备改为 48kHz
+            mock_pyaudio.open.side_effect = [OSError("busy"), stream]  # 原采样率打开失败，回退到默认设备
+            resampler = MagicMock()  # 新的播放重采样器
+            with patch.dict('sys.modules', {'aec_processor': MagicMock(StreamingResampler=MagicMock(return_value=resampler))}):
+                player.interrupt(reset_stream=True)  # 打断并同步重建流
+            assert player._device_sample_rate == 48000  # 采样率已改变
+            assert player._playback_resampler is resampler  # 重建播放重采样器
+            assert len(player._play_buf) == 4800  # 播放块按新采样率分配 (100ms * 48000 / 1000)
+            assert player.raw_audio_buffer.capacity >= 48000 * 10  # raw 环按新采样率分配
+        finally:
+            mock_pyaudio.open.side_effect = None
+            player.shutdown()  # 清理
+
+    def test_interrupt_swaps_in_spare_stream(self, player, mock_pyaudio):
+        """测试 interrupt 换用备用流，旧流在后台关闭并补充新的备用流"""
+        old = player.player_stream  # 当前输出流
+        spare = MagicMock()  # 预先打开的备用流
+        player._spare_stream = spare
+        fresh = MagicMock()  # 后台补充的备用流
+        mock_pyaudio.open.return_value = fresh
+        player.interrupt(reset_stream=True)  # 打断并重置流
+        assert player.player_stream is spare  # 立即换用备用流
+        spare.start_stream.assert_called_once()  # 备用流已启动
+        deadline = time.time() + 1.0  # 等待后台线程
+        while player._spare_stream is not fresh and time.time() < deadline:
+            time.sleep(0.01)
+        assert player._spare_stream is fresh  # 已补充新的备用流
+        old.close.assert_called()  # 旧流已关闭
+        assert mock_pyaudio.open.call_args.kwargs['start'] is False  # 备用流打开时不启动
+
+    def test_interrupt_skips_stream_reset_while_writer_busy(self, player, mock_pyaudio):
+        """测试播放线程未停靠（仍在 write）时不与写入并发关闭流"""
+        opens = mock_pyaudio.open.call_count  # 初始化时的打开次数
+        with patch.object(player._player_parked, 'wait', return_value=False):  # 模拟停靠超时
+            player.interrupt(reset_stream=True)  # 打断并请求重置流
+        mock_pyaudio.open.return_value.close.assert_not_called()  # 验证未关闭流
+        assert player._spare_stream is not None  # 备用流保留给下一次打断
+        assert mock_pyaudio.open.call_count == opens  # 验证未重新打开
+        assert player._idle_event.is_set() is True  # 仍然完成打断
+
     def test_wait_until_idle_returns_immediately_when_idle(self, player):
         """测试空闲时 wait_until_idle 立即返回"""
         # 初始状态为空闲
@@ -114,10 +190,26 @@ class TestB64PCMPlayer:
         assert result is True  # 验证返回 True
         assert elapsed < 0.1  # 验证立即返回
 
-    def test_get_reference_frame_returns_empty_when_no_data(self, player):
-        """测试无数据时 get_reference_frame 返回空"""
+    def test_get_reference_frame_returns_silence_when_no_data(self, player):
+        """测试无数据时 get_reference_frame 返回整帧静音"""
         frame = player.get_reference_frame(timeout=0.01)  # 获取参考帧
-        assert frame == b""  # 验证返回空字节串
+        assert frame == bytes(640)  # 验证返回 20ms 静音帧
+        assert player.get_reference_frame(timeout=0) is frame  # 复用预分配的静音帧
+        assert player.get_reference_frame(timeout=0, num_samples=160) == bytes(320)  # 其他帧长同样定长
+
+    def test_get_reference_frame_zero_pads_partial_frame(self, player):
+        """测试参考信号不足一帧时 get_reference_frame 补零到整帧"""
+        player.reference_buffer.push(b'\x01\x00' * 100)  # 写入 100 个样本
+        frame = player.get_reference_frame(timeout=0)  # 获取参考帧
+        assert frame == b'\x01\x00' * 100 + bytes(440)  # 已播放部分 + 补零
+
+    def test_get_reference_samples_zero_fills(self, player):
+        """测试 get_reference_samples 不足部分补零且不阻塞"""
+        player.reference_buffer.push(b'\x01\x00' * 100)  # 写入 100 个样本
+        data = player.get_reference_samples(320)  # 读取一帧
+        assert len(data) == 640  # 验证定长
+        assert data[:200] == b'\x01\x00' * 100  # 验证已播放部分
+        assert data[200:] == b'\x00' * 440  # 验证补零部分
 
     def test_shutdown_stops_threads(self, player):
         """测试 shutdown 停止线程"""
@@ -174,3 +266,202 @@ class TestB64PCMPlayerDecoding:
 
         # 验证没有崩溃，播放器仍然正常
         assert player._status != "stop"  # 验证未停止
+
+    def test_decode_b64_batch(self):
+        """测试批量解码：可拼接时整批解码，含填充或无效片段时逐段解码"""
+        with patch.dict('sys.modules', {'aec_processor': MagicMock()}):
+            from VoiceInteraction.audio_player import _decode_b64_batch
+        a, b = b'\x01\x02\x03' * 4, b'\x04\x05'  # a 长度为 3 的倍数（无填充），b 会带填充
+        enc = lambda d: base64.b64encode(d).decode('ascii')  # 编码工具
+        assert _decode_b64_batch([enc(a), enc(a), enc(b)]) == a + a + b  # 整批拼接解码
+        assert _decode_b64_batch([enc(b), enc(a)]) == b + a  # 中间有填充：逐段解码
+        assert _decode_b64_batch([enc(a), "无效!!!", enc(b)]) == a + b  # 跳过无效片段
+        assert _decode_b64_batch(["无效!!!"]) == b""  # 单条无效消息
+
+    def test_reference_released_with_playback(self, mock_pyaudio):
+        """测试参考信号按消息整体重采样，并随播放进度发布且总数不漂移"""
+        mock_pyaudio.get_default_output_device_info.return_value = {
+            'name': 'mock', 'defaultSampleRate': 24000.0, 'index': 0
+        }  # 设备采样率与源一致
+        with patch.dict('sys.modules', {'aec_processor': MagicMock()}):
+            from VoiceInteraction.audio_player import B64PCMPlayer
+            player = B64PCMPlayer(mock_pyaudio, sample_rate=24000, chunk_size_ms=100)
+        resampler = MagicMock()  # 模拟重采样器：输出 ceil(2n/3) 个样本
+        resampler.process.side_effect = (
+            lambda s: np.ones(-(-2 * len(s) // 3), dtype=np.int16)
+        )
+        player.resampler = resampler  # 注入
+        player.get_reference_samples(0)  # 标记 AEC 正在读取参考信号
+        try:
+            for n in (1001, 1000):  # 两条长度不是 3 的倍数的消息
+                player.add_data(base64.b64encode(b'\x00\x00' * n).decode('ascii'))  # 添加数据
+            deadline = time.monotonic() + 2.0  # 等待两条消息都播放完成
+            while player.reference_buffer.available() < 1334 and time.monotonic() < deadline:
+                time.sleep(0.01)  # 短暂等待
+
+            assert 1 <= resampler.process.call_count <= 2  # 每批消息只重采样一次（排队的消息可能被合并）
+            assert player.reference_buffer.available() == 2001 * 2 // 3  # 累计余数，无逐条取整漂移
+        finally:
+            player.shutdown()  # 清理
+
+    def test_reference_tap_skipped_without_consumer(self, mock_pyaudio):
+        """测试无人读取参考信号时跳过重采样，只写入等长静音以保持对齐"""
+        mock_pyaudio.get_default_output_device_info.return_value = {
+            'name': 'mock', 'defaultSampleRate': 24000.0, 'index': 0
+        }  # 设备采样率与源一致
+        with patch.dict('sys.modules', {'aec_processor': MagicMock()}):
+            from VoiceInteraction.audio_player import B64PCMPlayer
+            player = B64PCMPlayer(mock_pyaudio, sample_rate=24000, chunk_size_ms=100)
+        resampler = MagicMock()  # 模拟重采样器
+        player.resampler = resampler  # 注入（从未调用 get_reference_*）
+        try:
+            player.add_data(base64.b64encode(b'\x01\x00' * 2400).decode('ascii'))  # 100ms 音频
+            assert player.wait_until_idle(timeout=2.0) is True  # 等待播放完成
+
+            resampler.process.assert_not_called()  # 未做参考信号重采样
+            np.testing.assert_array_equal(player.reference_buffer.pop(10000), np.zeros(1600))  # 静音占位
+        finally:
+            player.shutdown()  # 清理
+
+    def test_device_rate_resampled_before_ring(self, mock_pyaudio):
+        """测试设备采样率不同时解码线程整批重采样，播放端直接写入，参考信号总数按设备样本数对齐"""
+        pytest.importorskip("scipy")  # 使用真实的重采样器
+        mock_pyaudio.get_default_output_device_info.return_value = {
+            'name': 'mock', 'defaultSampleRate': 48000.0, 'index': 0
+        }  # 设备采样率为源的 2 倍
+        from VoiceInteraction.audio_player import B64PCMPlayer
+        player = B64PCMPlayer(mock_pyaudio, sample_rate=24000, chunk_size_ms=40)
+        try:
+            assert player.raw_audio_buffer.capacity >= 480000  # raw 环按设备采样率分配
+            test_pcm = (np.sin(np.arange(2400) * 0.05) * 8000).astype(np.int16).tobytes()  # 100ms @ 24kHz
+            player.get_reference_samples(0)  # 标记 AEC 正在读取参考信号
+            player.add_data(base64.b64encode(test_pcm).decode('ascii'))  # 添加数据
+            assert player.wait_until_idle(timeout=2.0) is True  # 等待播放完成
+
+            stream = mock_pyaudio.open.return_value  # 模拟音频流
+            writes = [c.args[0] for c in stream.write.call_args_list]  # 所有写入
+            assert sum(len(w) for w in writes) == 4800 * 2  # 100ms @ 48kHz
+            assert max(len(w) for w in writes) <= 1920 * 2  # 每次写入不超过一个 40ms 设备采样率块
+            ref = player.reference_buffer.pop(10000)  # 读取参考信号
+            assert len(ref) == 1600 and ref.any()  # 100ms @ 16kHz，且为真实重采样结果
+        finally:
+            player.shutdown()  # 清理
+
+    def test_device_rate_playback_continuous_across_messages(self, mock_pyaudio):
+        """测试设备采样率不同时，多条消息的播放输出与整段一次重采样逐样本一致（消息边界无跳变）"""
+        pytest.importorskip("scipy")  # 使用真实的重采样器
+        mock_pyaudio.get_default_output_device_info.return_value = {
+            'name': 'mock', 'defaultSampleRate': 44100.0, 'index': 0
+        }  # 非整数倍的设备采样率
+        from VoiceInteraction.audio_player import B64PCMPlayer
+        from VoiceInteraction.aec_processor import StreamingResampler
+        player = B64PCMPlayer(mock_pyaudio, sample_rate=24000, chunk_size_ms=40)
+        try:
+            pcm = (np.sin(np.arange(7200) * 2 * np.pi * 440 / 24000) * 8000).astype(np.int16)  # 300ms @ 24kHz
+            for i in range(0, len(pcm), 960):  # 40ms 一条消息，模拟流式下发
+                player.add_data(base64.b64encode(pcm[i:i + 960].tobytes()).decode('ascii'))
+                time.sleep(0.005)  # 让解码线程分批处理
+            assert player.wait_until_idle(timeout=2.0) is True  # 等待播放完成
+
+            stream = mock_pyaudio.open.return_value  # 模拟音频流
+            played = np.frombuffer(b"".join(c.args[0] for c in stream.write.call_args_list), dtype=np.int16)
+            expected = StreamingResampler(24000, 44100).process(pcm)  # 整段一次重采样
+            np.testing.assert_array_equal(played, expected)  # 批边界连续
+        finally:
+            player.shutdown()  # 清理
+
+    def test_callback_mode_pulls_from_ring(self, mock_pyaudio):
+        """测试回调模式：不启动播放线程，回调从 raw 环拉取样本并在欠载时补静音"""
+        mock_pyaudio.get_default_output_device_info.return_value = {
+            'name': 'mock', 'defaultSampleRate': 24000.0, 'index': 0
+        }  # 设备采样率与源一致
+        with patch.dict('sys.modules', {'aec_processor': MagicMock()}):
+            from VoiceInteraction import audio_player
+            player = audio_player.B64PCMPlayer(mock_pyaudio, sample_rate=24000, chunk_size_ms=100, use_callback=True)
+        try:
+            kwargs = mock_pyaudio.open.call_args.kwargs  # 打开流的参数
+            assert kwargs['stream_callback'] == player._pa_callback  # 注册了回调
+            assert kwargs['frames_per_buffer'] == 480  # 20ms @ 24kHz
+            assert player._player_thread.is_alive() is False  # 不启动播放线程
+            mock_pyaudio.open.return_value.start_stream.assert_called()  # 缓冲区就绪后启动流
+
+            player.resampler = None  # 不测试参考信号
+            test_pcm = np.arange(600, dtype=np.int16).tobytes()  # 600 个样本
+            player.add_data(base64.b64encode(test_pcm).decode('ascii'))  # 添加数据
+            deadline = time.monotonic() + 2.0  # 等待解码线程写入 raw 环
+            while player.raw_audio_buffer.available() < 600 and time.monotonic() < deadline:
+                time.sleep(0.01)  # 短暂等待
+
+            out1, flag = player._pa_callback(None, 480, {}, 0)  # 第一次拉取：整块数据
+            assert flag == audio_player.pyaudio.paContinue  # 继续播放
+            assert out1 == test_pcm[:960]  # 验证数据
+            out2, _ = player._pa_callback(None, 480, {}, 0)  # 第二次拉取：剩余 120 个样本 + 静音
+            assert out2 == test_pcm[960:] + bytes(720)  # 验证补静音
+            assert player.wait_until_idle(timeout=1.0) is True  # 播放完毕进入空闲
+        finally:
+            player.shutdown()  # 清理
+
+    def test_callback_mode_interrupt_keeps_stream(self, mock_pyaudio):
+        """测试回调模式打断时不关闭/重新打开音频流，回调随即输出静音"""
+        mock_pyaudio.get_default_output_device_info.return_value = {
+            'name': 'mock', 'defaultSampleRate': 24000.0, 'index': 0
+        }  # 设备采样率与源一致
+        with patch.dict('sys.modules', {'aec_processor': MagicMock()}):
+            from VoiceInteraction import audio_player
+            player = audio_player.B64PCMPlayer(mock_pyaudio, sample_rate=24000, chunk_size_ms=100, use_callback=True)
+        try:
+            stream = mock_pyaudio.open.return_value  # 模拟音频流
+            stream.is_active.return_value = False  # 模拟回调未在运行，interrupt 不等待停靠
+            player.resampler = None  # 不测试参考信号
+            player.raw_audio_buffer.push(np.arange(600, dtype=np.int16))  # 模拟待播放样本
+            opens = mock_pyaudio.open.call_count  # 打断前打开流的次数
+
+            player.interrupt(reset_stream=True)  # 打断
+
+            assert mock_pyaudio.open.call_count == opens  # 没有重新打开流
+            stream.stop_stream.assert_not_called()  # 没有停止流
+            stream.close.assert_not_called()  # 没有关闭流
+            out, _ = player._pa_callback(None, 480, {}, 0)  # 打断后的下一块
+            assert out == bytes(960)  # 输出静音
+        finally:
+            player.shutdown()  # 清理
+
+    def test_callback_mode_kept_on_44100_fallback(self, mock_pyaudio):
+        """测试设备与默认设备都打开失败时，44100Hz 备选流仍注册回调并按新采样率计算帧数"""
+        mock_pyaudio.get_default_output_device_info.return_value = {
+            'name': 'mock', 'defaultSampleRate': 48000.0, 'index': 0
+        }  # 设备报告 48kHz
+        stream = mock_pyaudio.open.return_value  # 最终返回的流
+        mock_pyaudio.open.side_effect = [OSError("busy"), OSError("busy"), stream]  # 前两次打开失败
+        with patch.dict('sys.modules', {'aec_processor': MagicMock()}):
+            from VoiceInteraction import audio_player
+            player = audio_player.B64PCMPlayer(mock_pyaudio, sample_rate=24000, chunk_size_ms=100, use_callback=True)
+        try:
+            kwargs = mock_pyaudio.open.call_args.kwargs  # 最后一次打开流的参数
+            assert kwargs['rate'] == 44100  # 使用备选采样率
+            assert kwargs['stream_callback'] == player._pa_callback  # 仍注册回调
+            assert kwargs['frames_per_buffer'] == 882  # 20ms @ 44.1kHz
+            assert player._device_sample_rate == 44100  # 解码线程按新采样率重采样
+            assert len(player._cb_buf) == 882  # 回调缓冲区按新帧数分配
+            stream.start_stream.assert_called()  # 回调流已启动
+        finally:
+            player.shutdown()  # 清理
+
+    def test_decoded_audio_reaches_stream(self, mock_pyaudio):
+        """测试解码后的样本经 raw 环完整写入音频流"""
+        mock_pyaudio.get_default_output_device_info.return_value = {
+            'name': 'mock', 'defaultSampleRate': 24000.0, 'index': 0
+        }  # 设备采样率与源一致，不做播放重采样
+        with patch.dict('sys.modules', {'aec_processor': MagicMock()}):
+            from VoiceInteraction.audio_player import B64PCMPlayer
+            player = B64PCMPlayer(mock_pyaudio, sample_rate=24000, chunk_size_ms=100)
+        try:
+            test_pcm = bytes(range(256)) * 40  # 10240 字节，跨越多个播放块
+            player.add_data(base64.b64encode(test_pcm).decode('ascii'))  # 添加数据
+            assert player.wait_until_idle(timeout=2.0) is True  # 等待播放完成
+
+            stream = mock_pyaudio.open.return_value  # 模拟音频流
+            written = b"".join(c.args[0] for c in stream.write.call_args_list)  # 拼接所有写入
+            assert written == test_pcm  # 验证数据完整且有序
+        finally:
+            player.shutdown()  # 清理
@@ -5,8 +5,10 @@ from VoiceInteraction.bridge import (  # 导入被测函数
     validate_movement_params,
     validate_rotation_angle,
     execute_tool_call,
-    _execute_move_robot
+    _execute_move_robot,
+    refresh_safety_constants
 )
+from VoiceInteraction import bridge  # 导入被测模块（修改其引用的配置字典）
 from VoiceInteraction.config import SAFETY_CONFIG  # 导入安全配置
 
 
@@ -79,6 +81,35 @@ class TestBridgeSafety:
         assert params2["duration"] == SAFETY_CONFIG["MIN_DURATION"]  # 时间被截断
 
 
+    def test_refresh_safety_constants(self, monkeypatch):
+        """测试替换 bridge.SAFETY 后调用 refresh_safety_constants() 生效"""
+        monkeypatch.setattr(bridge, "SAFETY", bridge.SAFETY._replace(MAX_SAFE_SPEED_VX=0.1))  # 临时收紧限制
+        refresh_safety_constants()  # 重新加载常量
+        try:
+            is_valid, warning, params = validate_movement_params(0.5, 0.0, 0.0)  # 验证参数
+            assert is_valid is False  # 参数被截断
+            assert params["vx"] == 0.1  # 使用新的限制值
+        finally:
+            monkeypatch.undo()  # 恢复配置
+            refresh_safety_constants()  # 恢复常量
+
+
+    def test_clamp_movement_core_flags(self):
+        """测试截断核心返回的位掩码只标记被截断的参数"""
+        *_, flags = bridge._clamp_movement_core(0.1, 0.0, 0.0, False, 0.0, 1.0, 1.0, 1.0, 0.1, 10.0, 2.0)  # 全部在范围内（未提供 duration）
+        assert flags == 0  # 无截断
+        assert _[3] == 2.0  # 使用默认持续时间
+        vx, vy, vyaw, dur, flags = bridge._clamp_movement_core(-5.0, 0.0, 3.0, True, 20.0, 1.0, 1.0, 1.0, 0.1, 10.0, 2.0)  # vx/vyaw/duration 超限
+        assert (vx, vyaw, dur) == (-1.0, 1.0, 10.0)  # 截断到边界
+        assert flags == bridge._CLIP_VX | bridge._CLIP_VYAW | bridge._CLIP_DURATION  # vy 未被标记
+
+    def test_validate_movement_params_nan_duration(self):
+        """测试 duration 为 NaN 时使用默认值并报告截断，不会把 NaN 交给任务队列"""
+        is_valid, warning, params = validate_movement_params(0.1, 0.0, 0.0, float("nan"))  # 非法持续时间
+        assert is_valid is False  # 报告为截断
+        assert params["duration"] == SAFETY_CONFIG["DEFAULT_DURATION"]  # 使用默认持续时间
+
+
 class TestBridgeExecution:
     """测试工具执行分发逻辑。"""
 
@@ -144,6 +175,21 @@ class TestBridgeExecution:
         assert result["status"] == "success"  # 应返回成功
         mock_am.set_idle.assert_called_once()  # 验证set_idle被调用
 
+    def test_fixed_results_are_shared_and_read_only(self, mock_g1_client):
+        """测试固定内容的成功结果复用同一只读对象，修改会抛出异常"""
+        mock_am = MagicMock()  # 创建Mock ActionManager
+        mock_am._running = True  # 设置为运行状态
+
+        first = execute_tool_call("stop_robot", {}, mock_am, mock_g1_client)  # 第一次调用
+        second = execute_tool_call("stop_robot", {}, mock_am, mock_g1_client)  # 第二次调用
+
+        assert first is second  # 不再每次新建字典
+        assert dict(first["data"]) == {"vx": 0.0, "vy": 0.0, "vyaw": 0.0}  # 内容不变
+        with pytest.raises(TypeError):  # 外层只读
+            first["status"] = "error"
+        with pytest.raises(TypeError):  # 内层 data 只读
+            first["data"]["vx"] = 1.0
+
     def test_execute_unknown_tool(self, mock_g1_client):
         """测试未知工具调用的错误处理。"""
         mock_am = MagicMock()  # 创建Mock ActionManager
@@ -179,3 +225,20 @@ class TestBridgeExecution:
         assert len(results) == 5  # 应有5个结果
         for result in results:  # 验证每个结果
             assert result["status"] == "success"  # 每个调用都应成功
+
+    def test_execute_tool_calls_sequential_order(self, mock_g1_client):
+        """测试顺序执行保持结果顺序，失败的工具不影响后续工具"""
+        mock_am = MagicMock()  # 创建Mock ActionManager
+        mock_am._running = True  # 设置为运行状态
+
+        tool_calls = [
+            {"name": "stop_robot"},  # 缺省参数
+            {"name": "unknown_tool_xyz", "arguments": {}},  # 未知工具（失败）
+            {"name": "emergency_stop", "arguments": {}},  # 紧急停止
+        ]
+        results = bridge.execute_tool_calls_sequential(tool_calls, mock_am, mock_g1_client)  # 顺序执行
+
+        assert [r["status"] for r in results] == ["success", "error", "success"]  # 结果与输入一一对应
+        mock_am.emergency_stop.assert_called_once()  # 失败后继续执行后续工具
+        assert bridge._EMPTY_ARGS == {}  # 共享的缺省参数未被修改
+        assert bridge.execute_tool_calls_sequential([], mock_am, mock_g1_client) == []  # 空列表返回空结果
@@ -16,10 +16,57 @@ from VoiceInteraction.command_detector import (
     is_interrupt_command,
     detect_self_introduction,
     is_complex_command,
-    try_execute_g1_by_local_keywords
+    try_execute_g1_by_local_keywords,
+    classify,
+    normalize,
+    _KEYWORD_GROUPS
 )  # 导入被测函数
 
 
+@pytest.fixture(scope="module")
+def fallback_detector():
+    """在屏蔽 ahocorasick 的情况下加载一份独立的 command_detector（不影响已导入的模块）"""
+    import importlib.util  # 按路径加载模块
+    import sys  # 模块表
+    import VoiceInteraction.command_detector as detector  # 定位源文件
+    spec = importlib.util.spec_from_file_location("_command_detector_fallback", detector.__file__)
+    module = importlib.util.module_from_spec(spec)  # 新模块对象
+    with patch.dict(sys.modules, {"ahocorasick": None}):  # None 使 import 抛出 ImportError
+        spec.loader.exec_module(module)  # 执行模块代码
+    return module
+
+
+class TestClassify:
+    """单次扫描关键词分类测试类"""
+
+    @pytest.mark.parametrize("text", [
+        "停止播放声音", "我的名字叫小明", "向前走三米然后左转", "停一下", "挥挥手", "", "今天天气不错", "明天会下雨吗",
+    ])
+    def test_matches_substring_reference(self, text):
+        """测试分类结果与逐关键词子串查找一致（含重叠和嵌套关键词）"""
+        expected = {cat for cat, kws in _KEYWORD_GROUPS.items() if any(kw in text for kw in kws)}  # 参考实现
+        assert classify(text) == expected  # 验证一致
+
+    @pytest.mark.parametrize("text", [
+        "停止播放声音", "我的名字叫小明", "向前走三米然后左转", "停一下", "挥挥手", "", "今天天气不错", "明天会下雨吗",
+    ])
+    def test_regex_fallback_matches_reference(self, text, fallback_detector):
+        """测试未安装 pyahocorasick 时的正则回退与逐关键词子串查找一致"""
+        assert fallback_detector.AHOCORASICK_AVAILABLE is False  # 确认走回退路径
+        expected = {cat for cat, kws in _KEYWORD_GROUPS.items() if any(kw in text for kw in kws)}  # 参考实现
+        assert fallback_detector.classify(text) == expected  # 验证一致
+
+    def test_normalized_utterance_shared(self):
+        """测试归一化对象被各检测函数复用，分类结果只计算一次"""
+        utt = normalize("  停止播放  ")  # 归一化一次
+        assert utt.norm == "停止播放"  # 去除空白
+        assert normalize(utt) is utt  # 已归一化对象直接复用
+        assert is_interrupt_command(utt) is True  # 传入归一化对象
+        cats = utt.categories  # 已缓存的分类结果
+        assert is_complex_command(utt) is False  # 再次检测
+        assert utt.categories is cats  # 未重新扫描
+
+
 class TestIsInterruptCommand:
     """打断命令检测测试类"""
 
@@ -143,6 +190,13 @@ class TestTryExecuteG1ByLocalKeywords:
         assert result is True  # 验证返回 True
         mock_action_manager.emergency_stop.assert_called_once()  # 验证 emergency_stop 被调用
 
+    def test_emergency_stop_has_priority(self, mock_action_manager):
+        """测试急停优先于文本中更早出现的其他意图"""
+        result = try_execute_g1_by_local_keywords("前进然后急停", mock_action_manager)  # 调用被测函数
+        assert result is True  # 验证返回 True
+        mock_action_manager.emergency_stop.assert_called_once()  # 验证执行急停
+        mock_action_manager.update_target_velocity.assert_not_called()  # 验证未执行前进
+
     def test_forward_movement(self, mock_action_manager):
         """测试前进关键词"""
         result = try_execute_g1_by_local_keywords("前进", mock_action_manager)  # 调用被测函数
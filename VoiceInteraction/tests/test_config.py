@@ -5,7 +5,9 @@
 """
 
 import pytest
+from collections.abc import Mapping
 from VoiceInteraction.config import (
+    SAFETY,
     SAFETY_CONFIG,
     FUNCTION_CALLING_CONFIG,
     LOGGING_CONFIG
@@ -18,7 +20,7 @@ class TestSafetyConfig:
     def test_safety_config_exists(self):
         """验证安全配置存在"""
         assert SAFETY_CONFIG is not None  # 安全配置不应为 None
-        assert isinstance(SAFETY_CONFIG, dict)  # 安全配置应为字典类型
+        assert isinstance(SAFETY_CONFIG, Mapping)  # 安全配置应为映射类型
     
     def test_speed_limits_exist(self):
         """验证速度限制参数存在"""
@@ -85,6 +87,14 @@ class TestSafetyConfig:
         """验证旋转角度对称（MIN = -MAX）"""
         assert SAFETY_CONFIG["MIN_ROTATION_DEGREES"] == -SAFETY_CONFIG["MAX_ROTATION_DEGREES"]  # 应对称
 
+    def test_safety_config_is_read_only(self):
+        """验证安全配置不可修改，且属性访问与按键访问一致"""
+        with pytest.raises(TypeError):
+            SAFETY_CONFIG["MAX_SAFE_SPEED_VX"] = 5.0  # 只读字典视图不允许写入
+        with pytest.raises(AttributeError):
+            SAFETY.MAX_SAFE_SPEED_VX = 5.0  # NamedTuple 字段不允许赋值
+        assert SAFETY.MAX_SAFE_SPEED_VX == SAFETY_CONFIG["MAX_SAFE_SPEED_VX"]  # 两种访问方式结果一致
+
 
 class TestFunctionCallingConfig:
     """测试 Function Calling 配置"""
@@ -92,7 +102,7 @@ class TestFunctionCallingConfig:
     def test_function_calling_config_exists(self):
         """验证 Function Calling 配置存在"""
         assert FUNCTION_CALLING_CONFIG is not None  # 配置不应为 None
-        assert isinstance(FUNCTION_CALLING_CONFIG, dict)  # 配置应为字典类型
+        assert isinstance(FUNCTION_CALLING_CONFIG, Mapping)  # 配置应为映射类型
     
     def test_enabled_flag_exists(self):
         """验证启用标志存在"""
@@ -143,7 +153,7 @@ class TestLoggingConfig:
     def test_logging_config_exists(self):
         """验证日志配置存在"""
         assert LOGGING_CONFIG is not None  # 日志配置不应为 None
-        assert isinstance(LOGGING_CONFIG, dict)  # 日志配置应为字典类型
+        assert isinstance(LOGGING_CONFIG, Mapping)  # 日志配置应为映射类型
     
     def test_log_flags_exist(self):
         """验证日志标志存在"""
@@ -19,6 +19,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))  # 添加父目
 
 from emergency_stop import (  # 导入键盘监听函数
     start_keyboard_listener,
+    stop_keyboard_listener,
     _trigger_emergency_stop
 )
 
@@ -106,6 +107,109 @@ class TestEmergencyStop:
             assert False, "异常未被正确捕获"  # 测试失败
 
 
+    @pytest.mark.skipif(sys.platform == "win32", reason="仅 Linux 监听使用 select")
+    def test_linux_listener_blocks_until_key_and_stops(self):
+        """测试 Linux 监听无超时阻塞：按空格触发急停，关闭通知使线程退出"""
+        import pty  # 伪终端（tcgetattr 需要真实 tty）
+        master, slave = pty.openpty()  # 创建伪终端
+        mock_action_manager = Mock()  # 模拟ActionManager
+        mock_g1_client = Mock()  # 模拟G1客户端
+        stdin = Mock()  # 模拟标准输入
+        stdin.fileno.return_value = slave  # 指向伪终端从端
+        import tty  # 终端模式设置
+        cbreak_ready = threading.Event()  # 监听线程已进入 cbreak 模式
+        real_setcbreak = tty.setcbreak  # patch 前保存原函数
+
+        def setcbreak(fd, *args):
+            real_setcbreak(fd, *args)  # 真实设置（TCSAFLUSH 会清空此前写入的按键）
+            cbreak_ready.set()  # 之后写入的按键不会被丢弃
+
+        try:
+            with patch('emergency_stop._monitor_terminal_input', side_effect=lambda *a: None):
+                start_keyboard_listener(None, None)  # 仅创建关闭管道
+            with patch('emergency_stop.sys.stdin', stdin), \
+                    patch('emergency_stop.tty.setcbreak', side_effect=setcbreak):
+                import emergency_stop  # 导入被测模块
+                thread = threading.Thread(
+                    target=emergency_stop._monitor_linux,
+                    args=(mock_action_manager, mock_g1_client),
+                    daemon=True
+                )  # 直接运行 Linux 监听
+                thread.start()
+                assert cbreak_ready.wait(timeout=2.0)  # 等待监听线程就绪后再按键
+                os.write(master, b"a b")  # 模拟按键（含空格）
+                deadline = time.time() + 2.0  # 等待急停触发
+                while not mock_action_manager.emergency_stop.called and time.time() < deadline:
+                    time.sleep(0.01)
+                mock_action_manager.emergency_stop.assert_called_once()  # 验证急停被触发
+
+                stop_keyboard_listener()  # 通知线程退出
+                thread.join(timeout=2.0)  # 等待退出
+                assert not thread.is_alive()  # 验证线程已退出
+                assert emergency_stop._shutdown_pipe is None  # 验证管道已关闭
+        finally:
+            os.close(master)  # 关闭伪终端
+            os.close(slave)
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="Windows 监听无法被唤醒")
+    def test_stop_waits_for_listener_cleanup(self):
+        """测试 stop_keyboard_listener 等待监听线程完成清理后才返回"""
+        import select  # 等待关闭通知
+        import emergency_stop  # 导入被测模块
+        cleaned = threading.Event()  # 监听线程已完成清理
+
+        def monitor(*args):
+            pipe = emergency_stop._shutdown_pipe  # 关闭管道
+            select.select([pipe[0]], [], [])  # 阻塞到收到关闭通知
+            time.sleep(0.1)  # 模拟恢复终端设置的耗时
+            emergency_stop._shutdown_pipe = None  # 与真实监听线程一样先置空再关闭
+            for pipe_fd in pipe:
+                os.close(pipe_fd)
+            cleaned.set()
+
+        with patch('emergency_stop._monitor_terminal_input', side_effect=monitor):
+            start_keyboard_listener(None, None)  # 启动监听线程
+            stop_keyboard_listener()  # 通知退出并等待
+        assert cleaned.is_set()  # 返回时清理已完成
+        stop_keyboard_listener()  # 管道已关闭：直接返回，不写入
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="仅 Linux 监听使用 os.read")
+    def test_linux_listener_exits_on_hangup(self):
+        """测试终端挂断（如 SSH 断开，读取返回 EIO）时监听线程安静退出"""
+        import pty  # 伪终端（tcgetattr 需要真实 tty）
+        import tty  # 终端模式设置
+        import emergency_stop  # 导入被测模块
+        master, slave = pty.openpty()  # 创建伪终端
+        mock_action_manager = Mock()  # 模拟ActionManager
+        stdin = Mock()  # 模拟标准输入
+        stdin.fileno.return_value = slave  # 指向伪终端从端
+        cbreak_ready = threading.Event()  # 监听线程已进入 cbreak 模式
+        real_setcbreak = tty.setcbreak  # patch 前保存原函数
+
+        def setcbreak(fd, *args):
+            real_setcbreak(fd, *args)  # 真实设置（会清空输入队列）
+            cbreak_ready.set()  # 之后写入/挂断不会被丢弃
+
+        try:
+            with patch('emergency_stop.sys.stdin', stdin), \
+                    patch('emergency_stop.tty.setcbreak', side_effect=setcbreak):
+                thread = threading.Thread(
+                    target=emergency_stop._monitor_linux,
+                    args=(mock_action_manager, None),
+                    daemon=True
+                )  # 直接运行 Linux 监听
+                thread.start()
+                assert cbreak_ready.wait(timeout=2.0)  # 等待监听线程就绪
+                os.close(master)  # 关闭主端：从端读取返回 EIO
+                master = None
+                thread.join(timeout=2.0)  # 等待退出
+            assert not thread.is_alive()  # 验证线程已退出
+            mock_action_manager.emergency_stop.assert_not_called()  # 未触发急停
+        finally:
+            if master is not None:
+                os.close(master)  # 关闭伪终端
+            os.close(slave)
+
 if __name__ == "__main__":
     # 运行测试
     pytest.main([__file__, "-v"])  # 以详细模式运行测试
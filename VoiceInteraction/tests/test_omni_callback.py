@@ -12,6 +12,9 @@ Omni 回调处理模块单元测试
 import pytest  # 导入 pytest 测试框架
 import json  # 导入 JSON 模块
 import threading  # 导入线程模块
+import sys  # 导入系统模块
+import os  # 导入操作系统模块
+import importlib  # 导入模块加载工具
 from unittest.mock import MagicMock, patch  # 导入 Mock 工具
 
 
@@ -257,3 +260,54 @@ class TestOmniCallbackEnsureDict:
         """测试传入空字典"""
         result = callback._ensure_dict({})
         assert result == {}
+
+
+@pytest.fixture
+def load_omni_callback():
+    """按需重新导入真实的 omni_callback 模块（dashscope/pyaudio 以桩替代），测试结束后恢复 sys.modules"""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))  # VoiceInteraction 目录（模块内按顶层名互相导入）
+    names = ("omni_callback", "orjson", "dashscope", "dashscope.audio", "dashscope.audio.qwen_omni", "pyaudio")
+    saved = {name: sys.modules.get(name) for name in names}  # 保存原始条目
+
+    def _load(orjson_available: bool = True):
+        qwen_omni = MagicMock()  # Omni SDK 桩
+        qwen_omni.OmniRealtimeCallback = object  # 回调基类换成普通基类
+        sys.modules.update({
+            "dashscope": MagicMock(),
+            "dashscope.audio": MagicMock(),
+            "dashscope.audio.qwen_omni": qwen_omni,
+            "pyaudio": MagicMock(),
+        })
+        if not orjson_available:
+            sys.modules["orjson"] = None  # import orjson 抛出 ImportError
+        elif saved["orjson"] is not None:
+            sys.modules["orjson"] = saved["orjson"]
+        sys.modules.pop("omni_callback", None)  # 强制重新执行模块级的可选依赖选择
+        return importlib.import_module("omni_callback")
+
+    yield _load
+    for name, module in saved.items():  # 恢复 sys.modules
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
+    sys.path.pop(0)
+
+
+class TestRealEnsureDict:
+    """真实 OmniCallback._ensure_dict 测试类（覆盖 orjson 与标准库两条解析路径）"""
+
+    @pytest.mark.parametrize("orjson_available", [True, False])
+    def test_parses_str_and_bytes(self, load_omni_callback, orjson_available):
+        """测试 str 与 bytes 帧都能解析，无效输入返回空字典"""
+        if orjson_available:
+            pytest.importorskip("orjson")  # 未安装 orjson 时跳过
+        module = load_omni_callback(orjson_available)
+        assert (module._loads is json.loads) is not orjson_available  # 按可用性选择解析函数
+        ensure = module.OmniCallback._ensure_dict  # 方法不使用实例状态
+        assert ensure(None, '{"type": "session.created"}') == {"type": "session.created"}  # str 帧
+        assert ensure(None, b'{"type": "session.created"}') == {"type": "session.created"}  # bytes 帧
+        assert ensure(None, b"not valid json") == {}  # 无效 JSON
+        assert ensure(None, 42) == {}  # 非字符串
+        message = {"type": "response.done"}  # 已是字典
+        assert ensure(None, message) is message  # 原样返回
@@ -0,0 +1,60 @@
+import numpy as np  # 导入数值计算模块
+import pytest  # 导入pytest测试框架
+from VoiceInteraction.ring_buffer import SPSCRing  # 导入被测模块
+
+
+class TestSPSCRing:
+    """SPSCRing 无锁环形缓冲区测试类"""
+
+    def test_capacity_rounded_to_power_of_two(self):
+        """验证容量向上取整为 2 的幂"""
+        ring = SPSCRing(1000)  # 请求 1000 个样本
+        assert ring.capacity == 1024  # 验证实际容量
+        assert ring.empty() is True  # 验证初始为空
+        assert ring.free_space() == 1024  # 验证可写空间
+
+    def test_push_pop_round_trip(self):
+        """验证写入与读取的数据一致"""
+        ring = SPSCRing(16)  # 创建缓冲区
+        data = np.arange(10, dtype=np.int16)  # 测试样本
+        assert ring.push(data.tobytes()) == 10  # 以 bytes 写入
+        assert ring.available() == 10  # 验证可读样本数
+        np.testing.assert_array_equal(ring.pop(4), data[:4])  # 分两次读取
+        np.testing.assert_array_equal(ring.pop(100), data[4:])  # 读取剩余全部
+        assert ring.empty() is True  # 验证读空
+
+    def test_wraparound(self):
+        """验证跨越数组末尾时数据不错乱"""
+        ring = SPSCRing(8)  # 创建缓冲区
+        ring.push(np.arange(6, dtype=np.int16))  # 写入 6 个样本
+        ring.pop(6)  # 读空，读写位置推进到 6
+        data = np.arange(100, 106, dtype=np.int16)  # 新样本（跨越末尾）
+        assert ring.push(data) == 6  # 写入
+        np.testing.assert_array_equal(ring.pop(6), data)  # 验证回绕后数据正确
+
+    def test_push_when_full_drops_excess(self):
+        """验证缓冲区满时只写入可容纳部分"""
+        ring = SPSCRing(8)  # 创建缓冲区
+        assert ring.push(np.ones(12, dtype=np.int16)) == 8  # 只写入 8 个
+        assert ring.push(np.ones(1, dtype=np.int16)) == 0  # 已满
+        ring.clear()  # 丢弃全部
+        assert ring.empty() is True  # 验证已清空
+
+    def test_pop_into_partial(self):
+        """验证可用样本不足时只填充部分目标数组"""
+        ring = SPSCRing(8)  # 创建缓冲区
+        ring.push(np.array([7, 8], dtype=np.int16))  # 写入 2 个样本
+        out = np.zeros(5, dtype=np.int16)  # 目标数组
+        assert ring.pop_into(out) == 2  # 只读到 2 个
+        np.testing.assert_array_equal(out, [7, 8, 0, 0, 0])  # 其余保持不变
+
+    def test_overwrite_mode_drops_oldest(self):
+        """验证覆盖模式下缓冲区满时丢弃最旧样本"""
+        ring = SPSCRing(8, overwrite=True)  # 覆盖模式
+        assert ring.push(np.arange(6, dtype=np.int16)) == 6  # 写入 6 个
+        assert ring.push(np.arange(6, 11, dtype=np.int16)) == 5  # 再写 5 个，覆盖最旧的 3 个
+        assert ring.available() == 8  # 最多保留容量个
+        np.testing.assert_array_equal(ring.pop(100), np.arange(3, 11))  # 读到最近 8 个
+
+        assert ring.push(np.arange(20, dtype=np.int16)) == 20  # 单次超出容量
+        np.testing.assert_array_equal(ring.pop(100), np.arange(12, 20))  # 只保留最后 8 个
@@ -71,6 +71,28 @@ def test_aec_processor_process_passthrough():
         pytest.skip("AEC 模块不可用")  # 跳过测试
 
 
+def test_aec_processor_process_batch():
+    """测试批量处理：输出与输入等长，禁用时直通"""
+    try:
+        from aec_processor import AECProcessor, SPEEXDSP_AVAILABLE  # 导入AEC模块
+
+        # 禁用时直通（含不足整帧的尾部）
+        aec = AECProcessor(enabled=False)  # 禁用AEC
+        test_data = b'\x00\x01' * (320 * 10 + 100)  # 10 帧 + 不足一帧的尾部
+        assert aec.process_batch(test_data, b"") == test_data  # 验证数据未改变
+
+        if not SPEEXDSP_AVAILABLE:  # 库不可用
+            pytest.skip("speexdsp 库不可用，跳过测试")  # 跳过测试
+
+        # 启用时输出长度与输入一致
+        aec = AECProcessor(enabled=True)  # 启用AEC
+        result = aec.process_batch(test_data, b'\x00\x00' * 320)  # 参考信号较短，内部补零
+        assert len(result) == len(test_data)  # 验证长度
+
+    except ImportError:  # 导入失败
+        pytest.skip("AEC 模块不可用")  # 跳过测试
+
+
 def test_audio_resampler_24k_to_16k():
     """测试音频重采样功能（24kHz → 16kHz）"""
     try:
@@ -103,6 +125,67 @@ def test_audio_resampler_24k_to_16k():
         pytest.fail(f"重采样测试失败: {e}")  # 测试失败
 
 
+def test_audio_resampler_view_matches_bytes():
+    """测试复用工作缓冲区的重采样结果与字节接口一致"""
+    try:
+        from aec_processor import AudioResampler  # 导入重采样器
+
+        data_24k = (np.arange(2400) % 200 * 100).astype(np.int16).tobytes()  # 100ms 测试数据
+        resampler = AudioResampler(max_samples_24k=1200)  # 故意设小，验证自动扩容
+        view = resampler.resample_24k_to_16k_view(data_24k)  # 视图接口
+
+        assert view.tobytes() == AudioResampler.resample_24k_to_16k(data_24k)  # 验证结果一致
+        assert len(view) == 1600  # 验证长度（2/3）
+
+    except ImportError:  # 导入失败
+        pytest.skip("AEC 模块不可用")  # 跳过测试
+
+
+def test_audio_resampler_accepts_int16_array():
+    """测试通用重采样接受 int16 数组视图（播放线程直接传入预分配缓冲区）"""
+    try:
+        from aec_processor import AudioResampler  # 导入重采样器
+
+        samples = (np.arange(2400) % 200 * 100).astype(np.int16)  # 100ms 测试数据
+        assert AudioResampler.resample(samples, 24000, 48000) == AudioResampler.resample(samples.tobytes(), 24000, 48000)  # 结果一致
+        assert AudioResampler.resample(samples[:0], 24000, 48000) == b""  # 空输入
+        assert AudioResampler.resample(samples, 24000, 24000) == samples.tobytes()  # 同采样率直通
+
+    except ImportError:  # 导入失败
+        pytest.skip("AEC 模块不可用")  # 跳过测试
+
+
+def test_upfirdn_matches_resample_poly():
+    """测试直接调用 upfirdn 的 24k→16k 重采样与 resample_poly 结果一致"""
+    try:
+        from scipy import signal  # 导入信号处理模块
+        from aec_processor import _resample_24k_to_16k_f32, _RESAMPLE_24K_16K_TAPS  # 导入内部实现
+
+        for n in (1, 3, 100, 2400, 2401):  # 覆盖非整倍数长度
+            x = (np.random.default_rng(n).standard_normal(n) * 1000).astype(np.float32)  # 随机样本
+            expected = signal.resample_poly(x, 2, 3, window=_RESAMPLE_24K_16K_TAPS)  # 参考实现
+            np.testing.assert_allclose(_resample_24k_to_16k_f32(x), expected, rtol=1e-5, atol=1e-3)  # 验证一致
+
+    except ImportError:  # 导入失败
+        pytest.skip("AEC 模块不可用")  # 跳过测试
+
+
+def test_poly_resample_matches_resample_poly():
+    """测试缓存滤波器的任意比例重采样与 resample_poly 结果一致"""
+    try:
+        from scipy import signal  # 导入信号处理模块
+        from aec_processor import _resample_poly_f32  # 导入内部实现
+
+        x = (np.random.default_rng(0).standard_normal(2400) * 1000).astype(np.float32)  # 100ms @ 24kHz
+        for dst_sr in (44100, 48000, 16000):  # 常见设备采样率
+            g = np.gcd(24000, dst_sr)  # 约分
+            expected = signal.resample_poly(x, dst_sr // g, 24000 // g)  # 参考实现
+            np.testing.assert_allclose(_resample_poly_f32(x, 24000, dst_sr), expected, rtol=1e-4, atol=1e-2)  # 验证一致
+
+    except ImportError:  # 导入失败
+        pytest.skip("AEC 模块不可用")  # 跳过测试
+
+
 def test_aec_processor_reset():
     """测试 AEC 处理器重置功能"""
     try:
@@ -127,6 +210,93 @@ def test_aec_processor_reset():
         pytest.fail(f"重置测试失败: {e}")  # 测试失败
 
 
+def test_aec_processor_reset_in_place():
+    """测试绑定提供 reset() 时原地重置，不重新创建实例"""
+    try:
+        from unittest.mock import MagicMock  # 导入Mock工具
+        from aec_processor import AECProcessor  # 导入AEC模块
+
+        aec = AECProcessor(enabled=False)  # 先以禁用状态创建
+        canceller = MagicMock()  # 模拟带 reset() 的绑定实例
+        aec.enabled = True  # 手动启用
+        aec.echo_canceller = canceller  # 注入模拟实例
+
+        aec.reset()  # 重置
+
+        canceller.reset.assert_called_once_with()  # 验证调用了原地重置
+        assert aec.echo_canceller is canceller  # 验证实例未被替换
+
+    except ImportError:  # 导入失败
+        pytest.skip("AEC 模块不可用")  # 跳过测试
+
+
+def test_ctypes_backend_process_block(monkeypatch):
+    """测试 ctypes 后端整块处理的指针偏移（用拷贝 mic 的假 C 函数替代 libspeexdsp）"""
+    try:
+        import ctypes  # 导入 ctypes
+        from unittest.mock import MagicMock  # 导入Mock工具
+        import aec_processor  # 导入AEC模块
+
+        fake_lib = MagicMock()  # 模拟 libspeexdsp
+        fake_lib.speex_echo_state_init.return_value = 1  # 非空状态指针
+        fake_lib.speex_echo_cancellation.side_effect = (
+            lambda state, near, far, out: ctypes.memmove(out, near, 320 * 2)
+        )  # 输出 = 麦克风输入
+        monkeypatch.setattr(aec_processor, "_LIBSPEEXDSP", fake_lib)  # 注入假库
+
+        canceller = aec_processor._CtypesEchoCanceller(320, 2048, 16000)  # 创建后端
+        mic = np.arange(320 * 3, dtype=np.int16).tobytes()  # 3 帧递增样本
+        assert canceller.process_block(mic, b'\x00' * len(mic)) == mic  # 验证逐帧偏移正确
+        assert fake_lib.speex_echo_cancellation.call_count == 3  # 验证调用次数
+
+        canceller.reset()  # 原地重置
+        fake_lib.speex_echo_state_reset.assert_called_once_with(1)  # 验证调用 C 重置接口
+
+    except ImportError:  # 导入失败
+        pytest.skip("AEC 模块不可用")  # 跳过测试
+
+
+@pytest.mark.parametrize("dst_sr", [16000, 22050, 44100, 48000])
+def test_streaming_resampler_chunk_boundaries_continuous(dst_sr):
+    """测试流式重采样逐块输出与整段一次处理完全一致（块边界无跳变）"""
+    try:
+        from aec_processor import StreamingResampler  # 导入流式重采样器
+
+        x = (np.sin(np.arange(24000) * 2 * np.pi * 440 / 24000) * 8000).astype(np.int16)  # 1 秒 440Hz
+        whole = StreamingResampler(24000, dst_sr).process(x)  # 整段一次处理
+        assert len(whole) == -(-len(x) * dst_sr // 24000)  # 输出长度向上取整
+
+        resampler = StreamingResampler(24000, dst_sr)  # 逐块处理
+        rng = np.random.default_rng(dst_sr)  # 随机块长度
+        parts, i = [], 0
+        while i < len(x):
+            n = int(rng.integers(1, 1500))  # 含很短的块
+            parts.append(resampler.process(x[i:i + n]))
+            i += n
+        np.testing.assert_array_equal(np.concatenate(parts), whole)  # 逐样本一致
+
+        resampler.reset()  # 重置后等同新实例
+        np.testing.assert_array_equal(resampler.process(x), whole)
+
+    except ImportError:  # 导入失败
+        pytest.skip("AEC 模块不可用")  # 跳过测试
+
+
+def test_streaming_resampler_matches_resample_poly_delayed():
+    """测试流式重采样与 resample_poly 的结果只相差固定的群时延"""
+    try:
+        from aec_processor import StreamingResampler, AudioResampler, _poly_resample_plan  # 导入实现
+
+        x = (np.sin(np.arange(4800) * 0.05) * 8000).astype(np.int16)  # 200ms 测试数据
+        delay = _poly_resample_plan(24000, 44100)[3]  # 群时延（输出样本数）
+        streamed = StreamingResampler(24000, 44100).process(x)  # 因果输出
+        reference = np.frombuffer(AudioResampler.resample(x, 24000, 44100), dtype=np.int16)  # 零相位参考
+        np.testing.assert_array_equal(streamed[delay:], reference[:len(streamed) - delay])  # 平移后一致
+
+    except ImportError:  # 导入失败
+        pytest.skip("AEC 模块不可用")  # 跳过测试
+
+
 if __name__ == "__main__":
     # 运行所有测试
     pytest.main([__file__, "-v"])  # 执行pytest